@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+"""
+Compare memory taken by storage of calculated attribute values
+per holder: regular dictionary versus CompactFloatDict, which is
+used by MutableAttributeMap.
+"""
+
+
+import argparse
+import os.path
+import random
+import sys
+import tracemalloc
+
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, '..')))
+
+from eos.util.compact_dict import CompactFloatDict  # noqa: E402
+
+
+def measure(container_class, holder_amount, attr_amount, attr_pool):
+    """
+    Fill given amount of containers with random attribute values
+    and return amount of memory taken per container in bytes.
+    """
+    rng = random.Random(0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    containers = []
+    for _ in range(holder_amount):
+        container = container_class()
+        for attr_id in rng.sample(attr_pool, attr_amount):
+            # Calculated values are floats, make sure
+            # they are separate objects like in real calculations
+            container[attr_id] = rng.random() * 1000
+        containers.append(container)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / holder_amount
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure per-holder memory of attribute storage')
+    parser.add_argument('--holders', type=int, default=20000, help='amount of holders to create')
+    parser.add_argument('--attrs', type=int, nargs='+', default=[5, 20, 50, 100],
+                        help='amounts of calculated attributes per holder')
+    args = parser.parse_args()
+    attr_pool = list(range(1, 3000))
+    print('{:>8} {:>12} {:>12} {:>8}'.format('attrs', 'dict, B', 'compact, B', 'ratio'))
+    for attr_amount in args.attrs:
+        dict_size = measure(dict, args.holders, attr_amount, attr_pool)
+        compact_size = measure(CompactFloatDict, args.holders, attr_amount, attr_pool)
+        print('{:>8} {:>12.0f} {:>12.0f} {:>8.2f}'.format(
+            attr_amount, dict_size, compact_size, dict_size / compact_size))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+
+"""
+Compare cache serialization codecs of JsonCacheHandler: time to
+write cache, time to load it on handler initialization, and size
+of cache file, using generated dataset of size similar to EVE one.
+"""
+
+
+import argparse
+import os.path
+import random
+import sys
+import tempfile
+import time
+
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, '..')))
+
+from eos.data.cache_handler import JsonCacheHandler  # noqa: E402
+from eos.data.cache_handler.codec import CODECS  # noqa: E402
+
+
+def generate_data(type_amount, attr_amount, effect_amount, modifier_amount):
+    """Generate data in the form cache generator produces it."""
+    rng = random.Random(0)
+    attr_ids = list(range(1, attr_amount + 1))
+    effect_ids = list(range(1, effect_amount + 1))
+    modifier_ids = list(range(1, modifier_amount + 1))
+    types = []
+    for type_id in range(1, type_amount + 1):
+        effects = rng.sample(effect_ids, rng.randint(0, 8))
+        types.append({
+            'type_id': type_id,
+            'group': rng.randint(1, 1500),
+            'category': rng.randint(1, 60),
+            'attributes': {attr_id: rng.random() * 1000 for attr_id in rng.sample(attr_ids, rng.randint(5, 60))},
+            'effects': effects,
+            'default_effect': effects[0] if effects else None
+        })
+    attributes = []
+    for attr_id in attr_ids:
+        attributes.append({
+            'attribute_id': attr_id,
+            'max_attribute': rng.choice((None, rng.choice(attr_ids))),
+            'default_value': rng.random() * 100,
+            'high_is_good': rng.choice((True, False)),
+            'stackable': rng.choice((True, False))
+        })
+    effects = []
+    for effect_id in effect_ids:
+        effects.append({
+            'effect_id': effect_id,
+            'effect_category': rng.randint(0, 7),
+            'is_offensive': rng.choice((True, False)),
+            'is_assistance': rng.choice((True, False)),
+            'duration_attribute': rng.choice((None, rng.choice(attr_ids))),
+            'discharge_attribute': rng.choice((None, rng.choice(attr_ids))),
+            'range_attribute': rng.choice((None, rng.choice(attr_ids))),
+            'falloff_attribute': rng.choice((None, rng.choice(attr_ids))),
+            'tracking_speed_attribute': rng.choice((None, rng.choice(attr_ids))),
+            'fitting_usage_chance_attribute': None,
+            'build_status': rng.randint(1, 4),
+            'modifiers': rng.sample(modifier_ids, rng.randint(0, 6))
+        })
+    modifiers = []
+    for modifier_id in modifier_ids:
+        modifiers.append({
+            'modifier_id': modifier_id,
+            'state': rng.randint(1, 4),
+            'scope': rng.randint(1, 3),
+            'src_attr': rng.choice(attr_ids),
+            'operator': rng.randint(1, 9),
+            'tgt_attr': rng.choice(attr_ids),
+            'domain': rng.randint(1, 6),
+            'filter_type': rng.choice((None, 1, 2, 3)),
+            'filter_value': rng.choice((None, rng.randint(1, 30000)))
+        })
+    return {'types': types, 'attributes': attributes, 'effects': effects, 'modifiers': modifiers}
+
+
+def measure(codec, data, cache_path, repeats):
+    """Return (write time, load time, file size) for given codec."""
+    write_times = []
+    load_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        JsonCacheHandler(cache_path, codec=codec).update_cache(data, 'fingerprint')
+        write_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        JsonCacheHandler(cache_path, codec=codec)
+        load_times.append(time.perf_counter() - start)
+    return min(write_times), min(load_times), os.path.getsize(cache_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare cache serialization codecs')
+    parser.add_argument('--types', type=int, default=30000, help='amount of types in dataset')
+    parser.add_argument('--repeats', type=int, default=3, help='amount of runs per codec, best is taken')
+    parser.add_argument('--codecs', nargs='+', default=sorted(CODECS), help='codecs to compare')
+    args = parser.parse_args()
+    data = generate_data(args.types, 2500, 4000, 10000)
+    print('{:>10} {:>10} {:>10} {:>12}'.format('codec', 'write, s', 'load, s', 'size, KiB'))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for codec in args.codecs:
+            cache_path = os.path.join(tmp_dir, 'cache_{}'.format(codec))
+            write_time, load_time, size = measure(codec, data, cache_path, args.repeats)
+            print('{:>10} {:>10.3f} {:>10.3f} {:>12.0f}'.format(codec, write_time, load_time, size / 1024))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+
+"""
+Measure wall time and peak memory of whole cache generation
+on generated dataset of size similar to what Phobos dumps from
+EVE client.
+"""
+
+
+import argparse
+import logging
+import os.path
+import sys
+import time
+import tracemalloc
+
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, '..')))
+
+from cache_generator_cleanup import generate_data  # noqa: E402
+from eos.data.cache_generator import CacheGenerator  # noqa: E402
+
+
+class DataHandler:
+    """Data handler which serves copies of generated data."""
+
+    def __init__(self, data):
+        self.__data = data
+
+    def __getattr__(self, attr_name):
+        table_name = attr_name[len('get_'):]
+        if not attr_name.startswith('get_') or table_name not in self.__data:
+            raise AttributeError(attr_name)
+        return lambda: [dict(row) for row in self.__data[table_name]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--types', type=int, default=35000, help='amount of types in dataset')
+    parser.add_argument('--groups', type=int, default=1500, help='amount of groups in dataset')
+    parser.add_argument('--attributes', type=int, default=2500, help='amount of attributes in dataset')
+    parser.add_argument('--effects', type=int, default=6000, help='amount of effects in dataset')
+    parser.add_argument('--expressions', type=int, default=20000, help='amount of expressions in dataset')
+    parser.add_argument('--workers', type=int, default=None, help='amount of processes to build modifiers in')
+    args = parser.parse_args()
+    # Generated data is not valid from the modifier builder
+    # point of view, thus silence its complaints
+    logging.disable(logging.CRITICAL)
+    data_handler = DataHandler(generate_data(
+        args.types, args.groups, args.attributes, args.effects, args.expressions))
+    start = time.perf_counter()
+    CacheGenerator(workers=args.workers).run(data_handler)
+    print('generation time: {:.3f} s'.format(time.perf_counter() - start))
+    tracemalloc.start()
+    CacheGenerator(workers=args.workers).run(data_handler)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print('generation peak memory: {:.1f} MiB'.format(peak / 1024 ** 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+
+"""
+Measure time taken by cache generator cleanup stage on generated
+dataset of size similar to what Phobos dumps from EVE client.
+"""
+
+
+import argparse
+import os.path
+import random
+import sys
+import time
+
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, '..')))
+
+from eos.const.eve import Category  # noqa: E402
+from eos.data.cache_generator.cleaner import Cleaner  # noqa: E402
+from eos.data.cache_generator.table import Table  # noqa: E402
+
+
+def generate_data(type_amount, group_amount, attr_amount, effect_amount, expression_amount):
+    """Generate data in the form cleaner receives it."""
+    rng = random.Random(0)
+    category_ids = list(range(1, 70)) + [
+        Category.ship, Category.module, Category.charge, Category.skill,
+        Category.drone, Category.implant, Category.subsystem
+    ]
+    groups = []
+    for group_id in range(1, group_amount + 1):
+        groups.append({
+            'groupID': group_id,
+            'categoryID': rng.choice(category_ids),
+            'groupName_en-us': 'Group {}'.format(group_id)
+        })
+    attr_ids = list(range(1, attr_amount + 1))
+    attrs = []
+    for attr_id in attr_ids:
+        attrs.append({
+            'attributeID': attr_id,
+            'attributeName': 'attribute{}'.format(attr_id),
+            'maxAttributeID': rng.choice((None, None, None, rng.choice(attr_ids))),
+            'defaultValue': rng.random() * 100,
+            'highIsGood': rng.choice((True, False)),
+            'stackable': rng.choice((True, False))
+        })
+    expressions = []
+    for expression_id in range(1, expression_amount + 1):
+        # Reference only expressions with lower IDs to build trees
+        expressions.append({
+            'expressionID': expression_id,
+            'operandID': rng.randint(1, 200),
+            'expressionValue': None,
+            'arg1': rng.randint(1, expression_id - 1) if expression_id > 1 else None,
+            'arg2': rng.randint(1, expression_id - 1) if expression_id > 1 else None,
+            'expressionTypeID': rng.choice((None, None, None, rng.randint(1, type_amount))),
+            'expressionGroupID': rng.choice((None, None, None, rng.randint(1, group_amount))),
+            'expressionAttributeID': rng.choice((None, rng.choice(attr_ids)))
+        })
+    effect_ids = list(range(1, effect_amount + 1))
+    effects = []
+    for effect_id in effect_ids:
+        modinfo = None
+        if rng.random() < 0.3:
+            modinfo = '- {{domain: shipID, func: ItemModifier, modifiedAttributeID: {}, '\
+                'modifyingAttributeID: {}, operator: 6}}\n'.format(rng.choice(attr_ids), rng.choice(attr_ids))
+        effects.append({
+            'effectID': effect_id,
+            'effectCategory': rng.randint(0, 7),
+            'isOffensive': rng.choice((True, False)),
+            'isAssistance': rng.choice((True, False)),
+            'preExpression': rng.randint(1, expression_amount),
+            'postExpression': rng.randint(1, expression_amount),
+            'durationAttributeID': rng.choice((None, rng.choice(attr_ids))),
+            'dischargeAttributeID': rng.choice((None, rng.choice(attr_ids))),
+            'modifierInfo': modinfo
+        })
+    types = []
+    type_attribs = []
+    type_effects = []
+    for type_id in range(1, type_amount + 1):
+        types.append({
+            'typeID': type_id,
+            'groupID': rng.randint(1, group_amount),
+            'typeName_en-us': 'Type {}'.format(type_id),
+            'radius': rng.random() * 1000,
+            'mass': rng.random() * 1000,
+            'volume': rng.random() * 1000,
+            'capacity': rng.random() * 1000
+        })
+        for attr_id in rng.sample(attr_ids, rng.randint(5, 30)):
+            type_attribs.append({'typeID': type_id, 'attributeID': attr_id, 'value': rng.random() * 1000})
+        for effect_id in rng.sample(effect_ids, rng.randint(0, 3)):
+            type_effects.append({'typeID': type_id, 'effectID': effect_id, 'isDefault': rng.random() < 0.1})
+    return {
+        'evetypes': types,
+        'evegroups': groups,
+        'dgmattribs': attrs,
+        'dgmtypeattribs': type_attribs,
+        'dgmeffects': effects,
+        'dgmtypeeffects': type_effects,
+        'dgmexpressions': expressions
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--types', type=int, default=35000, help='amount of types in dataset')
+    parser.add_argument('--groups', type=int, default=1500, help='amount of groups in dataset')
+    parser.add_argument('--attributes', type=int, default=2500, help='amount of attributes in dataset')
+    parser.add_argument('--effects', type=int, default=6000, help='amount of effects in dataset')
+    parser.add_argument('--expressions', type=int, default=20000, help='amount of expressions in dataset')
+    parser.add_argument('--repeat', type=int, default=3, help='amount of measurements to take best of')
+    args = parser.parse_args()
+    raw_data = generate_data(args.types, args.groups, args.attributes, args.effects, args.expressions)
+    print('rows in dataset: {}'.format(sum(len(rows) for rows in raw_data.values())))
+    timings = []
+    for _ in range(args.repeat):
+        data = {
+            table_name: Table(rows)
+            for table_name, rows in raw_data.items()
+        }
+        start = time.perf_counter()
+        Cleaner().clean(data)
+        timings.append(time.perf_counter() - start)
+    print('rows after cleanup: {}'.format(sum(len(rows) for rows in data.values())))
+    print('cleanup time: {:.3f} s'.format(min(timings)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+
+"""
+Measure memory taken by JsonCacheHandler on full cache load: data
+loaded into memory data cache, and objects assembled from it when all
+types of generated dataset are requested (with their effects and
+modifiers) and kept alive, along with all attributes. Unlike random
+values of generated dataset, attribute values in EVE data repeat a
+lot, thus here they are reduced to small set of values.
+"""
+
+
+import argparse
+import os.path
+import sys
+import tempfile
+import tracemalloc
+
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, '..')))
+
+from cache_codecs import generate_data  # noqa: E402
+from eos.data.cache_handler import JsonCacheHandler  # noqa: E402
+
+
+def measure(cache_path, type_ids, attr_ids):
+    """
+    Return amount of memory taken by data cache and by assembled
+    objects, in bytes.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    cache_handler = JsonCacheHandler(cache_path, strong_cache_size=0)
+    loaded = tracemalloc.get_traced_memory()[0]
+    objects = [cache_handler.get_type(type_id) for type_id in type_ids]
+    objects.extend(cache_handler.get_attribute(attr_id) for attr_id in attr_ids)
+    # Derived properties are part of warmed up objects
+    for type_ in objects[:len(type_ids)]:
+        type_.required_skills
+        type_.is_targeted
+        type_.slots
+    assembled = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return loaded - before, assembled - loaded
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure memory taken by cache data and assembled cache objects')
+    parser.add_argument('--types', type=int, default=30000, help='amount of types in dataset')
+    args = parser.parse_args()
+    attr_amount = 2500
+    data = generate_data(args.types, attr_amount, 4000, 10000)
+    for type_row in data['types']:
+        type_row['attributes'] = {k: round(v / 100) * 5.0 for k, v in type_row['attributes'].items()}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = os.path.join(tmp_dir, 'cache')
+        JsonCacheHandler(cache_path).update_cache(data, 'fingerprint')
+        data_size, object_size = measure(cache_path, range(1, args.types + 1), range(1, attr_amount + 1))
+    for name, size in (('data cache', data_size), ('objects', object_size)):
+        print('{}: {:.1f} MiB, {:.0f} B per type'.format(name, size / 1024 ** 2, size / args.types))
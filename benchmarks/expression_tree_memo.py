@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+
+"""
+Measure time of building modifiers out of expression trees with
+and without memoization of expression subtrees, and report how
+much work memoization saved. Effects are generated out of
+templates, like in EVE data: part of them reference shared
+expressions, and part of them have own copies of the very same
+subtrees.
+"""
+
+
+import argparse
+import itertools
+import os.path
+import random
+import sys
+import time
+
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, '..')))
+
+from eos.const.eve import EffectCategory, Operand  # noqa: E402
+from eos.data.cache_generator.modifier_builder import ModifierBuilder  # noqa: E402
+
+
+def generate_data(effect_amount, template_amount, shared_ratio):
+    """Generate expression rows and effect rows."""
+    rng = random.Random(0)
+    expressions = []
+    expression_ids = itertools.count(1)
+
+    def make(operand, arg1=None, arg2=None, value=None, attr=None):
+        expression_id = next(expression_ids)
+        expressions.append({
+            'expressionID': expression_id, 'operandID': operand, 'arg1': arg1, 'arg2': arg2,
+            'expressionValue': value, 'expressionTypeID': None, 'expressionGroupID': None,
+            'expressionAttributeID': attr
+        })
+        return expression_id
+
+    def make_actions(template):
+        """Make pair of apply and undo action subtrees."""
+        domain, operator, tgt_attr, src_attr = template
+        e_optr_tgt = make(
+            Operand.optr_tgt, make(Operand.def_optr, value=operator),
+            make(Operand.itm_attr, make(Operand.def_loc, value=domain), make(Operand.def_attr, attr=tgt_attr))
+        )
+        e_src_attr = make(Operand.def_attr, attr=src_attr)
+        return (
+            make(Operand.add_itm_mod, e_optr_tgt, e_src_attr),
+            make(Operand.rm_itm_mod, e_optr_tgt, e_src_attr)
+        )
+
+    def splice(expression_ids):
+        root = expression_ids[0]
+        for expression_id in expression_ids[1:]:
+            root = make(Operand.splice, root, expression_id)
+        return root
+
+    templates = [
+        (rng.choice(('Ship', 'Char', 'Self')), rng.choice(('PostPercent', 'PostMul', 'ModAdd')),
+         rng.randint(1, 2000), rng.randint(1, 2000))
+        for _ in range(template_amount)
+    ]
+    shared_actions = [make_actions(template) for template in templates]
+    effects = []
+    for effect_id in range(1, effect_amount + 1):
+        pre_ids = []
+        post_ids = []
+        for template_idx in rng.sample(range(template_amount), rng.randint(1, 4)):
+            if rng.random() < shared_ratio:
+                add_id, rm_id = shared_actions[template_idx]
+            else:
+                add_id, rm_id = make_actions(templates[template_idx])
+            pre_ids.append(add_id)
+            post_ids.append(rm_id)
+        effects.append({
+            'effect_id': effect_id,
+            'effect_category': EffectCategory.passive,
+            'pre_expression': splice(pre_ids),
+            'post_expression': splice(post_ids),
+            'modifier_info': None
+        })
+    return expressions, effects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--effects', type=int, default=6000, help='amount of effects')
+    parser.add_argument('--templates', type=int, default=300, help='amount of distinct modification templates')
+    parser.add_argument('--shared', type=float, default=0.5, help='ratio of actions which use shared expressions')
+    args = parser.parse_args()
+    expressions, effects = generate_data(args.effects, args.templates, args.shared)
+    print('expressions: {}, effects: {}'.format(len(expressions), len(effects)))
+    for tree_memo in (False, True):
+        start = time.perf_counter()
+        builder = ModifierBuilder(expressions, tree_memo=tree_memo)
+        modifier_amount = 0
+        for effect_row in effects:
+            modifiers, build_status = builder.build(dict(effect_row))
+            modifier_amount += len(modifiers)
+        print('memo {}: {} modifiers built in {:.3f} s'.format(
+            'enabled' if tree_memo else 'disabled', modifier_amount, time.perf_counter() - start))
+        if tree_memo:
+            print(builder.tree_memo_stats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+
+"""
+Compare private memory of worker processes which use cache loaded
+by each of them (JsonCacheHandler) with workers which attach to
+single copy of cache in shared memory (SharedMemoryCacheHandler).
+Linux-only, as memory is read from /proc.
+"""
+
+
+import argparse
+import os.path
+import sys
+import tempfile
+from multiprocessing import get_context
+
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, '..')))
+
+from cache_codecs import generate_data  # noqa: E402
+from eos.data.cache_handler import JsonCacheHandler, SharedMemoryCacheHandler  # noqa: E402
+
+
+def get_private_memory():
+    """Return amount of anonymous memory of current process, in bytes."""
+    with open('/proc/self/status') as file:
+        for line in file:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def run_worker(cache_source, type_amount):
+    """
+    Get cache handler in worker, use part of the data and report
+    growth of private memory.
+
+    Required arguments:
+    cache_source -- path to JSON cache, or shared memory cache handler
+    (which attaches to segment when unpickled by worker)
+    type_amount -- amount of types in dataset
+    """
+    before = get_private_memory()
+    if isinstance(cache_source, str):
+        cache_handler = JsonCacheHandler(cache_source)
+    else:
+        cache_handler = cache_source
+    types = [cache_handler.get_type(type_id) for type_id in range(1, type_amount + 1, 10)]
+    return get_private_memory() - before, len(types)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare memory of workers with per-process and shared cache')
+    parser.add_argument('--types', type=int, default=30000, help='amount of types in dataset')
+    parser.add_argument('--workers', type=int, default=4, help='amount of worker processes')
+    args = parser.parse_args()
+    data = generate_data(args.types, 2500, 4000, 10000)
+    # Spawned workers start from scratch, like they would in
+    # long-running pool, instead of sharing parent's pages
+    context = get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = os.path.join(tmp_dir, 'cache')
+        JsonCacheHandler(cache_path).update_cache(data, 'fingerprint')
+        shared_handler = SharedMemoryCacheHandler()
+        shared_handler.update_cache(data, 'fingerprint')
+        try:
+            for name, cache_source in (('json', cache_path), ('shared memory', shared_handler)):
+                with context.Pool(args.workers) as pool:
+                    results = pool.starmap(run_worker, [(cache_source, args.types)] * args.workers, chunksize=1)
+                total = sum(memory for memory, _ in results)
+                print('{}: {:.1f} MiB in {} workers'.format(name, total / 1024 ** 2, args.workers))
+        finally:
+            shared_handler.close()
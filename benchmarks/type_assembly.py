@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+
+"""
+Measure throughput of type assembly in JsonCacheHandler: how many
+types per second are built from in-memory data, when object caches
+do not help (every type, with its effects and modifiers, is built
+from scratch).
+"""
+
+
+import argparse
+import os.path
+import sys
+import tempfile
+import time
+
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, '..')))
+
+from cache_codecs import generate_data  # noqa: E402
+from eos.data.cache_handler import JsonCacheHandler  # noqa: E402
+
+
+def measure(cache_handler, type_ids, repeats):
+    """Return amount of types assembled per second, best of several runs."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for type_id in type_ids:
+            # Result is discarded right away, thus weakref
+            # object cache doesn't keep anything
+            cache_handler.get_type(type_id)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return len(type_ids) / best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure type assembly throughput')
+    parser.add_argument('--types', type=int, default=30000, help='amount of types in dataset')
+    parser.add_argument('--repeats', type=int, default=5, help='amount of runs, best is taken')
+    args = parser.parse_args()
+    data = generate_data(args.types, 2500, 4000, 10000)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_handler = JsonCacheHandler(os.path.join(tmp_dir, 'cache'), strong_cache_size=0)
+        cache_handler.update_cache(data, 'fingerprint')
+        throughput = measure(cache_handler, list(range(1, args.types + 1)), args.repeats)
+    print('{:.0f} types/s'.format(throughput))
@@ -0,0 +1,84 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from hashlib import sha1
+
+
+class EffectDigester:
+    """
+    Calculate digests of data which is used to build modifiers
+    of effects: effect category, modifier info and whole expression
+    trees. If digest of effect didn't change since previous run,
+    modifiers built back then can be reused.
+
+    Required arguments:
+    expressions -- iterable with expression rows
+    """
+
+    def __init__(self, expressions):
+        # Format: {expression ID: expression row}
+        self.__expressions = {}
+        for exp_row in expressions:
+            self.__expressions[exp_row['expressionID']] = exp_row
+        # Digests of expression subtrees, as many
+        # effects share them
+        # Format: {expression ID: digest}
+        self.__exp_digests = {}
+
+    def get_digest(self, effect_row):
+        """
+        Get digest of modifier building input data of effect.
+
+        Required arguments:
+        effect_row -- effect row with effect category, pre-/post-
+        expression ID, modifier info data
+
+        Return value:
+        String with hex digest
+        """
+        digest = sha1()
+        digest.update(repr((effect_row['effect_category'], effect_row['modifier_info'])).encode('utf-8'))
+        for tree_root_id in (effect_row['pre_expression'], effect_row['post_expression']):
+            digest.update(self.__get_exp_digest(tree_root_id).encode('utf-8'))
+        return digest.hexdigest()
+
+    def __get_exp_digest(self, expression_id):
+        """Get digest of expression subtree."""
+        try:
+            return self.__exp_digests[expression_id]
+        except KeyError:
+            pass
+        exp_row = self.__expressions.get(expression_id)
+        if exp_row is None:
+            return repr(expression_id)
+        # Malformed trees can contain cycles, placeholder
+        # guarantees that we do not loop infinitely
+        self.__exp_digests[expression_id] = 'cycle'
+        digest = sha1()
+        # Position of row in source table doesn't
+        # influence results of building
+        fields = sorted((k, v) for k, v in exp_row.items() if k != 'table_pos')
+        digest.update(repr(fields).encode('utf-8'))
+        for arg_field in ('arg1', 'arg2'):
+            digest.update(self.__get_exp_digest(exp_row.get(arg_field)).encode('utf-8'))
+        exp_digest = digest.hexdigest()
+        self.__exp_digests[expression_id] = exp_digest
+        return exp_digest
@@ -22,7 +22,6 @@
 from logging import getLogger
 
 from eos.const.eve import Effect
-from eos.util.frozen_dict import FrozenDict
 
 
 logger = getLogger(__name__)
@@ -78,48 +77,44 @@ class Checker:
         as primary keys in iterable
         """
         table = self.data[table_name]
+        key_columns = tuple(table.get_column(key_name) for key_name in key_names)
         # Contains keys used in current table
         used_keys = set()
-        # Storage for rows which should be removed
+        # Storage for positions of rows which should be removed
         invalid_rows = set()
-        for datarow in sorted(table, key=lambda row: row['table_pos']):
-            self._row_pk(key_names, datarow, used_keys, invalid_rows)
+        for row_pos in table:
+            self._row_pk(key_columns, row_pos, used_keys, invalid_rows)
         # If any invalid rows were detected, remove them and
         # write corresponding message to log
         if invalid_rows:
             msg = '{} rows in table {} have invalid PKs, removing them'.format(
                 len(invalid_rows), table_name)
             logger.warning(msg)
-            table.difference_update(invalid_rows)
+            table.remove(invalid_rows)
 
-    def _row_pk(self, key_names, datarow, used_keys, invalid_rows):
+    def _row_pk(self, key_columns, row_pos, used_keys, invalid_rows):
         """
         Check row primary key for validity.
 
         Required arguments:
-        key_names -- names of fields which contain keys
-        datarow -- row to check
+        key_columns -- columns which contain keys
+        row_pos -- position of row to check
         used_keys -- container with alreaady used keys
-        invalid_rows -- container for invalid rows
+        invalid_rows -- container for positions of invalid rows
         """
         row_key = []
-        for key_name in key_names:
-            try:
-                key_value = datarow[key_name]
+        for key_column in key_columns:
+            key_value = key_column[row_pos]
             # Invalidate row if it doesn't have any component
-            # of primary key
-            except KeyError:
-                invalid_rows.add(datarow)
-                return
-            # If primary key is not an integer
+            # of primary key, or if it is not an integer
             if not isinstance(key_value, int):
-                invalid_rows.add(datarow)
+                invalid_rows.add(row_pos)
                 return
             row_key.append(key_value)
         row_key = tuple(row_key)
         # If specified key is already used
         if row_key in used_keys:
-            invalid_rows.add(datarow)
+            invalid_rows.add(row_pos)
             return
         used_keys.add(row_key)
 
@@ -131,14 +126,15 @@ class Checker:
         """
         invalid_rows = set()
         table = self.data['dgmtypeattribs']
-        for row in table:
-            if not isinstance(row.get('value'), (int, float)):
-                invalid_rows.add(row)
+        values = table.get_column('value')
+        for row_pos in table:
+            if not isinstance(values[row_pos], (int, float)):
+                invalid_rows.add(row_pos)
         if invalid_rows:
             msg = '{} attribute rows have non-numeric value, removing them'.format(
                 len(invalid_rows))
             logger.warning(msg)
-            table.difference_update(invalid_rows)
+            table.remove(invalid_rows)
 
     def _multiple_default_effects(self):
         """
@@ -149,17 +145,19 @@ class Checker:
         # Set with IDs of types, which have default effect
         defeff = set()
         table = self.data['dgmtypeeffects']
+        type_ids = table.get_column('typeID')
+        defaults = table.get_column('isDefault')
         invalid_rows = set()
-        for row in sorted(table, key=lambda r: r['table_pos']):
-            is_default = row.get('isDefault')
+        for row_pos in table:
+            is_default = defaults[row_pos]
             # We're interested only in default effects
             if is_default is not True:
                 continue
-            type_id = row['typeID']
+            type_id = type_ids[row_pos]
             # If we already saw default effect for given type ID,
             # invalidate current row
             if type_id in defeff:
-                invalid_rows.add(row)
+                invalid_rows.add(row_pos)
             else:
                 defeff.add(type_id)
         # Process ivalid rows, if any
@@ -168,12 +166,8 @@ class Checker:
                 len(invalid_rows))
             logger.warning(msg)
             # Replace isDefault field value with False for invalid rows
-            table.difference_update(invalid_rows)
-            for invalid_row in invalid_rows:
-                new_row = {}
-                for field, value in invalid_row.items():
-                    new_row[field] = False if field == 'isDefault' else value
-                table.add(FrozenDict(new_row))
+            for row_pos in invalid_rows:
+                table.set(row_pos, 'isDefault', False)
 
     def _colliding_module_racks(self):
         """
@@ -187,21 +181,23 @@ class Checker:
         """
         table = self.data['dgmtypeeffects']
         rack_effects = (Effect.hi_power, Effect.med_power, Effect.lo_power)
+        type_ids = table.get_column('typeID')
+        effect_ids = table.get_column('effectID')
         racked_items = set()
         invalid_rows = set()
-        for row in sorted(table, key=lambda r: r['table_pos']):
-            effect_id = row['effectID']
+        for row_pos in table:
+            effect_id = effect_ids[row_pos]
             # We're not interested in anything besides
             # rack effects
             if effect_id not in rack_effects:
                 continue
-            type_id = row['typeID']
+            type_id = type_ids[row_pos]
             if type_id in racked_items:
-                invalid_rows.add(row)
+                invalid_rows.add(row_pos)
             else:
                 racked_items.add(type_id)
         if invalid_rows:
             msg = '{} rows contain colliding module racks, removing them'.format(
                 len(invalid_rows))
             logger.warning(msg)
-            table.difference_update(invalid_rows)
+            table.remove(invalid_rows)
@@ -19,12 +19,13 @@
 # ===============================================================================
 
 
-import yaml
+from collections import deque
 from itertools import chain
 from logging import getLogger
 
 from eos.const.eve import Group, Category
 from eos.util.cached_property import CachedProperty
+from .yaml_cache import YamlCache
 
 
 logger = getLogger(__name__)
@@ -37,16 +38,29 @@ class Cleaner:
     pre-defined data relations.
     """
 
-    def clean(self, data):
+    def clean(self, data, yaml_cache=None):
+        """
+        Remove data which is not needed by Eos.
+
+        Required arguments:
+        data -- data to clean
+
+        Optional arguments:
+        yaml_cache -- YamlCache object to parse modifier infos
+        with (default None)
+        """
         self.data = data
+        if yaml_cache is None:
+            yaml_cache = YamlCache()
+        self.yaml_cache = yaml_cache
         # Container to store signs of so-called strong data,
-        # such rows are immune to removal. Dictionary structure
-        # is the same as structure of general data container
+        # such rows are immune to removal
+        # Format: {table name: {row positions}}
         self.strong_data = {}
         # Move some rows to strong data container
         self._pump_evetypes()
-        # Also contains data in the very same format, but tables/rows
-        # in this table are considered as pending for removal
+        # Also contains row positions in the very same format, but
+        # rows in this container are considered as pending for removal
         self.trashed_data = {}
         self._autocleanup()
         self._report_results()
@@ -69,164 +83,167 @@ class Cleaner:
         # It is set because we will need to modify it
         strong_groups = {Group.character, Group.effect_beacon}
         # Go through table data, filling valid groups set according to valid categories
-        for datarow in self.data['evegroups']:
-            if datarow.get('categoryID') in strong_categories:
-                strong_groups.add(datarow['groupID'])
+        for group_id, category_id in self.data['evegroups'].iter_values('groupID', 'categoryID'):
+            if category_id in strong_categories:
+                strong_groups.add(group_id)
         rows_to_pump = set()
-        for datarow in self.data['evetypes']:
-            if datarow.get('groupID') in strong_groups:
-                rows_to_pump.add(datarow)
+        evetypes = self.data['evetypes']
+        group_ids = evetypes.get_column('groupID')
+        for row_pos in evetypes:
+            if group_ids[row_pos] in strong_groups:
+                rows_to_pump.add(row_pos)
         self._pump_data('evetypes', rows_to_pump)
 
+    # Format:
+    # {source table: {source column: target table}}
+    _foreign_keys = {
+        'dgmattribs': {
+            'maxAttributeID': 'dgmattribs'
+        },
+        'dgmeffects': {
+            'preExpression': 'dgmexpressions',
+            'postExpression': 'dgmexpressions',
+            'durationAttributeID': 'dgmattribs',
+            'trackingSpeedAttributeID': 'dgmattribs',
+            'dischargeAttributeID': 'dgmattribs',
+            'rangeAttributeID': 'dgmattribs',
+            'falloffAttributeID': 'dgmattribs',
+            'fittingUsageChanceAttributeID': 'dgmattribs'
+        },
+        'dgmexpressions': {
+            'arg1': 'dgmexpressions',
+            'arg2': 'dgmexpressions',
+            'expressionTypeID': 'evetypes',
+            'expressionGroupID': 'evegroups',
+            'expressionAttributeID': 'dgmattribs'
+        },
+        'dgmtypeattribs': {
+            'typeID': 'evetypes',
+            'attributeID': 'dgmattribs'
+        },
+        'dgmtypeeffects': {
+            'typeID': 'evetypes',
+            'effectID': 'dgmeffects'
+        },
+        'evetypes': {
+            'groupID': 'evegroups'
+        }
+    }
+
+    # Columns via which rows of tables are referenced; auxiliary
+    # tables, which do not define any entities, but map other
+    # entities to types or complement types with additional data,
+    # are referenced by types via type ID
+    # Format: {table name: column name}
+    _target_columns = {
+        'evetypes': 'typeID',
+        'evegroups': 'groupID',
+        'dgmattribs': 'attributeID',
+        'dgmeffects': 'effectID',
+        'dgmexpressions': 'expressionID',
+        'dgmtypeattribs': 'typeID',
+        'dgmtypeeffects': 'typeID'
+    }
+
     def _autocleanup(self):
         """
         Define auto-cleanup workflow.
         """
         self._kill_weak()
-        self._changed = True
-        # Cycle as long as we have changes during previous iteration.
-        # We need this because contents of even evetypes may change, which,
-        # by turn, will need to pull additional data into other tables
-        while self._changed is True:
-            self._changed = False
-            self._reanimate_auxiliary_friends()
-            self._reestablish_broken_relationships()
+        self._restore_reachable()
 
     def _kill_weak(self):
         """
         Trash all data which isn't marked as strong.
         """
         for table_name, table in self.data.items():
-            to_trash = set()
             strong_rows = self.strong_data.get(table_name, set())
-            to_trash.update(table.difference(strong_rows))
+            to_trash = set(table).difference(strong_rows)
             self._trash_data(table_name, to_trash)
 
-    def _reanimate_auxiliary_friends(self):
-        """
-        Restore rows in tables, which complement evetypes
-        or serve as m:n mapping between evetypes and other tables.
-        """
-        # As we filter whole database using evetypes table,
-        # gather evetype IDs we currently have in there
-        type_ids = set(row['typeID'] for row in self.data['evetypes'])
-        # Auxiliary tables are those which do not define
-        # any entities, they just map one entities to others
-        # or complement entities with additional data
-        aux_tables = ('dgmtypeattribs', 'dgmtypeeffects')
-        for table_name in aux_tables:
-            to_restore = set()
-            # Restore rows which map other entities to types
-            for row in self.trashed_data[table_name]:
-                if row['typeID'] in type_ids:
-                    to_restore.add(row)
-            if to_restore:
-                self._changed = True
-                self._restore_data(table_name, to_restore)
-
-    def _reestablish_broken_relationships(self):
+    def _restore_reachable(self):
         """
-        Restore all rows targeted by references of rows, which
-        exist in actual data.
+        Restore all trashed rows which can be reached from rows
+        left in data via references, in single breadth-first pass.
         """
-        # Container for 'target data', matches with which are
-        # going to be restored
-        # Format: {(target table name, target column name): {values to have}}}
-        tgt_data = {}
-        self._get_targets_relational(tgt_data)
-        self._get_targets_yaml(tgt_data)
-        # Now, when we have all the target data values, we may look for
-        # rows, which have matching values, and restore them
-        for tgt_spec, tgt_values in tgt_data.items():
-            tgt_table_name, tgt_column_name = tgt_spec
-            to_restore = set()
-            for row in self.trashed_data[tgt_table_name]:
-                if row.get(tgt_column_name) in tgt_values:
-                    to_restore.add(row)
-            if to_restore:
-                self._changed = True
+        # Index trashed rows by columns they are referenced by
+        # Format: {table name: {column value: [row positions]}}
+        trash_index = {}
+        for table_name, column_name in self._target_columns.items():
+            table_index = trash_index[table_name] = {}
+            column = self.data[table_name].get_column(column_name)
+            for row_pos in self.trashed_data.get(table_name, ()):
+                value = column[row_pos]
+                if value is None:
+                    continue
+                table_index.setdefault(value, []).append(row_pos)
+        # Columns of each table which reference other tables
+        # Format: {table name: ((target table name, column), ...)}
+        ref_columns = {}
+        for table_name, table in self.data.items():
+            table_ref_columns = []
+            for src_column_name, tgt_table_name in self._foreign_keys.get(table_name, {}).items():
+                table_ref_columns.append((tgt_table_name, table.get_column(src_column_name)))
+            if table_name == 'evetypes':
+                type_ids = table.get_column('typeID')
+                table_ref_columns.append(('dgmtypeattribs', type_ids))
+                table_ref_columns.append(('dgmtypeeffects', type_ids))
+            ref_columns[table_name] = table_ref_columns
+        effect_ids = self.data['dgmeffects'].get_column('effectID')
+        # Worklist with (table name, row position) tuples, rows in
+        # it are already in data, but their references are not
+        # processed
+        worklist = deque()
+        for table_name, table in self.data.items():
+            worklist.extend((table_name, row_pos) for row_pos in table)
+        while worklist:
+            table_name, row_pos = worklist.popleft()
+            references = [
+                (tgt_table_name, column[row_pos])
+                for tgt_table_name, column in ref_columns[table_name]
+            ]
+            if table_name == 'dgmeffects':
+                references.extend(self._get_modinfo_references(effect_ids[row_pos]))
+            for tgt_table_name, value in references:
+                # If there's no such field in a row or it is None,
+                # this is not a valid reference
+                if value is None:
+                    continue
+                # Each row can be restored only once, thus when
+                # bucket is reached, it is removed from index
+                to_restore = trash_index[tgt_table_name].pop(value, None)
+                if to_restore is None:
+                    continue
                 self._restore_data(tgt_table_name, to_restore)
+                worklist.extend((tgt_table_name, restored_row_pos) for restored_row_pos in to_restore)
 
-    def _get_targets_relational(self, tgt_data):
-        """
-        Fill dictionary with target references taken from data
-        stored in relational format
+    def _get_modinfo_references(self, effect_id):
         """
-        # Format:
-        # {source table: {source column: (target table, target column)}}
-        foreign_keys = {
-            'dgmattribs': {
-                'maxAttributeID': ('dgmattribs', 'attributeID')
-            },
-            'dgmeffects': {
-                'preExpression': ('dgmexpressions', 'expressionID'),
-                'postExpression': ('dgmexpressions', 'expressionID'),
-                'durationAttributeID': ('dgmattribs', 'attributeID'),
-                'trackingSpeedAttributeID': ('dgmattribs', 'attributeID'),
-                'dischargeAttributeID': ('dgmattribs', 'attributeID'),
-                'rangeAttributeID': ('dgmattribs', 'attributeID'),
-                'falloffAttributeID': ('dgmattribs', 'attributeID'),
-                'fittingUsageChanceAttributeID': ('dgmattribs', 'attributeID')
-            },
-            'dgmexpressions': {
-                'arg1': ('dgmexpressions', 'expressionID'),
-                'arg2': ('dgmexpressions', 'expressionID'),
-                'expressionTypeID': ('evetypes', 'typeID'),
-                'expressionGroupID': ('evegroups', 'groupID'),
-                'expressionAttributeID': ('dgmattribs', 'attributeID')
-            },
-            'dgmtypeattribs': {
-                'typeID': ('evetypes', 'typeID'),
-                'attributeID': ('dgmattribs', 'attributeID')
-            },
-            'dgmtypeeffects': {
-                'typeID': ('evetypes', 'typeID'),
-                'effectID': ('dgmeffects', 'effectID')
-            },
-            'evetypes': {
-                'groupID': ('evegroups', 'groupID')
-            }
-        }
-        for src_table_name, table_fks in foreign_keys.items():
-            for src_column_name, fk_target in table_fks.items():
-                tgt_table_name, tgt_column_name = fk_target
-                for row in self.data[src_table_name]:
-                    fk_value = row.get(src_column_name)
-                    # If there's no such field in a row or it is None,
-                    # this is not a valid FK reference
-                    if fk_value is None:
-                        continue
-                    tgt_values = tgt_data.setdefault((tgt_table_name, tgt_column_name), set())
-                    tgt_values.add(fk_value)
+        Get references of effect to other rows, which are
+        defined in its modifier info.
 
-    def _get_targets_yaml(self, tgt_data):
-        """
-        Fill dictionary with target references taken from data
-        stored in YAML format
+        Required arguments:
+        effect_id -- ID of effect
+
+        Return value:
+        Iterable with (target table name, target column value) tuples
         """
-        for effect_row in self.data['dgmeffects']:
-            effect_id = effect_row['effectID']
-            try:
-                types, groups, attrs = self._yaml_modinfo_relations[effect_id]
-            except KeyError:
-                continue
-            for references, tgt_table_name, tgt_column_name in (
-                (types, 'evetypes', 'typeID'),
-                (groups, 'evegroups', 'groupID'),
-                (attrs, 'dgmattribs', 'attributeID')
-            ):
-                # If there're any references for given entity, add them to
-                # dictionary
-                if len(references) > 0:
-                    tgt_values = tgt_data.setdefault((tgt_table_name, tgt_column_name), set())
-                    tgt_values.update(references)
+        try:
+            types, groups, attrs = self._yaml_modinfo_relations[effect_id]
+        except KeyError:
+            return ()
+        references = []
+        references.extend(('evetypes', type_id) for type_id in types)
+        references.extend(('evegroups', group_id) for group_id in groups)
+        references.extend(('dgmattribs', attr_id) for attr_id in attrs)
+        return references
 
     @CachedProperty
     def _yaml_modinfo_relations(self):
         """
         Generate auxiliary map to avoid re-parsing YAML
-        on each cleanup cycle. It is used when collecting
-        data about references from modifier info YAMLs.
+        for each effect. It is used when collecting data
+        about references from modifier info YAMLs.
         """
 
         # Helper function to fetch actual attribute values
@@ -244,14 +261,17 @@ class Cleaner:
         relations = {}
         # Cycle through both data and trashed data, to make sure all rows are
         # processed regardless of stage during which this property is accessed
-        for effect_row in chain(self.data['dgmeffects'], self.trashed_data['dgmeffects']):
+        dgmeffects = self.data['dgmeffects']
+        effect_ids = dgmeffects.get_column('effectID')
+        modinfo_column = dgmeffects.get_column('modifierInfo')
+        for row_pos in chain(dgmeffects, self.trashed_data['dgmeffects']):
             # We do not need anything here if modifier info is empty
-            modinfos_yaml = effect_row.get('modifierInfo')
+            modinfos_yaml = modinfo_column[row_pos]
             if modinfos_yaml is None:
                 continue
             # Skip row in case of any YAML parsing errors
             try:
-                modinfos = yaml.safe_load(modinfos_yaml)
+                modinfos = self.yaml_cache.load(modinfos_yaml)
             except KeyboardInterrupt:
                 raise
             except:
@@ -274,7 +294,7 @@ class Cleaner:
                 continue
             # Otherwise, add all the data we've gathered for current
             # effect to container
-            relations[effect_row['effectID']] = (types, groups, attrs)
+            relations[effect_ids[row_pos]] = (types, groups, attrs)
         return relations
 
     def _report_results(self):
@@ -296,42 +316,40 @@ class Cleaner:
             msg = 'cleaned: {}'.format(', '.join(table_msgs))
             logger.info(msg)
 
-    def _pump_data(self, table_name, datarows):
+    def _pump_data(self, table_name, row_positions):
         """
         Auxiliary method, mark data rows as strong.
 
         Required arguments:
         table_name -- name of table for which we're pumping data
-        datarows -- set with rows to pump
+        row_positions -- set with positions of rows to pump
         """
         strong_rows = self.strong_data.setdefault(table_name, set())
-        strong_rows.update(datarows)
+        strong_rows.update(row_positions)
 
-    def _trash_data(self, table_name, datarows):
+    def _trash_data(self, table_name, row_positions):
         """
         Auxiliary method, mark data rows as pending removal.
 
         Required arguments:
         table_name -- name of table for which we're removing data
-        datarows -- set with rows to remove
+        row_positions -- set with positions of rows to remove
         """
-        data_table = self.data[table_name]
         trash_table = self.trashed_data.setdefault(table_name, set())
         # Update both trashed data and source data
-        trash_table.update(datarows)
-        data_table.difference_update(datarows)
+        trash_table.update(row_positions)
+        self.data[table_name].remove(row_positions)
 
-    def _restore_data(self, table_name, datarows):
+    def _restore_data(self, table_name, row_positions):
         """
         Auxiliary method, move data from trash back to actual
         data container.
 
         Required arguments:
         table_name -- name of table for which we're restoring data
-        datarows -- set with rows to restore
+        row_positions -- iterable with positions of rows to restore
         """
-        data_table = self.data[table_name]
         trash_table = self.trashed_data[table_name]
         # Update both trashed data and source data
-        data_table.update(datarows)
-        trash_table.difference_update(datarows)
+        trash_table.difference_update(row_positions)
+        self.data[table_name].restore(row_positions)
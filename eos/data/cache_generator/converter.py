@@ -19,12 +19,18 @@
 # ===============================================================================
 
 
+import math
+import os
 import re
-from logging import getLogger
+from concurrent.futures import ProcessPoolExecutor
+from logging import Formatter, Handler, getLogger
 
 from eos.const.eve import Attribute, Operand
 from eos.util.frozen_dict import FrozenDict
+from . import modifier_builder
+from .build_state import EffectDigester
 from .modifier_builder import ModifierBuilder
+from .modifier_builder.expression_tree import MemoStats
 
 
 logger = getLogger(__name__)
@@ -35,8 +41,22 @@ class Converter:
     Class responsible for transforming data structure,
     like moving data around or converting whole data
     structure.
+
+    Optional arguments:
+    workers -- amount of processes to build modifiers in;
+    if None or 1, modifiers are built in current process
+    (default None)
+    tree_memo -- if True, results of conversion of expression
+    subtrees are memoized during modifier building; counters of
+    memoization are written to tree_memo_stats attribute of
+    converter (default False)
     """
 
+    def __init__(self, workers=None, tree_memo=False):
+        self._workers = workers
+        self._tree_memo = tree_memo
+        self.tree_memo_stats = None
+
     def normalize(self, data):
         """ Make data more consistent."""
         self.data = data
@@ -60,41 +80,38 @@ class Converter:
         # defined in table
         defined_pairs = set()
         dgmtypeattribs = self.data['dgmtypeattribs']
-        for row in dgmtypeattribs:
-            if row['attributeID'] not in attr_ids:
+        attrib_type_ids = dgmtypeattribs.get_column('typeID')
+        attrib_attr_ids = dgmtypeattribs.get_column('attributeID')
+        for row_pos in dgmtypeattribs:
+            if attrib_attr_ids[row_pos] not in attr_ids:
                 continue
-            defined_pairs.add((row['typeID'], row['attributeID']))
+            defined_pairs.add((attrib_type_ids[row_pos], attrib_attr_ids[row_pos]))
         attrs_skipped = 0
-        new_evetypes = set()
-        # Cycle through all evetypes, for each row moving each its field
-        # either to different table or container for updated rows
-        for row in self.data['evetypes']:
-            type_id = row['typeID']
-            new_row = {}
-            for field, value in row.items():
-                if field in atrrib_map:
-                    # If row didn't have such attribute defined, skip it
-                    if value is None:
-                        continue
-                    # If such attribute already exists in dgmtypeattribs,
-                    # do not modify it - values from dgmtypeattribs table
-                    # have priority
-                    attr_id = atrrib_map[field]
-                    if (type_id, attr_id) in defined_pairs:
-                        attrs_skipped += 1
-                        continue
-                    # Generate row and add it to proper attribute table
-                    dgmtypeattribs.add(FrozenDict({
-                        'typeID': type_id,
-                        'attributeID': attr_id,
-                        'value': value
-                    }))
-                else:
-                    new_row[field] = value
-            new_evetypes.add(FrozenDict(new_row))
-        # Update evetypes with rows which do not contain attributes
-        self.data['evetypes'].clear()
-        self.data['evetypes'].update(new_evetypes)
+        evetypes = self.data['evetypes']
+        type_ids = evetypes.get_column('typeID')
+        # Cycle through all attribute columns of evetypes, moving
+        # their values to attribute table, and then remove them
+        for field, attr_id in atrrib_map.items():
+            values = evetypes.get_column(field)
+            for row_pos in evetypes:
+                value = values[row_pos]
+                # If row didn't have such attribute defined, skip it
+                if value is None:
+                    continue
+                # If such attribute already exists in dgmtypeattribs,
+                # do not modify it - values from dgmtypeattribs table
+                # have priority
+                type_id = type_ids[row_pos]
+                if (type_id, attr_id) in defined_pairs:
+                    attrs_skipped += 1
+                    continue
+                # Generate row and add it to proper attribute table
+                dgmtypeattribs.add_row({
+                    'typeID': type_id,
+                    'attributeID': attr_id,
+                    'value': value
+                })
+            evetypes.drop_column(field)
         if attrs_skipped > 0:
             msg = '{} built-in attributes already have had value in dgmtypeattribs and were skipped'.format(
                 attrs_skipped)
@@ -117,9 +134,11 @@ class Converter:
         for entry in replacement_desc:
             entity_table, id_column, symname_column, tgt_column, operand = entry
             name_id_map = {}
-            for entity_row in sorted(data[entity_table], key=lambda row: row['table_pos']):
-                entity_id = entity_row[id_column]
-                entity_name_normal = entity_row.get(symname_column)
+            entity_ids = data[entity_table].get_column(id_column)
+            entity_names = data[entity_table].get_column(symname_column)
+            for entity_row_pos in data[entity_table]:
+                entity_id = entity_ids[entity_row_pos]
+                entity_name_normal = entity_names[entity_row_pos]
                 if not entity_name_normal:
                     continue
                 ids_normal = name_id_map.setdefault(entity_name_normal, [])
@@ -135,14 +154,19 @@ class Converter:
             # Set to keep symbolic names about which we've already
             # logged warnings
             warned_conflicts = set()
+            operand_ids = dgmexpressions.get_column('operandID')
+            exp_entity_ids = dgmexpressions.get_column(tgt_column)
+            exp_values = dgmexpressions.get_column('expressionValue')
             # We're modifying only rows with specific operands
-            for exp_row in filter(lambda r: r['operandID'] == operand, dgmexpressions):
-                exp_entity_id = exp_row[tgt_column]
+            for exp_row_pos in dgmexpressions:
+                if operand_ids[exp_row_pos] != operand:
+                    continue
+                exp_entity_id = exp_entity_ids[exp_row_pos]
                 # If entity is already referenced via ID, nothing
                 # to do here
                 if exp_entity_id is not None:
                     continue
-                sym_name = exp_row['expressionValue']
+                sym_name = exp_values[exp_row_pos]
                 # If we don't have expression value in our name-id map,
                 # then we can't help anyhow too
                 if sym_name not in name_id_map:
@@ -156,15 +180,8 @@ class Converter:
                             id_column, sym_name, ', '.join(str(i) for i in repl_ids), repl_id)
                         logger.warning(msg)
                         warned_conflicts.add(sym_name)
-                # As rows are frozen dicts, we compose new mutable dict, update
-                # data there, freeze it, and add to replacement maps
-                new_exp_row = {}
-                new_exp_row.update(exp_row)
-                new_exp_row['expressionValue'] = None
-                new_exp_row[tgt_column] = repl_id
-                new_exp_row = FrozenDict(new_exp_row)
-                dgmexpressions.remove(exp_row)
-                dgmexpressions.add(new_exp_row)
+                dgmexpressions.set(exp_row_pos, 'expressionValue', None)
+                dgmexpressions.set(exp_row_pos, tgt_column, repl_id)
                 successes += 1
         # Report results to log, it will help to indicate when CCP finally stops
         # using literal references, and we can get rid of this conversion
@@ -172,13 +189,36 @@ class Converter:
             successes, failures)
         logger.info(msg)
 
-    def convert(self, data):
+    # Fields of modifier rows, in order they are stored in build state
+    _modifier_fields = (
+        'state',
+        'scope',
+        'src_attr',
+        'operator',
+        'tgt_attr',
+        'domain',
+        'filter_type',
+        'filter_value'
+    )
+
+    def convert(self, data, build_state=None, yaml_cache=None):
         """
         Convert database-like data structure to eos-
-        specific one.
+        specific one. Results of modifier building are
+        written to build_state attribute of converter.
+
+        Optional arguments:
+        build_state -- results of modifier building from
+        previous run; modifiers of effects, whose input data
+        didn't change, are taken from there instead of being
+        built again. Format: {effect ID: (digest, build
+        status, (modifier fields, ...))}
+        yaml_cache -- YamlCache object to parse modifier infos
+        with (default None)
         """
+        self._yaml_cache = yaml_cache
         data = self._assemble(data)
-        self._build_modifiers(data)
+        self.build_state = self._build_modifiers(data, build_state or {})
         return data
 
     def _assemble(self, data):
@@ -188,41 +228,34 @@ class Converter:
         """
         # Before actually generating rows, we need to collect
         # some data in convenient form
-        # Format: {type ID: type row}
-        dgmeffects_keyed = {}
-        for row in data['dgmeffects']:
-            dgmeffects_keyed[row['effectID']] = row
-        # Format: {group ID: group row}
-        evegroups_keyed = {}
-        for row in data['evegroups']:
-            evegroups_keyed[row['groupID']] = row
+        # Format: {group ID: category ID}
+        group_categories = {}
+        for group_id, category_id in data['evegroups'].iter_values('groupID', 'categoryID'):
+            group_categories[group_id] = category_id
         # Format: {type ID: default effect ID}
         type_defeff_map = {}
-        for row in data['dgmtypeeffects']:
-            if row.get('isDefault') is True:
-                type_defeff_map[row['typeID']] = row['effectID']
         # Format: {type ID: [effect IDs]}
         type_effects = {}
-        for row in data['dgmtypeeffects']:
-            type_effects_row = type_effects.setdefault(row['typeID'], [])
-            type_effects_row.append(row['effectID'])
+        for type_id, effect_id, is_default in data['dgmtypeeffects'].iter_values('typeID', 'effectID', 'isDefault'):
+            if is_default is True:
+                type_defeff_map[type_id] = effect_id
+            type_effects_row = type_effects.setdefault(type_id, [])
+            type_effects_row.append(effect_id)
         # Format: {type ID: {attr ID: value}}
         type_attribs = {}
-        for row in data['dgmtypeattribs']:
-            type_attribs_row = type_attribs.setdefault(row['typeID'], {})
-            type_attribs_row[row['attributeID']] = row['value']
+        for type_id, attr_id, value in data['dgmtypeattribs'].iter_values('typeID', 'attributeID', 'value'):
+            type_attribs_row = type_attribs.setdefault(type_id, {})
+            type_attribs_row[attr_id] = value
 
         # We will build new data structure from scratch
         assembly = {}
 
         types = []
-        for row in data['evetypes']:
-            type_id = row['typeID']
-            group = row.get('groupID')
+        for type_id, group in data['evetypes'].iter_values('typeID', 'groupID'):
             type_ = {
                 'type_id': type_id,
                 'group': group,
-                'category': evegroups_keyed.get(group, {}).get('categoryID'),
+                'category': group_categories.get(group),
                 'effects': type_effects.get(type_id, []),
                 'attributes': type_attribs.get(type_id, {}),
                 'default_effect': type_defeff_map.get(type_id)
@@ -231,48 +264,80 @@ class Converter:
         assembly['types'] = types
 
         attributes = []
-        for row in data['dgmattribs']:
+        for attr_id, max_attr, default_value, high_is_good, stackable in data['dgmattribs'].iter_values(
+            'attributeID', 'maxAttributeID', 'defaultValue', 'highIsGood', 'stackable'
+        ):
             attribute = {
-                'attribute_id': row['attributeID'],
-                'max_attribute': row.get('maxAttributeID'),
-                'default_value': row.get('defaultValue'),
-                'high_is_good': row.get('highIsGood'),
-                'stackable': row.get('stackable')
+                'attribute_id': attr_id,
+                'max_attribute': max_attr,
+                'default_value': default_value,
+                'high_is_good': high_is_good,
+                'stackable': stackable
             }
             attributes.append(attribute)
         assembly['attributes'] = attributes
 
+        # Format: ((effect field name, dgmeffects column name), ...)
+        effect_fields = (
+            ('effect_id', 'effectID'),
+            ('effect_category', 'effectCategory'),
+            ('is_offensive', 'isOffensive'),
+            ('is_assistance', 'isAssistance'),
+            ('duration_attribute', 'durationAttributeID'),
+            ('discharge_attribute', 'dischargeAttributeID'),
+            ('range_attribute', 'rangeAttributeID'),
+            ('falloff_attribute', 'falloffAttributeID'),
+            ('tracking_speed_attribute', 'trackingSpeedAttributeID'),
+            ('fitting_usage_chance_attribute', 'fittingUsageChanceAttributeID'),
+            ('pre_expression', 'preExpression'),
+            ('post_expression', 'postExpression'),
+            ('modifier_info', 'modifierInfo')
+        )
+        field_names, column_names = zip(*effect_fields)
         effects = []
-        assembly['effects'] = []
-        for row in data['dgmeffects']:
-            effect = {
-                'effect_id': row['effectID'],
-                'effect_category': row.get('effectCategory'),
-                'is_offensive': row.get('isOffensive'),
-                'is_assistance': row.get('isAssistance'),
-                'duration_attribute': row.get('durationAttributeID'),
-                'discharge_attribute': row.get('dischargeAttributeID'),
-                'range_attribute': row.get('rangeAttributeID'),
-                'falloff_attribute': row.get('falloffAttributeID'),
-                'tracking_speed_attribute': row.get('trackingSpeedAttributeID'),
-                'fitting_usage_chance_attribute': row.get('fittingUsageChanceAttributeID'),
-                'pre_expression': row.get('preExpression'),
-                'post_expression': row.get('postExpression'),
-                'modifier_info': row.get('modifierInfo')
-            }
-            effects.append(effect)
+        for values in data['dgmeffects'].iter_values(*column_names):
+            effects.append(dict(zip(field_names, values)))
         assembly['effects'] = effects
 
-        assembly['expressions'] = list(data['dgmexpressions'])
+        assembly['expressions'] = data['dgmexpressions'].get_rows()
 
         return assembly
 
-    def _build_modifiers(self, data):
+    def _build_modifiers(self, data, build_state):
         """
         Replace expressions with generated out of
         them modifiers.
+
+        Required arguments:
+        data -- assembled data
+        build_state -- results of modifier building from
+        previous run
+
+        Return value:
+        Results of modifier building of this run
         """
-        builder = ModifierBuilder(data['expressions'])
+        digester = EffectDigester(data['expressions'])
+        # Reused modifiers must refer existing attributes only,
+        # otherwise effect is built anew
+        attr_ids = set(row['attribute_id'] for row in data['attributes'])
+        # Sort rows by ID so we numerate modifiers in deterministic way
+        effect_rows = sorted(data['effects'], key=lambda row: row['effect_id'])
+        # Format: {effect ID: digest}
+        digests = {}
+        # Format: {effect ID: ([modifier rows], build status)}
+        built = {}
+        effect_rows_to_build = []
+        for effect_row in effect_rows:
+            effect_id = effect_row['effect_id']
+            digest = digests[effect_id] = digester.get_digest(effect_row)
+            frozen_modifiers = self._get_built_modifiers(build_state.get(effect_id), digest, attr_ids)
+            if frozen_modifiers is not None:
+                built[effect_id] = (frozen_modifiers, build_state[effect_id][1])
+            else:
+                effect_rows_to_build.append(effect_row)
+        reused = len(built)
+        built.update(self._run_builder(data['expressions'], effect_rows_to_build))
+        new_build_state = {}
         # Lists effects, which are using given modifier
         # Format: {modifier row: [effect IDs]}
         modifier_effect_map = {}
@@ -280,26 +345,31 @@ class Converter:
         # Format: {modifier row: modifier ID}
         modifier_id_map = {}
         modifier_id = 1
-        # Sort rows by ID so we numerate modifiers in deterministic way
-        for effect_row in sorted(data['effects'], key=lambda row: row['effect_id']):
-            modifiers, build_status = builder.build(effect_row)
+        for effect_row in effect_rows:
+            effect_id = effect_row['effect_id']
+            frozen_modifiers, build_status = built[effect_id]
+            new_build_state[effect_id] = (
+                digests[effect_id], build_status,
+                tuple(tuple(m[field] for field in self._modifier_fields) for m in frozen_modifiers)
+            )
             # Update effects: add modifier build status and remove
             # fields which we needed only for this process
             effect_row['build_status'] = build_status
             del effect_row['pre_expression']
             del effect_row['post_expression']
             del effect_row['modifier_info']
-            for modifier in modifiers:
-                # Convert modifiers into frozen datarows to use
-                # them in conversion process
-                frozen_modifier = self._freeze_modifier(modifier)
+            for frozen_modifier in frozen_modifiers:
                 # Gather data about which effects use which modifier
                 used_by_effects = modifier_effect_map.setdefault(frozen_modifier, [])
-                used_by_effects.append(effect_row['effect_id'])
+                used_by_effects.append(effect_id)
                 # Assign ID only to each unique modifier
                 if frozen_modifier not in modifier_id_map:
                     modifier_id_map[frozen_modifier] = modifier_id
                     modifier_id += 1
+        if build_state:
+            msg = 'modifiers of {} effects reused, {} effects built'.format(
+                reused, len(new_build_state) - reused)
+            logger.info(msg)
 
         # Compose reverse to modifier_effect_map dictionary
         # Format: {effect ID: [modifier rows]}
@@ -325,25 +395,179 @@ class Converter:
             modifier['modifier_id'] = modifier_id
             modifiers.append(modifier)
         data['modifiers'] = modifiers
+        return new_build_state
+
+    def _run_builder(self, expressions, effect_rows):
+        """
+        Build modifiers of effects, in worker processes
+        if converter is configured to use them.
+
+        Required arguments:
+        expressions -- iterable with expression rows
+        effect_rows -- list with rows of effects to build
+
+        Return value:
+        Dictionary in {effect ID: ([modifier rows], build
+        status)} format
+        """
+        built = {}
+        self.tree_memo_stats = MemoStats() if self._tree_memo is True else None
+        if self._workers is None or self._workers <= 1 or not effect_rows:
+            builder = ModifierBuilder(expressions, yaml_cache=self._yaml_cache, tree_memo=self._tree_memo)
+            for effect_row in effect_rows:
+                modifiers, build_status = builder.build(effect_row)
+                # Convert modifiers into frozen datarows to use
+                # them in conversion process
+                frozen_modifiers = [self._freeze_modifier(modifier) for modifier in modifiers]
+                built[effect_row['effect_id']] = (frozen_modifiers, build_status)
+            if self.tree_memo_stats is not None:
+                self.tree_memo_stats.merge(builder.tree_memo_stats)
+            return built
+        # Split effects into several chunks per worker, to
+        # even out load when some chunks are built slower
+        chunk_size = max(1, math.ceil(len(effect_rows) / (self._workers * 4)))
+        chunks = [effect_rows[i:i + chunk_size] for i in range(0, len(effect_rows), chunk_size)]
+        # Expressions and already parsed modifier infos are shipped
+        # to each worker only once, when it is started; results are
+        # received in order of chunks
+        # Each worker has its own memo; its counters are cumulative,
+        # thus the latest ones of each worker are kept
+        # Format: {worker process ID: MemoStats}
+        worker_memo_stats = {}
+        # Workers collect log records of modifier builder, and they
+        # are emitted here, so that log looks the same as after
+        # building in current process
+        log_level = getLogger(modifier_builder.__name__).getEffectiveLevel()
+        with ProcessPoolExecutor(
+            max_workers=self._workers, initializer=_init_worker,
+            initargs=(expressions, self._yaml_cache, self._tree_memo, log_level)
+        ) as executor:
+            for chunk, chunk_output in zip(chunks, executor.map(_build_effects, chunks)):
+                chunk_results, worker_pid, memo_stats, log_records = chunk_output
+                worker_memo_stats[worker_pid] = memo_stats
+                for log_record in log_records:
+                    record_logger = getLogger(log_record.name)
+                    if record_logger.isEnabledFor(log_record.levelno):
+                        record_logger.handle(log_record)
+                for effect_row, (modifiers_values, build_status) in zip(chunk, chunk_results):
+                    frozen_modifiers = [
+                        FrozenDict(zip(self._modifier_fields, modifier_values))
+                        for modifier_values in modifiers_values
+                    ]
+                    built[effect_row['effect_id']] = (frozen_modifiers, build_status)
+        if self.tree_memo_stats is not None:
+            for memo_stats in worker_memo_stats.values():
+                self.tree_memo_stats.merge(memo_stats)
+        return built
+
+    def _get_built_modifiers(self, effect_state, digest, attr_ids):
+        """
+        Get modifiers of effect built during previous run.
+
+        Required arguments:
+        effect_state -- results of building for effect from
+        previous run, or None
+        digest -- digest of current effect's input data
+        attr_ids -- set with IDs of existing attributes
+
+        Return value:
+        List with frozen modifier rows, or None if effect
+        has to be built
+        """
+        if effect_state is None or effect_state[0] != digest:
+            return None
+        frozen_modifiers = []
+        for modifier_values in effect_state[2]:
+            modifier_row = dict(zip(self._modifier_fields, modifier_values))
+            if modifier_row['src_attr'] not in attr_ids or modifier_row['tgt_attr'] not in attr_ids:
+                return None
+            frozen_modifiers.append(FrozenDict(modifier_row))
+        return frozen_modifiers
 
     def _freeze_modifier(self, modifier):
         """
         Converts modifier into frozendict with its keys and
         values assigned according to modifier's ones.
         """
-        # Fields which we need to write into row
-        fields = (
-            'state',
-            'scope',
-            'src_attr',
-            'operator',
-            'tgt_attr',
-            'domain',
-            'filter_type',
-            'filter_value'
-        )
         modifier_row = {}
-        for field in fields:
+        for field in self._modifier_fields:
             modifier_row[field] = getattr(modifier, field)
         frozen_row = FrozenDict(modifier_row)
         return frozen_row
+
+
+class _RecordCollector(Handler):
+    """
+    Log handler which keeps records in worker process, so that
+    they can be passed to parent process.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        # Arguments and exception info may be not picklable, thus
+        # they are merged into message, like QueueHandler does
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+# Modifier builder of worker process
+_worker_builder = None
+# Keeps log records of modifier builder of worker process
+_worker_log_collector = None
+
+
+def _init_worker(expressions, yaml_cache, tree_memo, log_level):
+    """
+    Initialize worker process of parallel modifier building.
+
+    Required arguments:
+    expressions -- iterable with expression rows
+    yaml_cache -- YamlCache object to parse modifier infos with
+    tree_memo -- flag which controls memoization of expression
+    subtree conversion
+    log_level -- effective level of modifier builder logger in
+    parent process
+    """
+    global _worker_builder, _worker_log_collector
+    _worker_builder = ModifierBuilder(expressions, yaml_cache=yaml_cache, tree_memo=tree_memo)
+    _worker_log_collector = _RecordCollector()
+    # Records are not passed to handlers of worker process (which,
+    # when it is forked, has copies of parent's handlers), they
+    # are emitted by parent process
+    builder_logger = getLogger(modifier_builder.__name__)
+    builder_logger.handlers = [_worker_log_collector]
+    builder_logger.propagate = False
+    builder_logger.setLevel(log_level)
+
+
+def _build_effects(effect_rows):
+    """
+    Build modifiers of effects in worker process.
+
+    Required arguments:
+    effect_rows -- list with rows of effects to build
+
+    Return value:
+    Tuple with list of ((modifier fields, ...), build status)
+    tuples in order of passed effect rows, worker process ID,
+    cumulative memoization counters of worker (or None), and
+    list with log records emitted while building
+    """
+    results = []
+    for effect_row in effect_rows:
+        modifiers, build_status = _worker_builder.build(effect_row)
+        modifiers_values = tuple(
+            tuple(getattr(modifier, field) for field in Converter._modifier_fields)
+            for modifier in modifiers
+        )
+        results.append((modifiers_values, build_status))
+    log_records = _worker_log_collector.records
+    _worker_log_collector.records = []
+    return results, os.getpid(), _worker_builder.tree_memo_stats, log_records
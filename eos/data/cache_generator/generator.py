@@ -19,40 +19,66 @@
 # ===============================================================================
 
 
-from eos.util.frozen_dict import FrozenDict
+from logging import getLogger
+
+from eos import __version__ as eos_version
 from .checker import Checker
 from .cleaner import Cleaner
 from .converter import Converter
+from .table import Table
+from .yaml_cache import YamlCache
+
+
+logger = getLogger(__name__)
+
+
+# Version of generator state format
+STATE_VERSION = 1
 
 
 class CacheGenerator:
     """
     Refactors and optimizes data into format suitable
     for Eos.
+
+    Optional arguments:
+    workers -- amount of processes to build modifiers in;
+    if None or 1, modifiers are built in current process
+    (default None)
+    tree_memo -- if True, results of conversion of expression
+    subtrees are memoized during modifier building, and counters
+    of memoization are logged (default False)
     """
 
-    def __init__(self):
+    def __init__(self, workers=None, tree_memo=False):
         self._checker = Checker()
         self._cleaner = Cleaner()
-        self._converter = Converter()
+        self._converter = Converter(workers=workers, tree_memo=tree_memo)
+        self.__state = None
 
-    def run(self, data_handler):
+    def run(self, data_handler, state=None):
         """
         Generate cache out of passed data.
 
         Required arguments:
         data_handler - data handler to use for getting data
 
+        Optional arguments:
+        state -- generator state returned by get_state() after
+        previous run; it allows to skip building of modifiers
+        for effects whose data didn't change. If state is
+        malformed or produced by different version of Eos,
+        full build is run (default None)
+
         Return value:
         Dictionary in {entity type: [{field name: field value}]
         format
         """
         # Put all the data we need into single dictionary
         # Format, as usual, {table name: table}, where table
-        # is set of rows, which are represented by frozendicts
-        # {fieldName: fieldValue}. Combination of sets and
-        # frozendicts is used to speed up several stages of
-        # the generator.
+        # is columnar Table object. Rows are identified by their
+        # positions in table, which allows to avoid creation of
+        # object per row during further generator stages.
         data = {}
         tables = {
             'evetypes': data_handler.get_evetypes,
@@ -65,19 +91,16 @@ class CacheGenerator:
         }
 
         for tablename, method in tables.items():
-            table_pos = 0
-            # For faster processing of various operations,
-            # freeze table rows and put them into set
-            table = set()
-            for row in method():
+            table = Table()
+            for table_pos, row in enumerate(method()):
                 # During  further generator stages. some of rows
                 # may fall in risk groups, where all rows but one
-                # need to be removed. To deterministically remove rows
-                # based on position in original data, write position
-                # to each row
-                row['table_pos'] = table_pos
-                table_pos += 1
-                table.add(FrozenDict(row))
+                # need to be removed. Rows are processed in order
+                # of their positions in table, which is the order
+                # of original data; position is also written to
+                # each row, to keep it in rows composed from table
+                table.add_row(row)
+                table.set(table_pos, 'table_pos', table_pos)
             data[tablename] = table
 
         # Run pre-cleanup checks, as cleaning and further stages
@@ -88,15 +111,75 @@ class CacheGenerator:
         # more consistent, and thus easier to clean properly
         self._converter.normalize(data)
 
+        # Modifier infos are needed both for cleanup and for
+        # modifier building, parse each of them only once
+        yaml_cache = YamlCache()
+
         # Clean our container out of unwanted data
-        self._cleaner.clean(data)
+        self._cleaner.clean(data, yaml_cache=yaml_cache)
 
         # Verify that our data is ready for conversion
         self._checker.pre_convert(data)
 
         # Convert data into Eos-specific format. Here tables are
-        # no longer represented by sets of frozendicts, but by
+        # no longer represented by columnar tables, but by
         # list of dicts
-        data = self._converter.convert(data)
+        data = self._converter.convert(data, build_state=self.__load_build_state(state), yaml_cache=yaml_cache)
+        if yaml_cache.parse_count > 0:
+            msg = '{} unique modifier info YAMLs parsed in {:.3f} s'.format(
+                yaml_cache.parse_count, yaml_cache.parse_time)
+            logger.info(msg)
+        memo_stats = self._converter.tree_memo_stats
+        if memo_stats is not None:
+            msg = (
+                'expression subtree memo: {} subtrees converted, {} reused by ID, '
+                '{} reused by structure, {} node visits saved'
+            ).format(
+                memo_stats.subtrees_converted, memo_stats.id_hits,
+                memo_stats.structure_hits, memo_stats.nodes_saved)
+            logger.info(msg)
+        self.__state = {
+            'version': STATE_VERSION,
+            'eos_version': eos_version,
+            'effects': self._converter.build_state
+        }
 
         return data
+
+    def get_state(self):
+        """
+        Get state of generator after the last run, which can be
+        passed to the next run to make it faster. State is
+        JSON-serializable.
+
+        Return value:
+        Dictionary with state, or None if generator wasn't run
+        """
+        return self.__state
+
+    def __load_build_state(self, state):
+        """
+        Extract modifier build results from generator state.
+
+        Required arguments:
+        state -- generator state, possibly deserialized from
+        JSON, or None
+
+        Return value:
+        Dictionary in {effect ID: (digest, build status,
+        (modifier fields, ...))} format, or None if state
+        cannot be used
+        """
+        if state is None:
+            return None
+        try:
+            if state['version'] != STATE_VERSION or state['eos_version'] != eos_version:
+                logger.info('generator state is outdated, running full build')
+                return None
+            build_state = {}
+            for effect_id, (digest, build_status, modifiers) in state['effects'].items():
+                build_state[int(effect_id)] = (digest, build_status, tuple(tuple(m) for m in modifiers))
+        except (KeyError, TypeError, ValueError):
+            logger.warning('generator state is malformed, running full build')
+            return None
+        return build_state
@@ -27,11 +27,30 @@ class ModifierBuilder:
     """
     Class which is used for generating Eos modifiers out of
     effect data.
+
+    Required arguments:
+    expressions -- iterable with expression rows
+
+    Optional arguments:
+    yaml_cache -- YamlCache object to parse modifier infos
+    with (default None)
+    tree_memo -- if True, results of conversion of expression
+    subtrees are memoized and reused for equal subtrees
+    (default False)
     """
 
-    def __init__(self, expressions):
-        self._tree = Effect2Modifiers(expressions)
-        self._info = Info2Modifiers()
+    def __init__(self, expressions, yaml_cache=None, tree_memo=False):
+        self._tree = Effect2Modifiers(expressions, memoize=tree_memo)
+        self._info = Info2Modifiers(yaml_cache=yaml_cache)
+
+    @property
+    def tree_memo_stats(self):
+        """
+        Counters of expression subtree memoization, which
+        is used when building modifiers out of expression
+        trees; None if memoization is disabled.
+        """
+        return self._tree.memo_stats
 
     def build(self, effect_row):
         """
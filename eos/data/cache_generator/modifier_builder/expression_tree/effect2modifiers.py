@@ -36,10 +36,25 @@ class Effect2Modifiers:
     """
     Class which uses effects' expression trees to generate
     actual modifier objects used by Eos.
+
+    Required arguments:
+    expressions -- iterable with expression rows
+
+    Optional arguments:
+    memoize -- if True, results of conversion of expression
+    subtrees are memoized (default False)
     """
 
-    def __init__(self, expressions):
-        self._etree2actions = ETree2Actions(expressions)
+    def __init__(self, expressions, memoize=False):
+        self._etree2actions = ETree2Actions(expressions, memoize=memoize)
+
+    @property
+    def memo_stats(self):
+        """
+        Counters of expression subtree memoization, None
+        if memoization is disabled.
+        """
+        return self._etree2actions.memo_stats
 
     def convert(self, effect_row):
         """Generate Modifier objects out of passed data."""
@@ -19,25 +19,90 @@
 # ===============================================================================
 
 
+from copy import copy
+
 from eos.const.eos import Domain, Operator
 from eos.const.eve import Operand
+from eos.util.repr import make_repr_str
 from .action import Action
 from .exception import ETree2ActionError, ExpressionFetchError, ActionValidationError
 from .shared import operand_data, state_data
 
 
+class MemoStats:
+    """
+    Counters of expression subtree memoization.
+
+    subtrees_converted -- amount of subtrees which were actually
+    walked through
+    id_hits -- amount of subtrees taken from memo, which were
+    converted for the very same expression ID before
+    structure_hits -- amount of subtrees taken from memo, which
+    were converted for another expression with equal subtree
+    nodes_saved -- amount of expression nodes which would be
+    visited if subtrees taken from memo were walked through
+    """
+
+    def __init__(self):
+        self.subtrees_converted = 0
+        self.id_hits = 0
+        self.structure_hits = 0
+        self.nodes_saved = 0
+
+    def merge(self, other):
+        """
+        Add counters of other stats object to counters of this one.
+
+        Required arguments:
+        other -- MemoStats object
+        """
+        self.subtrees_converted += other.subtrees_converted
+        self.id_hits += other.id_hits
+        self.structure_hits += other.structure_hits
+        self.nodes_saved += other.nodes_saved
+
+    def __repr__(self):
+        spec = ['subtrees_converted', 'id_hits', 'structure_hits', 'nodes_saved']
+        return make_repr_str(self, spec)
+
+
 class ETree2Actions:
     """
     Class is responsible for converting tree of Expression objects (which
     aren't directly useful to us) into intermediate Action objects.
+
+    Required arguments:
+    expressions -- iterable with expression rows
+
+    Optional arguments:
+    memoize -- if True, results of conversion of meaningful subtrees
+    are memoized, and are reused when the same subtree is met again,
+    either via the same expression ID, or via another expression whose
+    subtree is structurally equal (default False)
     """
 
-    def __init__(self, expressions):
+    def __init__(self, expressions, memoize=False):
         # Modify expression data rows, so that expression rows are accessible
         # via expression IDs, and data in rows is accessible as attributes
         self._expressions = {}
         for exp_row in expressions:
             self._expressions[exp_row['expressionID']] = exp_row
+        # Each structurally unique subtree gets its own ID
+        # Format: {(node fields, arg1 structure ID, arg2 structure ID): structure ID}
+        self.__structure_ids = {}
+        # Format: {expression ID: structure ID}
+        self.__exp_structure_ids = {}
+        # Expressions for which structure ID is being calculated,
+        # used to detect reference cycles
+        self.__structure_pending = set()
+        # Format: {structure ID: ((actions, ...), skipped data flag,
+        #   exception, amount of nodes, expression ID)}
+        self.__memo = {} if memoize is True else None
+        # Amount of nodes visited during conversion, including
+        # nodes of subtrees taken from memo
+        self.__node_visits = 0
+        # Stay None when memoization is disabled
+        self.memo_stats = MemoStats() if memoize is True else None
 
     def convert(self, tree_root_id, effect_category_id):
         """
@@ -58,6 +123,15 @@ class ETree2Actions:
         # Run parsing process
         tree_root = self._get_exp(tree_root_id)
         self._generic(tree_root)
+        # Actions taken from memo are shared, while the rest of
+        # builder relies on identity of actions; thus make sure
+        # that each action occurs in results only once
+        if self.__memo is not None:
+            used_actions = set()
+            for i, action in enumerate(self._actions):
+                if action in used_actions:
+                    action = self._actions[i] = copy(action)
+                used_actions.add(action)
         # Validate generated actions
         for action in self._actions:
             if self.validate_action(action, effect_category_id) is not True:
@@ -65,7 +139,116 @@ class ETree2Actions:
         return self._actions, self._skipped_data
 
     def _generic(self, expression):
-        """Generic entry point, used if we expect passed node to be meaningful"""
+        """
+        Generic entry point, used if we expect passed node to be
+        meaningful. Conversion results are taken from memo, if
+        it is enabled and has them.
+        """
+        if self.__memo is None:
+            self._convert_generic(expression)
+            return
+        expression_id = expression.get('expressionID')
+        structure_id = self._get_structure_id(expression_id)
+        try:
+            actions, skipped_data, exception, node_amount, memo_exp_id = self.__memo[structure_id]
+        except KeyError:
+            actions, skipped_data, exception, node_amount = self.__convert_subtree(expression)
+            self.__memo[structure_id] = (actions, skipped_data, exception, node_amount, expression_id)
+            self.memo_stats.subtrees_converted += 1
+        else:
+            # Root node has been fetched already, the rest of
+            # subtree nodes are not visited
+            self.__node_visits += node_amount - 1
+            if memo_exp_id == expression_id:
+                self.memo_stats.id_hits += 1
+            else:
+                self.memo_stats.structure_hits += 1
+            self.memo_stats.nodes_saved += node_amount - 1
+        if exception is not None:
+            raise exception.with_traceback(None)
+        self._actions.extend(actions)
+        if skipped_data is True:
+            self._skipped_data = True
+
+    def __convert_subtree(self, expression):
+        """
+        Convert subtree starting at passed node.
+
+        Required arguments:
+        expression -- expression row of subtree root
+
+        Return value:
+        Tuple with actions, skipped data flag, exception raised
+        during conversion (or None), and amount of visited nodes
+        """
+        outer_actions = self._actions
+        outer_skipped_data = self._skipped_data
+        node_visits = self.__node_visits
+        self._actions = []
+        self._skipped_data = False
+        exception = None
+        try:
+            self._convert_generic(expression)
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            exception = e
+        actions = tuple(self._actions)
+        skipped_data = self._skipped_data
+        self._actions = outer_actions
+        self._skipped_data = outer_skipped_data
+        # Root node has been fetched before subtree conversion
+        node_amount = self.__node_visits - node_visits + 1
+        return actions, skipped_data, exception, node_amount
+
+    def _get_structure_id(self, expression_id):
+        """
+        Get ID of subtree structure; structurally equal subtrees
+        have the same ID, regardless of expression IDs.
+
+        Required arguments:
+        expression_id -- ID of subtree root
+
+        Return value:
+        Structure ID
+        """
+        try:
+            return self.__exp_structure_ids[expression_id]
+        except KeyError:
+            pass
+        expression = self._expressions.get(expression_id)
+        if expression is None:
+            # Error messages include ID of expression which
+            # cannot be fetched, thus it is part of structure
+            key = ('missing', expression_id)
+        elif expression_id in self.__structure_pending:
+            # Subtree with reference cycle is never equal
+            # to any other subtree
+            return ('cycle', expression_id)
+        else:
+            self.__structure_pending.add(expression_id)
+            # Do not make calls for already processed arguments
+            arg_structure_ids = []
+            for arg_id in (expression.get('arg1'), expression.get('arg2')):
+                arg_structure_id = self.__exp_structure_ids.get(arg_id)
+                if arg_structure_id is None:
+                    arg_structure_id = self._get_structure_id(arg_id)
+                arg_structure_ids.append(arg_structure_id)
+            key = (
+                expression.get('operandID'),
+                expression.get('expressionValue'),
+                expression.get('expressionTypeID'),
+                expression.get('expressionGroupID'),
+                expression.get('expressionAttributeID'),
+                *arg_structure_ids
+            )
+            self.__structure_pending.discard(expression_id)
+        structure_id = self.__structure_ids.setdefault(key, len(self.__structure_ids))
+        self.__exp_structure_ids[expression_id] = structure_id
+        return structure_id
+
+    def _convert_generic(self, expression):
+        """Convert meaningful node without use of memo."""
         operand_id = expression.get('operandID')
         try:
             operand_meta = operand_data[operand_id]
@@ -258,6 +441,7 @@ class ETree2Actions:
         return boolean
 
     def _get_exp(self, expression_id):
+        self.__node_visits += 1
         try:
             return self._expressions[expression_id]
         except KeyError:
@@ -18,11 +18,11 @@
 # ===============================================================================
 
 
-import yaml
 from logging import getLogger
 
 from eos.const.eos import State, Domain, EffectBuildStatus, Scope, FilterType, Operator
 from eos.const.eve import EffectCategory
+from eos.data.cache_generator.yaml_cache import YamlCache
 from eos.data.cache_object import Modifier
 from .exception import *
 
@@ -123,8 +123,17 @@ state_map = {
 class Info2Modifiers:
     """
     Parse modifierInfos into actual Modifier objects.
+
+    Optional arguments:
+    yaml_cache -- YamlCache object to parse modifier infos
+    with; if None, converter uses its own (default None)
     """
 
+    def __init__(self, yaml_cache=None):
+        if yaml_cache is None:
+            yaml_cache = YamlCache()
+        self._yaml_cache = yaml_cache
+
     def convert(self, effect_row):
         """
         Parse YAML and handle overall workflow and error handling
@@ -136,7 +145,7 @@ class Info2Modifiers:
             # Parse modifierInfo field (which is actually YAML)
             modifier_infos_yaml = effect_row['modifier_info']
             try:
-                modifier_infos = yaml.safe_load(modifier_infos_yaml)
+                modifier_infos = self._yaml_cache.load(modifier_infos_yaml)
             except KeyboardInterrupt:
                 raise
             except Exception:
@@ -0,0 +1,249 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+
+
+from itertools import compress
+
+
+class Table:
+    """
+    Columnar storage for rows of single data table. Values
+    of each column are kept in separate list, row is identified
+    by its position in these lists. Rows are not physically
+    removed, they are just marked as dead in row-alive bitmap,
+    thus positions of rows never change.
+
+    Cells of fields which source row didn't have are read
+    as None, but they are not included into rows composed
+    by get_row().
+
+    Optional arguments:
+    rows -- iterable with dictionaries, which are added
+    as rows to table
+    """
+
+    def __init__(self, rows=()):
+        # Format: {column name: [values]}
+        self.__columns = {}
+        # Positions of cells which are absent in source rows
+        # Format: {column name: {row positions}}
+        self.__absent = {}
+        # Row-alive bitmap
+        self.__alive = bytearray()
+        self.__alive_amount = 0
+        # Indexes which map value in column to position
+        # of alive row, built on demand
+        # Format: {column name: {value: row position}}
+        self.__indexes = {}
+        for row in rows:
+            self.add_row(row)
+
+    def add_row(self, row):
+        """
+        Add row to the end of table.
+
+        Required arguments:
+        row -- dictionary in {column name: value} format
+
+        Return value:
+        Position of added row
+        """
+        position = len(self.__alive)
+        columns = self.__columns
+        for column_name, value in row.items():
+            try:
+                columns[column_name].append(value)
+            except KeyError:
+                # Rows added before didn't have this field
+                columns[column_name] = [None] * position + [value]
+                self.__absent[column_name] = set(range(position))
+        if len(row) < len(columns):
+            for column_name, column in columns.items():
+                if len(column) == position:
+                    column.append(None)
+                    self.__absent[column_name].add(position)
+        self.__alive.append(1)
+        self.__alive_amount += 1
+        self.__indexes.clear()
+        return position
+
+    def get_column(self, column_name):
+        """
+        Get values of column. Values of dead rows are
+        included, thus list can be accessed using row
+        positions. List shouldn't be modified.
+
+        Required arguments:
+        column_name -- name of column to get
+
+        Return value:
+        List with column values; if table doesn't have
+        such column, list filled with None is returned
+        """
+        try:
+            return self.__columns[column_name]
+        except KeyError:
+            return [None] * len(self.__alive)
+
+    def get(self, position, column_name):
+        """
+        Get value of single cell.
+
+        Required arguments:
+        position -- position of row
+        column_name -- name of column
+
+        Return value:
+        Cell value, or None if there's no such column
+        """
+        try:
+            return self.__columns[column_name][position]
+        except KeyError:
+            return None
+
+    def set(self, position, column_name, value):
+        """
+        Set value of single cell.
+
+        Required arguments:
+        position -- position of row
+        column_name -- name of column
+        value -- new value of cell
+        """
+        try:
+            column = self.__columns[column_name]
+        except KeyError:
+            column = self.__columns[column_name] = [None] * len(self.__alive)
+            self.__absent[column_name] = set(range(len(self.__alive)))
+        column[position] = value
+        self.__absent[column_name].discard(position)
+        self.__indexes.pop(column_name, None)
+
+    def drop_column(self, column_name):
+        """
+        Remove column from table, if it exists.
+
+        Required arguments:
+        column_name -- name of column to remove
+        """
+        self.__columns.pop(column_name, None)
+        self.__absent.pop(column_name, None)
+        self.__indexes.pop(column_name, None)
+
+    def iter_values(self, *column_names):
+        """
+        Iterate over values of alive rows.
+
+        Required arguments:
+        column_names -- names of columns to take values from
+
+        Return value:
+        Iterable with (value, ...) tuples, one per alive row
+        """
+        columns = (compress(self.get_column(column_name), self.__alive) for column_name in column_names)
+        return zip(*columns)
+
+    def get_row(self, position):
+        """
+        Compose row out of table cells.
+
+        Required arguments:
+        position -- position of row
+
+        Return value:
+        Dictionary in {column name: value} format
+        """
+        row = {}
+        for column_name, column in self.__columns.items():
+            if position not in self.__absent[column_name]:
+                row[column_name] = column[position]
+        return row
+
+    def get_rows(self):
+        """
+        Compose all alive rows out of table cells.
+
+        Return value:
+        List with dictionaries in {column name: value} format
+        """
+        return [self.get_row(position) for position in self]
+
+    def remove(self, positions):
+        """
+        Mark rows as dead.
+
+        Required arguments:
+        positions -- iterable with positions of rows
+        """
+        alive = self.__alive
+        for position in positions:
+            if alive[position]:
+                alive[position] = 0
+                self.__alive_amount -= 1
+        self.__indexes.clear()
+
+    def restore(self, positions):
+        """
+        Mark rows as alive.
+
+        Required arguments:
+        positions -- iterable with positions of rows
+        """
+        alive = self.__alive
+        for position in positions:
+            if not alive[position]:
+                alive[position] = 1
+                self.__alive_amount += 1
+        self.__indexes.clear()
+
+    def is_alive(self, position):
+        """Check if row at passed position is alive."""
+        return bool(self.__alive[position])
+
+    def get_index(self, column_name):
+        """
+        Get index over primary key column. Index is kept
+        until table is modified.
+
+        Required arguments:
+        column_name -- name of column which uniquely
+        identifies rows
+
+        Return value:
+        Dictionary in {column value: position of alive row}
+        format
+        """
+        try:
+            return self.__indexes[column_name]
+        except KeyError:
+            pass
+        column = self.get_column(column_name)
+        index = {column[position]: position for position in self}
+        self.__indexes[column_name] = index
+        return index
+
+    def __iter__(self):
+        """Iterate over positions of alive rows, in order of addition."""
+        return compress(range(len(self.__alive)), self.__alive)
+
+    def __len__(self):
+        return self.__alive_amount
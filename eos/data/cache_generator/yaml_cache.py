@@ -0,0 +1,144 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+
+
+import re
+import time
+
+import yaml
+
+
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    _Loader = None
+
+
+# Plain scalars which YAML resolves into something other
+# than string
+_special_words = {
+    'null', 'Null', 'NULL',
+    'true', 'True', 'TRUE', 'false', 'False', 'FALSE',
+    'yes', 'Yes', 'YES', 'no', 'No', 'NO',
+    'on', 'On', 'ON', 'off', 'Off', 'OFF'
+}
+_line_pattern = re.compile(r'^(- |  )([A-Za-z_][A-Za-z0-9_]*):(?: (.*))?$')
+_int_pattern = re.compile(r'^-?(0|[1-9][0-9]*)$')
+_word_pattern = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+class YamlCache:
+    """
+    Parse each unique YAML text only once. Cache is meant to
+    be shared between generator stages during single run.
+
+    Simple list-of-maps documents, like modifier infos, are
+    parsed by restricted parser. Anything else is parsed by
+    libyaml's safe loader when it is available, and by
+    pure-Python safe loader otherwise.
+    """
+
+    def __init__(self):
+        # Format: {YAML text: (parsed data, exception)}
+        self.__parsed = {}
+        self.parse_time = 0
+
+    def load(self, text):
+        """
+        Get data out of YAML text.
+
+        Required arguments:
+        text -- YAML text
+
+        Return value:
+        Parsed data; it is shared between all callers, thus
+        it shouldn't be modified
+
+        Possible exceptions:
+        Any exception raised by YAML loader on this text
+        """
+        try:
+            data, exception = self.__parsed[text]
+        except KeyError:
+            start = time.perf_counter()
+            data = exception = None
+            try:
+                data = self.__parse(text)
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                exception = e
+            self.parse_time += time.perf_counter() - start
+            self.__parsed[text] = (data, exception)
+        if exception is not None:
+            raise exception
+        return data
+
+    @property
+    def parse_count(self):
+        """Amount of unique YAML texts which have been parsed."""
+        return len(self.__parsed)
+
+    def __parse(self, text):
+        data = _parse_simple(text)
+        if data is not None:
+            return data
+        if _Loader is not None:
+            return yaml.load(text, Loader=_Loader)
+        return yaml.safe_load(text)
+
+
+def _parse_simple(text):
+    """
+    Parse YAML text which is list of maps with identifier
+    keys and integer, null or identifier values.
+
+    Required arguments:
+    text -- YAML text
+
+    Return value:
+    List with dictionaries, or None if text has different
+    shape and should be parsed by full YAML loader
+    """
+    data = []
+    for line in text.splitlines():
+        match = _line_pattern.match(line)
+        if match is None:
+            return None
+        prefix, key, value = match.groups()
+        if key in _special_words:
+            return None
+        if prefix == '- ':
+            item = {}
+            data.append(item)
+        elif not data:
+            return None
+        if value is None or value == '' or value == '~':
+            value = None
+        elif _int_pattern.match(value):
+            value = int(value)
+        elif value in _special_words or not _word_pattern.match(value):
+            return None
+        data[-1][key] = value
+    if not data:
+        return None
+    return data
@@ -20,8 +20,14 @@
 
 
 __all__ = [
-    'JsonCacheHandler'
+    'JsonCacheHandler',
+    'MmapCacheHandler',
+    'SharedMemoryCacheHandler',
+    'SQLiteCacheHandler'
 ]
 
 
 from .json_cache_handler import JsonCacheHandler
+from .mmap_cache_handler import MmapCacheHandler
+from .shared_memory_cache_handler import SharedMemoryCacheHandler
+from .sqlite_cache_handler import SQLiteCacheHandler
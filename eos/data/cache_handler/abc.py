@@ -19,7 +19,32 @@
 # ===============================================================================
 
 
+import bz2
+import json
+import os.path
 from abc import ABCMeta, abstractmethod
+from functools import wraps
+from logging import getLogger
+from threading import RLock
+
+from .preload import PreloadJob
+
+
+logger = getLogger(__name__)
+
+
+def synchronized(method):
+    """
+    Decorator for cache handler methods, which makes them hold
+    handler lock while they are running, so that state of handler
+    is not accessed by several threads at once (e.g. by background
+    warm-up thread and by fit).
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class BaseCacheHandler(metaclass=ABCMeta):
@@ -30,6 +55,13 @@ class BaseCacheHandler(metaclass=ABCMeta):
     use in Eos; fingerprint is single string.
     """
 
+    def __init__(self):
+        # Warm-up jobs, they keep preloaded types alive
+        self._preload_jobs = []
+        # Reentrant, as getters of types request effects
+        # and modifiers via other synchronized methods
+        self._lock = RLock()
+
     @abstractmethod
     def get_type(self, type_id):
         ...
@@ -60,3 +92,98 @@ class BaseCacheHandler(metaclass=ABCMeta):
         fingerprint -- unique ID of data in the form of string
         """
         ...
+
+    def get_generator_state(self):
+        """
+        Get state of cache generator saved along with cache.
+
+        Return value:
+        State in the form it was passed to update_generator_state(),
+        or None if it is not available
+        """
+        state_path = self._get_generator_state_path()
+        if state_path is None or not os.path.exists(state_path):
+            return None
+        try:
+            with bz2.open(state_path, 'rt', encoding='utf-8') as file:
+                return json.load(file)
+        except KeyboardInterrupt:
+            raise
+        except:
+            logger.error('error during reading generator state')
+            return None
+
+    def update_generator_state(self, state):
+        """
+        Save state of cache generator along with cache. Cache
+        handlers which do not store cache on disk do nothing.
+
+        Required arguments:
+        state -- JSON-serializable state of generator
+        """
+        state_path = self._get_generator_state_path()
+        if state_path is None:
+            return
+        with bz2.open(state_path, 'wt', encoding='utf-8') as file:
+            json.dump(state, file)
+
+    def _get_generator_state_path(self):
+        """
+        Get path to file where state of cache generator is stored.
+
+        Return value:
+        Path, or None if handler does not store it
+        """
+        return None
+
+    def preload(self, categories=None, groups=None, type_ids=None, background=False, callback=None):
+        """
+        Assemble types (along with their effects and modifiers) in
+        advance and keep them alive until cache is updated. Types are
+        selected by any of passed filters; when no filters are passed,
+        all types are preloaded.
+
+        Optional arguments:
+        categories -- iterable with IDs of categories to preload
+        groups -- iterable with IDs of groups to preload
+        type_ids -- iterable with IDs of types to preload
+        background -- if True, types are assembled in background
+        thread, and method returns immediately (default False)
+        callback -- callable which is called with job as argument
+        when warm-up is finished
+
+        Return value:
+        PreloadJob object, which can be used to check status of
+        warm-up or wait for it
+
+        Possible exceptions:
+        Any exception raised by cache handler during assembly is
+        re-raised when not in background mode
+        """
+        job = PreloadJob(self, categories=categories, groups=groups, type_ids=type_ids, callback=callback)
+        self._preload_jobs.append(job)
+        if background is True:
+            job.start()
+        else:
+            job.run()
+        return job
+
+    @abstractmethod
+    def _get_type_ids(self, categories=None, groups=None):
+        """
+        Get IDs of types from cache.
+
+        Optional arguments:
+        categories -- iterable with category IDs
+        groups -- iterable with group IDs
+        When both are None, IDs of all types are returned; else, IDs of
+        types which belong to any of passed categories or groups.
+
+        Return value:
+        Iterable with type IDs
+        """
+        ...
+
+    def _clear_preloaded(self):
+        """Release types pinned by warm-up jobs."""
+        self._preload_jobs = []
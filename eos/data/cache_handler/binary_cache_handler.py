@@ -0,0 +1,489 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import struct
+from abc import abstractmethod
+from logging import getLogger
+from weakref import WeakValueDictionary
+
+from eos.data.cache_object import *
+from .abc import BaseCacheHandler, synchronized
+from .exception import TypeFetchError, AttributeFetchError, EffectFetchError, ModifierFetchError
+
+
+logger = getLogger(__name__)
+
+
+MAGIC = b'EOSB'
+VERSION = 1
+
+# Image layout:
+# header -- magic, format version, fingerprint length
+# fingerprint -- UTF-8 encoded string
+# section table -- for each section (types, attributes, effects,
+# modifiers), amount of entries and offset of its index table
+# index tables -- entries sorted by entity ID; each entry contains
+# entity ID, offset of entity record and its length
+# records -- sequences of packed values
+HEADER = struct.Struct('<4sHI')
+SECTION = struct.Struct('<IQ')
+INDEX_ENTRY = struct.Struct('<qQI')
+SECTIONS = ('types', 'attributes', 'effects', 'modifiers')
+
+# Every value in record is prefixed with tag which defines its type
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR = 5
+TAG_LIST = 6
+TAG = struct.Struct('<B')
+INT = struct.Struct('<q')
+FLOAT = struct.Struct('<d')
+LENGTH = struct.Struct('<I')
+
+
+def _pack_value(value, buffer):
+    """
+    Append binary representation of value to buffer.
+
+    Required arguments:
+    value -- value to pack; None, booleans, integers, floats, strings
+    and lists/tuples of them are supported
+    buffer -- bytearray to append data to
+    """
+    if value is None:
+        buffer += TAG.pack(TAG_NONE)
+    elif value is False:
+        buffer += TAG.pack(TAG_FALSE)
+    elif value is True:
+        buffer += TAG.pack(TAG_TRUE)
+    elif isinstance(value, int):
+        buffer += TAG.pack(TAG_INT)
+        buffer += INT.pack(value)
+    elif isinstance(value, float):
+        buffer += TAG.pack(TAG_FLOAT)
+        buffer += FLOAT.pack(value)
+    elif isinstance(value, str):
+        encoded = value.encode('utf-8')
+        buffer += TAG.pack(TAG_STR)
+        buffer += LENGTH.pack(len(encoded))
+        buffer += encoded
+    elif isinstance(value, (list, tuple)):
+        buffer += TAG.pack(TAG_LIST)
+        buffer += LENGTH.pack(len(value))
+        for item in value:
+            _pack_value(item, buffer)
+    else:
+        raise TypeError('unsupported value type {}'.format(type(value).__name__))
+
+
+def _unpack_value(data, position):
+    """
+    Decode value from binary data.
+
+    Required arguments:
+    data -- buffer with data
+    position -- offset of value in buffer
+
+    Return value:
+    (value, offset of next value) tuple
+    """
+    tag = data[position]
+    position += TAG.size
+    if tag == TAG_NONE:
+        return None, position
+    if tag == TAG_FALSE:
+        return False, position
+    if tag == TAG_TRUE:
+        return True, position
+    if tag == TAG_INT:
+        return INT.unpack_from(data, position)[0], position + INT.size
+    if tag == TAG_FLOAT:
+        return FLOAT.unpack_from(data, position)[0], position + FLOAT.size
+    if tag == TAG_STR:
+        length = LENGTH.unpack_from(data, position)[0]
+        position += LENGTH.size
+        return bytes(data[position:position + length]).decode('utf-8'), position + length
+    if tag == TAG_LIST:
+        length = LENGTH.unpack_from(data, position)[0]
+        position += LENGTH.size
+        items = []
+        for _ in range(length):
+            item, position = _unpack_value(data, position)
+            items.append(item)
+        return items, position
+    raise ValueError('unknown value tag {}'.format(tag))
+
+
+class BinaryCacheHandler(BaseCacheHandler):
+    """
+    Base class for cache handlers which keep cache in the form of
+    binary image with fixed layout. Only records of requested
+    entities are decoded, thus startup is nearly free. Weakref
+    object cache is used for assembled objects. Storage of image
+    is defined by subclasses, they should call _load() when
+    they are ready to provide image.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__image = None
+        # Format: {section name: (amount of entries, index offset)}
+        self.__sections = {}
+        self.__fingerprint = None
+        # Initialize weakref object cache
+        self.__type_obj_cache = WeakValueDictionary()
+        self.__attribute_obj_cache = WeakValueDictionary()
+        self.__effect_obj_cache = WeakValueDictionary()
+        self.__modifier_obj_cache = WeakValueDictionary()
+
+    @synchronized
+    def get_type(self, type_id):
+        try:
+            type_id = int(type_id)
+        except TypeError as e:
+            raise TypeFetchError(type_id) from e
+        try:
+            type_ = self.__type_obj_cache[type_id]
+        except KeyError:
+            type_data = self.__get_record('types', type_id)
+            if type_data is None:
+                raise TypeFetchError(type_id)
+            type_ = Type(
+                type_id=type_id,
+                group=type_data[0],
+                category=type_data[1],
+                attributes={attr_id: attr_val for attr_id, attr_val in type_data[2]},
+                effects=tuple(self.get_effect(effect_id) for effect_id in type_data[3]),
+                default_effect=None if type_data[4] is None else self.get_effect(type_data[4])
+            )
+            self.__type_obj_cache[type_id] = type_
+        return type_
+
+    @synchronized
+    def get_attribute(self, attr_id):
+        try:
+            attr_id = int(attr_id)
+        except TypeError as e:
+            raise AttributeFetchError(attr_id) from e
+        try:
+            attribute = self.__attribute_obj_cache[attr_id]
+        except KeyError:
+            attr_data = self.__get_record('attributes', attr_id)
+            if attr_data is None:
+                raise AttributeFetchError(attr_id)
+            attribute = Attribute(
+                attribute_id=attr_id,
+                max_attribute=attr_data[0],
+                default_value=attr_data[1],
+                high_is_good=attr_data[2],
+                stackable=attr_data[3]
+            )
+            self.__attribute_obj_cache[attr_id] = attribute
+        return attribute
+
+    @synchronized
+    def get_effect(self, effect_id):
+        try:
+            effect_id = int(effect_id)
+        except TypeError as e:
+            raise EffectFetchError(effect_id) from e
+        try:
+            effect = self.__effect_obj_cache[effect_id]
+        except KeyError:
+            effect_data = self.__get_record('effects', effect_id)
+            if effect_data is None:
+                raise EffectFetchError(effect_id)
+            effect = Effect(
+                effect_id=effect_id,
+                category=effect_data[0],
+                is_offensive=effect_data[1],
+                is_assistance=effect_data[2],
+                duration_attribute=effect_data[3],
+                discharge_attribute=effect_data[4],
+                range_attribute=effect_data[5],
+                falloff_attribute=effect_data[6],
+                tracking_speed_attribute=effect_data[7],
+                fitting_usage_chance_attribute=effect_data[8],
+                build_status=effect_data[9],
+                modifiers=tuple(self.get_modifier(modifier_id) for modifier_id in effect_data[10])
+            )
+            self.__effect_obj_cache[effect_id] = effect
+        return effect
+
+    @synchronized
+    def get_modifier(self, modifier_id):
+        try:
+            modifier_id = int(modifier_id)
+        except TypeError as e:
+            raise ModifierFetchError(modifier_id) from e
+        try:
+            modifier = self.__modifier_obj_cache[modifier_id]
+        except KeyError:
+            modifier_data = self.__get_record('modifiers', modifier_id)
+            if modifier_data is None:
+                raise ModifierFetchError(modifier_id)
+            modifier = Modifier(
+                modifier_id=modifier_id,
+                state=modifier_data[0],
+                scope=modifier_data[1],
+                src_attr=modifier_data[2],
+                operator=modifier_data[3],
+                tgt_attr=modifier_data[4],
+                domain=modifier_data[5],
+                filter_type=modifier_data[6],
+                filter_value=modifier_data[7]
+            )
+            self.__modifier_obj_cache[modifier_id] = modifier
+        return modifier
+
+    def get_fingerprint(self):
+        return self.__fingerprint
+
+    @synchronized
+    def update_cache(self, data, fingerprint):
+        image = self.__pack_image(self.__strip_data(data), fingerprint)
+        self.__close()
+        self._store_image(image)
+        self.__open()
+        # Also clear object cache to make sure objects composed
+        # from old data are gone
+        self.__type_obj_cache.clear()
+        self.__attribute_obj_cache.clear()
+        self.__effect_obj_cache.clear()
+        self.__modifier_obj_cache.clear()
+        self._clear_preloaded()
+
+    def _load(self):
+        """
+        Read image provided by subclass. If it is damaged, or anything
+        else bad happens, nothing is loaded.
+        """
+        try:
+            self.__open()
+        except KeyboardInterrupt:
+            raise
+        except:
+            self.__close()
+            msg = 'error during reading cache'
+            logger.error(msg)
+
+    def _unload(self):
+        """Release cache image and forget everything read from it."""
+        self.__close()
+
+    @abstractmethod
+    def _open_image(self):
+        """
+        Get cache image.
+
+        Return value:
+        Buffer with image, or None if there's no image
+        """
+        ...
+
+    @abstractmethod
+    def _close_image(self, image):
+        """
+        Release cache image.
+
+        Required arguments:
+        image -- buffer returned by _open_image()
+        """
+        ...
+
+    @abstractmethod
+    def _store_image(self, image):
+        """
+        Replace cache image with new one. Old image is
+        released before this method is called.
+
+        Required arguments:
+        image -- bytearray with new image
+        """
+        ...
+
+    @synchronized
+    def _get_type_ids(self, categories=None, groups=None):
+        try:
+            count, index_offset = self.__sections['types']
+        except KeyError:
+            return []
+        data = self.__image
+        type_ids = []
+        for position in range(index_offset, index_offset + count * INDEX_ENTRY.size, INDEX_ENTRY.size):
+            type_id, record_offset, _ = INDEX_ENTRY.unpack_from(data, position)
+            if categories is not None or groups is not None:
+                type_data, _ = _unpack_value(data, record_offset)
+                if type_data[1] not in (categories or ()) and type_data[0] not in (groups or ()):
+                    continue
+            type_ids.append(type_id)
+        return type_ids
+
+    def __strip_data(self, data):
+        """
+        Rework passed data into rows of values, keyed
+        by entity ID.
+
+        Return value:
+        Dictionary in {section name: {entity ID: (values)}} format
+        """
+        records = {}
+        records['types'] = {
+            type_row['type_id']: (
+                type_row['group'],
+                type_row['category'],
+                tuple(type_row['attributes'].items()),
+                tuple(type_row['effects']),
+                type_row['default_effect']
+            )
+            for type_row in data['types']
+        }
+        records['attributes'] = {
+            attr_row['attribute_id']: (
+                attr_row['max_attribute'],
+                attr_row['default_value'],
+                attr_row['high_is_good'],
+                attr_row['stackable']
+            )
+            for attr_row in data['attributes']
+        }
+        records['effects'] = {
+            effect_row['effect_id']: (
+                effect_row['effect_category'],
+                effect_row['is_offensive'],
+                effect_row['is_assistance'],
+                effect_row['duration_attribute'],
+                effect_row['discharge_attribute'],
+                effect_row['range_attribute'],
+                effect_row['falloff_attribute'],
+                effect_row['tracking_speed_attribute'],
+                effect_row['fitting_usage_chance_attribute'],
+                effect_row['build_status'],
+                tuple(effect_row['modifiers'])
+            )
+            for effect_row in data['effects']
+        }
+        records['modifiers'] = {
+            modifier_row['modifier_id']: (
+                modifier_row['state'],
+                modifier_row['scope'],
+                modifier_row['src_attr'],
+                modifier_row['operator'],
+                modifier_row['tgt_attr'],
+                modifier_row['domain'],
+                modifier_row['filter_type'],
+                modifier_row['filter_value']
+            )
+            for modifier_row in data['modifiers']
+        }
+        return records
+
+    def __pack_image(self, records, fingerprint):
+        """
+        Compose cache image.
+
+        Required arguments:
+        records -- stripped data
+        fingerprint -- unique ID of data
+
+        Return value:
+        Bytearray with image
+        """
+        encoded_fingerprint = fingerprint.encode('utf-8')
+        header = HEADER.pack(MAGIC, VERSION, len(encoded_fingerprint)) + encoded_fingerprint
+        # Offsets of index tables can be calculated right away,
+        # records follow all the index tables
+        index_offset = len(header) + SECTION.size * len(SECTIONS)
+        section_table = bytearray()
+        for section in SECTIONS:
+            section_table += SECTION.pack(len(records[section]), index_offset)
+            index_offset += INDEX_ENTRY.size * len(records[section])
+        indices = bytearray()
+        body = bytearray()
+        for section in SECTIONS:
+            for entity_id, values in sorted(records[section].items()):
+                record_offset = index_offset + len(body)
+                _pack_value(values, body)
+                indices += INDEX_ENTRY.pack(entity_id, record_offset, index_offset + len(body) - record_offset)
+        return header + section_table + indices + body
+
+    def __open(self):
+        """Get cache image and read its header."""
+        image = self._open_image()
+        if image is None:
+            return
+        self.__image = image
+        magic, version, fingerprint_len = HEADER.unpack_from(image, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('unsupported cache format')
+        position = HEADER.size
+        fingerprint = bytes(image[position:position + fingerprint_len]).decode('utf-8')
+        position += fingerprint_len
+        sections = {}
+        for section in SECTIONS:
+            sections[section] = SECTION.unpack_from(image, position)
+            position += SECTION.size
+        self.__sections = sections
+        self.__fingerprint = fingerprint
+
+    def __close(self):
+        """Release cache image and forget everything read from it."""
+        if self.__image is not None:
+            self._close_image(self.__image)
+        self.__image = None
+        self.__sections = {}
+        self.__fingerprint = None
+
+    def __get_record(self, section, entity_id):
+        """
+        Find and decode entity record.
+
+        Required arguments:
+        section -- name of section where entity is stored
+        entity_id -- ID of entity
+
+        Return value:
+        List with record values, or None if entity isn't found
+        """
+        try:
+            count, index_offset = self.__sections[section]
+        except KeyError:
+            return None
+        data = self.__image
+        # Binary search over sorted index table
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            current_id = INT.unpack_from(data, index_offset + middle * INDEX_ENTRY.size)[0]
+            if current_id < entity_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low == count:
+            return None
+        current_id, record_offset, _ = INDEX_ENTRY.unpack_from(data, index_offset + low * INDEX_ENTRY.size)
+        if current_id != entity_id:
+            return None
+        values, _ = _unpack_value(data, record_offset)
+        return values
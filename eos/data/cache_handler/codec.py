@@ -0,0 +1,215 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+"""
+Codecs which define on-disk format of cache data. Every file written
+by codec starts with header, which contains name of codec, thus codec
+is detected automatically on load. Files without header are legacy
+bz2-compressed JSON.
+
+Pickle and marshal codecs are meant only for cache files produced by
+Eos itself: loading such files from untrusted sources is not safe.
+"""
+
+
+import bz2
+import json
+import marshal
+import pickle
+import zlib
+from abc import ABCMeta, abstractmethod
+
+from .exception import UnknownCodecError
+
+
+# Header format: magic, length of codec name, codec name
+HEADER_MAGIC = b'EOSC'
+
+
+class BaseCodec(metaclass=ABCMeta):
+    """
+    Abstract base class for codecs. Data passed to codecs is JSON-
+    compatible: dictionaries with string keys, lists, strings,
+    numbers, booleans and None.
+    """
+
+    name = None
+
+    @abstractmethod
+    def encode(self, data):
+        """
+        Required arguments:
+        data -- data to encode
+
+        Return value:
+        Bytes with encoded data
+        """
+        ...
+
+    @abstractmethod
+    def decode(self, raw):
+        """
+        Required arguments:
+        raw -- bytes with encoded data
+
+        Return value:
+        Decoded data
+        """
+        ...
+
+
+class JsonBz2Codec(BaseCodec):
+    """JSON compressed with bz2: small, but slow."""
+
+    name = 'json_bz2'
+
+    def encode(self, data):
+        return bz2.compress(json.dumps(data).encode('utf-8'))
+
+    def decode(self, raw):
+        return json.loads(bz2.decompress(raw).decode('utf-8'))
+
+
+class JsonZlibCodec(BaseCodec):
+    """JSON compressed with zlib: fast decompression, moderate size."""
+
+    name = 'json_zlib'
+
+    def encode(self, data):
+        return zlib.compress(json.dumps(data).encode('utf-8'))
+
+    def decode(self, raw):
+        return json.loads(zlib.decompress(raw).decode('utf-8'))
+
+
+class JsonCodec(BaseCodec):
+    """Plain JSON."""
+
+    name = 'json'
+
+    def encode(self, data):
+        return json.dumps(data).encode('utf-8')
+
+    def decode(self, raw):
+        return json.loads(raw.decode('utf-8'))
+
+
+class PickleCodec(BaseCodec):
+    """Pickle, using protocol 5 where available."""
+
+    name = 'pickle'
+    protocol = min(5, pickle.HIGHEST_PROTOCOL)
+
+    def encode(self, data):
+        return pickle.dumps(data, protocol=self.protocol)
+
+    def decode(self, raw):
+        return pickle.loads(raw)
+
+
+class MarshalCodec(BaseCodec):
+    """
+    Marshal, with lists converted to tuples; format depends on
+    python version, thus file has to be regenerated on upgrade.
+    """
+
+    name = 'marshal'
+
+    def encode(self, data):
+        return marshal.dumps(self.__tuplify(data))
+
+    def decode(self, raw):
+        return marshal.loads(raw)
+
+    def __tuplify(self, data):
+        if isinstance(data, dict):
+            return {k: self.__tuplify(v) for k, v in data.items()}
+        if isinstance(data, (list, tuple)):
+            return tuple(self.__tuplify(v) for v in data)
+        return data
+
+
+# Format: {codec name: codec}
+CODECS = {codec.name: codec for codec in (
+    JsonBz2Codec(),
+    JsonZlibCodec(),
+    JsonCodec(),
+    PickleCodec(),
+    MarshalCodec()
+)}
+
+
+def get_codec(name):
+    """
+    Get codec by its name.
+
+    Required arguments:
+    name -- name of codec
+
+    Return value:
+    Codec object
+
+    Possible exceptions:
+    UnknownCodecError -- raised when there's no codec with passed name
+    """
+    try:
+        return CODECS[name]
+    except KeyError as e:
+        raise UnknownCodecError(name) from e
+
+
+def encode(data, codec):
+    """
+    Encode data and prepend header to it.
+
+    Required arguments:
+    data -- data to encode
+    codec -- codec object to use
+
+    Return value:
+    Bytes with file contents
+    """
+    name = codec.name.encode('ascii')
+    return HEADER_MAGIC + bytes((len(name),)) + name + codec.encode(data)
+
+
+def decode(raw):
+    """
+    Detect codec and decode data with it.
+
+    Required arguments:
+    raw -- bytes with file contents
+
+    Return value:
+    (decoded data, codec object) tuple
+
+    Possible exceptions:
+    UnknownCodecError -- raised when file is encoded with unknown codec
+    """
+    if not raw.startswith(HEADER_MAGIC):
+        codec = CODECS[JsonBz2Codec.name]
+        return codec.decode(raw), codec
+    position = len(HEADER_MAGIC)
+    name_len = raw[position]
+    position += 1
+    codec = get_codec(raw[position:position + name_len].decode('ascii'))
+    position += name_len
+    return codec.decode(raw[position:]), codec
@@ -45,3 +45,13 @@ class EffectFetchError(CacheHandlerError):
 class ModifierFetchError(CacheHandlerError):
     """Raised when cache handler can't find modifier with requested ID."""
     pass
+
+
+class UnknownCodecError(CacheHandlerError):
+    """Raised when cache serialization codec with requested name is not available."""
+    pass
+
+
+class CacheReadOnlyError(CacheHandlerError):
+    """Raised when cache handler which can only read cache is asked to update it."""
+    pass
@@ -19,15 +19,17 @@
 # ===============================================================================
 
 
-import bz2
 import json
 import os.path
 from logging import getLogger
 from weakref import WeakValueDictionary
 
+from eos.const.eos import Slot, State
 from eos.data.cache_object import *
+from eos.util.lru_cache import LruCache
 from eos.util.repr import make_repr_str
-from .abc import BaseCacheHandler
+from .abc import BaseCacheHandler, synchronized
+from .codec import JsonBz2Codec, get_codec, encode, decode
 from .exception import TypeFetchError, AttributeFetchError, EffectFetchError, ModifierFetchError
 
 
@@ -37,16 +39,32 @@ logger = getLogger(__name__)
 class JsonCacheHandler(BaseCacheHandler):
     """
     This cache handler implements on-disk cache store in the form
-    of compressed JSON. To improve performance further, it also
+    of compressed JSON, or in other format defined by codec (format
+    of existing cache file is detected on load, regardless of
+    codec choice). To improve performance further, it also
     keeps loads data from on-disk cache to memory, and uses weakref
-    object cache for assembled objects.
+    object cache for assembled objects. In front of weakref cache,
+    there's cache which keeps limited amount of recently used
+    objects alive even when nothing else references them.
 
     Required arguments:
-    cache_path -- file name where on-disk cache will be stored (.json.bz2)
+    cache_path -- file name where on-disk cache will be stored
+
+    Optional arguments:
+    strong_cache_size -- how many recently used objects of each
+    entity type are kept alive; 0 disables this cache (default 256)
+    codec -- name of codec used to write cache, one of 'json_bz2',
+    'json_zlib', 'json', 'pickle', 'marshal' (default 'json_bz2')
+
+    Possible exceptions:
+    UnknownCodecError -- raised when codec with passed name
+    is not available
     """
 
-    def __init__(self, cache_path):
+    def __init__(self, cache_path, strong_cache_size=256, codec=JsonBz2Codec.name):
+        super().__init__()
         self._cache_path = os.path.abspath(cache_path)
+        self.__codec = get_codec(codec)
         # Initialize memory data cache
         self.__type_data_cache = {}
         self.__attribute_data_cache = {}
@@ -58,65 +76,78 @@ class JsonCacheHandler(BaseCacheHandler):
         self.__attribute_obj_cache = WeakValueDictionary()
         self.__effect_obj_cache = WeakValueDictionary()
         self.__modifier_obj_cache = WeakValueDictionary()
+        # Initialize strong object cache
+        self.__type_lru_cache = LruCache(strong_cache_size)
+        self.__attribute_lru_cache = LruCache(strong_cache_size)
+        self.__effect_lru_cache = LruCache(strong_cache_size)
+        self.__modifier_lru_cache = LruCache(strong_cache_size)
 
         # If cache doesn't exist, silently finish initialization
         if not os.path.exists(self._cache_path):
             return
-        # Read JSON into local variable
+        # Read data into local variable
         try:
-            with bz2.BZ2File(self._cache_path, 'r') as file:
-                json_data = file.read().decode('utf-8')
-                data = json.loads(json_data)
+            with open(self._cache_path, 'rb') as file:
+                data, _ = decode(file.read())
         except KeyboardInterrupt:
             raise
-        # If file doesn't exist, JSON load errors occur, or
+        # If file doesn't exist, decoding errors occur, or
         # anything else bad happens, do not load anything
         # and leave values as initialized
         except:
             msg = 'error during reading cache'
             logger.error(msg)
         # Load data into data cache, if no errors occurred
-        # during JSON reading/parsing
+        # during reading/decoding
         else:
             self.__update_mem_cache(data)
 
+    @synchronized
     def get_type(self, type_id):
         try:
             type_id = int(type_id)
         except TypeError as e:
             raise TypeFetchError(type_id) from e
+        type_ = self.__type_lru_cache.get(type_id)
+        if type_ is not None:
+            return type_
         try:
             type_ = self.__type_obj_cache[type_id]
         except KeyError:
-            # We do str(int(id)) here because JSON dictionaries
-            # always have strings as key
-            json_type_id = str(type_id)
             try:
-                type_data = self.__type_data_cache[json_type_id]
+                type_data = self.__type_data_cache[type_id]
             except KeyError as e:
                 raise TypeFetchError(type_id) from e
             type_ = Type(
                 type_id=type_id,
                 group=type_data[0],
                 category=type_data[1],
-                attributes={attr_id: attr_val for attr_id, attr_val in type_data[2]},
+                attributes=dict(type_data[2]),
                 effects=tuple(self.get_effect(effect_id) for effect_id in type_data[3]),
-                default_effect=None if type_data[4] is None else self.get_effect(type_data[4])
+                default_effect=None if type_data[4] is None else self.get_effect(type_data[4]),
+                required_skills=None if type_data[5] is None else dict(type_data[5]),
+                max_state=None if type_data[6] is None else State(type_data[6]),
+                is_targeted=type_data[7],
+                slots=None if type_data[8] is None else {Slot(slot) for slot in type_data[8]}
             )
             self.__type_obj_cache[type_id] = type_
+        self.__type_lru_cache.put(type_id, type_)
         return type_
 
+    @synchronized
     def get_attribute(self, attr_id):
         try:
             attr_id = int(attr_id)
         except TypeError as e:
             raise AttributeFetchError(attr_id) from e
+        attribute = self.__attribute_lru_cache.get(attr_id)
+        if attribute is not None:
+            return attribute
         try:
             attribute = self.__attribute_obj_cache[attr_id]
         except KeyError:
-            json_attr_id = str(attr_id)
             try:
-                attr_data = self.__attribute_data_cache[json_attr_id]
+                attr_data = self.__attribute_data_cache[attr_id]
             except KeyError as e:
                 raise AttributeFetchError(attr_id) from e
             attribute = Attribute(
@@ -127,19 +158,23 @@ class JsonCacheHandler(BaseCacheHandler):
                 stackable=attr_data[3]
             )
             self.__attribute_obj_cache[attr_id] = attribute
+        self.__attribute_lru_cache.put(attr_id, attribute)
         return attribute
 
+    @synchronized
     def get_effect(self, effect_id):
         try:
             effect_id = int(effect_id)
         except TypeError as e:
             raise EffectFetchError(effect_id) from e
+        effect = self.__effect_lru_cache.get(effect_id)
+        if effect is not None:
+            return effect
         try:
             effect = self.__effect_obj_cache[effect_id]
         except KeyError:
-            json_effect_id = str(effect_id)
             try:
-                effect_data = self.__effect_data_cache[json_effect_id]
+                effect_data = self.__effect_data_cache[effect_id]
             except KeyError as e:
                 raise EffectFetchError(effect_id) from e
             effect = Effect(
@@ -154,22 +189,27 @@ class JsonCacheHandler(BaseCacheHandler):
                 tracking_speed_attribute=effect_data[7],
                 fitting_usage_chance_attribute=effect_data[8],
                 build_status=effect_data[9],
-                modifiers=tuple(self.get_modifier(modifier_id) for modifier_id in effect_data[10])
+                modifiers=tuple(self.get_modifier(modifier_id) for modifier_id in effect_data[10]),
+                state=None if effect_data[11] is None else State(effect_data[11])
             )
             self.__effect_obj_cache[effect_id] = effect
+        self.__effect_lru_cache.put(effect_id, effect)
         return effect
 
+    @synchronized
     def get_modifier(self, modifier_id):
         try:
             modifier_id = int(modifier_id)
         except TypeError as e:
             raise ModifierFetchError(modifier_id) from e
+        modifier = self.__modifier_lru_cache.get(modifier_id)
+        if modifier is not None:
+            return modifier
         try:
             modifier = self.__modifier_obj_cache[modifier_id]
         except KeyError:
-            json_modifier_id = str(modifier_id)
             try:
-                modifier_data = self.__modifier_data_cache[json_modifier_id]
+                modifier_data = self.__modifier_data_cache[modifier_id]
             except KeyError as e:
                 raise ModifierFetchError(modifier_id) from e
             modifier = Modifier(
@@ -184,28 +224,59 @@ class JsonCacheHandler(BaseCacheHandler):
                 filter_value=modifier_data[7]
             )
             self.__modifier_obj_cache[modifier_id] = modifier
+        self.__modifier_lru_cache.put(modifier_id, modifier)
         return modifier
 
     def get_fingerprint(self):
         return self.__fingerprint
 
+    def _get_generator_state_path(self):
+        return '{}.state'.format(self._cache_path)
+
+    @synchronized
+    def _get_type_ids(self, categories=None, groups=None):
+        if categories is None and groups is None:
+            return list(self.__type_data_cache)
+        categories = set(categories or ())
+        groups = set(groups or ())
+        return [
+            type_id for type_id, type_data in self.__type_data_cache.items()
+            if type_data[1] in categories or type_data[0] in groups
+        ]
+
+    @synchronized
+    def get_strong_cache_stats(self):
+        """
+        Get usage statistics of strong object cache.
+
+        Return value:
+        Dictionary in {entity type: LruCacheStats} format
+        """
+        return {
+            'types': self.__type_lru_cache.get_stats(),
+            'attributes': self.__attribute_lru_cache.get_stats(),
+            'effects': self.__effect_lru_cache.get_stats(),
+            'modifiers': self.__modifier_lru_cache.get_stats()
+        }
+
+    @synchronized
     def update_cache(self, data, fingerprint):
         # Make light version of data and add fingerprint
         # to it
         data = self.__strip_data(data)
         data['fingerprint'] = fingerprint
+        # Encode to JSON and decode back to make sure form of
+        # data is the same as after loading it from cache (e.g.
+        # dictionary keys are stored as strings in JSON), all
+        # codecs work with data in this form
+        data = json.loads(json.dumps(data))
         # Update disk cache
         cache_folder = os.path.dirname(self._cache_path)
         if os.path.isdir(cache_folder) is not True:
             os.makedirs(cache_folder, mode=0o755)
-        with bz2.BZ2File(self._cache_path, 'w') as file:
-            json_data = json.dumps(data)
-            file.write(json_data.encode('utf-8'))
-        # Update data cache; encode to JSON and decode back
-        # to make sure form of data is the same as after
-        # loading it from cache (e.g. dictionary keys are
-        # stored as strings in JSON)
-        data = json.loads(json_data)
+        with open(self._cache_path, 'wb') as file:
+            file.write(encode(data, self.__codec))
+        # Update data cache
         self.__update_mem_cache(data)
 
     def __strip_data(self, data):
@@ -215,15 +286,40 @@ class JsonCacheHandler(BaseCacheHandler):
         """
         slim_data = {}
 
+        # Properties which are derived from data are calculated
+        # here, so that they do not need to be calculated at
+        # run time; None is stored when property cannot be
+        # derived, then it is left for run time
+        # Format: {effect ID: (category, state)}
+        effect_props = {}
+        for effect_row in data['effects']:
+            category = effect_row['effect_category']
+            try:
+                state = Effect._derive_state(category)
+            except KeyError:
+                state = None
+            effect_props[effect_row['effect_id']] = (category, state)
+
         slim_types = {}
         for type_row in data['types']:
             type_id = type_row['type_id']
+            type_effects = [e for e in type_row['effects'] if e in effect_props]
+            effect_states = [effect_props[e][1] for e in type_effects]
+            if len(type_effects) < len(type_row['effects']):
+                max_state = is_targeted = None
+            else:
+                max_state = None if None in effect_states else Type._derive_max_state(effect_states)
+                is_targeted = Type._derive_is_targeted(effect_props[e][0] for e in type_effects)
             slim_types[type_id] = (
                 type_row['group'],
                 type_row['category'],
                 tuple(type_row['attributes'].items()),  # Dictionary -> tuple
                 tuple(type_row['effects']),  # List -> tuple
-                type_row['default_effect']
+                type_row['default_effect'],
+                tuple(Type._derive_required_skills(type_row['attributes']).items()),
+                max_state,
+                is_targeted,
+                tuple(Type._derive_slots(type_row['effects']))
             )
         slim_data['types'] = slim_types
 
@@ -252,7 +348,8 @@ class JsonCacheHandler(BaseCacheHandler):
                 effect_row['tracking_speed_attribute'],
                 effect_row['fitting_usage_chance_attribute'],
                 effect_row['build_status'],
-                tuple(effect_row['modifiers'])  # List -> tuple
+                tuple(effect_row['modifiers']),  # List -> tuple
+                effect_props[effect_id][1]
             )
         slim_data['effects'] = slim_effects
 
@@ -275,15 +372,61 @@ class JsonCacheHandler(BaseCacheHandler):
 
     def __update_mem_cache(self, data):
         """
-        Loads data into memory data cache.
+        Loads data into memory data cache. Tables are converted
+        once into dictionaries keyed by integer IDs, with tuples
+        as rows, so that getters can use them directly.
 
         Required arguments:
-        data -- dictionary with data to load
+        data -- dictionary with data to load, keyed by strings
         """
-        self.__type_data_cache = data['types']
-        self.__attribute_data_cache = data['attributes']
-        self.__effect_data_cache = data['effects']
-        self.__modifier_data_cache = data['modifiers']
+        # Many rows carry equal values (attribute ID-value pairs,
+        # effect ID lists, etc.), thus they are interned to keep
+        # single copy of each in memory. Attribute values are
+        # interned along with their type, to not mix up 1 and 1.0;
+        # sets of attributes are keyed by identities of interned
+        # pairs for the same reason
+        # Format: {(pair, value type): pair}
+        interned_pairs = {}
+        # Format: {pair identities: pairs}
+        interned_attrs = {}
+        # Format: {tuple: tuple}
+        interned_tuples = {}
+        # Caches written by older versions do not have derived
+        # properties, they are derived at run time then
+        type_data_cache = {}
+        for type_id, type_data in data['types'].items():
+            type_data = list(type_data) + [None] * (9 - len(type_data))
+            attrs = []
+            for attr_id, attr_val in type_data[2]:
+                pair = (int(attr_id), attr_val)
+                attrs.append(interned_pairs.setdefault((pair, type(attr_val)), pair))
+            attrs = tuple(attrs)
+            attrs = interned_attrs.setdefault(tuple(id(pair) for pair in attrs), attrs)
+            effect_ids = tuple(type_data[3])
+            srqs = None if type_data[5] is None else tuple(tuple(srq) for srq in type_data[5])
+            slots = None if type_data[8] is None else tuple(type_data[8])
+            type_data_cache[int(type_id)] = (
+                type_data[0],
+                type_data[1],
+                attrs,
+                interned_tuples.setdefault(effect_ids, effect_ids),
+                type_data[4],
+                None if srqs is None else interned_tuples.setdefault(srqs, srqs),
+                type_data[6],
+                type_data[7],
+                None if slots is None else interned_tuples.setdefault(slots, slots)
+            )
+        self.__type_data_cache = type_data_cache
+        self.__attribute_data_cache = {int(k): tuple(v) for k, v in data['attributes'].items()}
+        effect_data_cache = {}
+        for effect_id, effect_data in data['effects'].items():
+            modifier_ids = tuple(effect_data[10])
+            effect_data_cache[int(effect_id)] = tuple(effect_data[:10]) + (
+                interned_tuples.setdefault(modifier_ids, modifier_ids),
+                effect_data[11] if len(effect_data) > 11 else None
+            )
+        self.__effect_data_cache = effect_data_cache
+        self.__modifier_data_cache = {int(k): tuple(v) for k, v in data['modifiers'].items()}
         self.__fingerprint = data['fingerprint']
         # Also clear object cache to make sure objects composed
         # from old data are gone
@@ -291,6 +434,11 @@ class JsonCacheHandler(BaseCacheHandler):
         self.__attribute_obj_cache.clear()
         self.__effect_obj_cache.clear()
         self.__modifier_obj_cache.clear()
+        self.__type_lru_cache.clear()
+        self.__attribute_lru_cache.clear()
+        self.__effect_lru_cache.clear()
+        self.__modifier_lru_cache.clear()
+        self._clear_preloaded()
 
     def __repr__(self):
         spec = [['cache_path', '_cache_path']]
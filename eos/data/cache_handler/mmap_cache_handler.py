@@ -0,0 +1,73 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import mmap
+import os.path
+
+from eos.util.repr import make_repr_str
+from .binary_cache_handler import BinaryCacheHandler
+
+
+class MmapCacheHandler(BinaryCacheHandler):
+    """
+    This cache handler implements on-disk cache store in the form
+    of binary file with fixed layout. File is memory-mapped, and
+    only records of requested entities are decoded, thus startup
+    is nearly free; processes which use the same file share its
+    pages. Weakref object cache is used for assembled objects.
+
+    Required arguments:
+    cache_path -- file name where on-disk cache will be stored
+    """
+
+    def __init__(self, cache_path):
+        super().__init__()
+        self._cache_path = os.path.abspath(cache_path)
+        self._load()
+
+    def _open_image(self):
+        # If cache doesn't exist, there's nothing to load
+        if not os.path.exists(self._cache_path):
+            return None
+        with open(self._cache_path, 'rb') as file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _close_image(self, image):
+        image.close()
+
+    def _store_image(self, image):
+        cache_folder = os.path.dirname(self._cache_path)
+        if os.path.isdir(cache_folder) is not True:
+            os.makedirs(cache_folder, mode=0o755)
+        # Write data into temporary file and replace cache with it,
+        # this way processes which have old file mapped are not
+        # affected
+        tmp_path = '{}.tmp'.format(self._cache_path)
+        with open(tmp_path, 'wb') as file:
+            file.write(image)
+        os.replace(tmp_path, self._cache_path)
+
+    def _get_generator_state_path(self):
+        return '{}.state'.format(self._cache_path)
+
+    def __repr__(self):
+        spec = [['cache_path', '_cache_path']]
+        return make_repr_str(self, spec)
@@ -0,0 +1,142 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from logging import getLogger
+from threading import Event, Thread
+from time import perf_counter
+
+from eos.const.eve import Category
+from eos.util.repr import make_repr_str
+
+
+logger = getLogger(__name__)
+
+
+# Categories of types which are requested the most when
+# fits are composed; they are preloaded by default
+HOT_CATEGORIES = (
+    Category.ship,
+    Category.module,
+    Category.charge,
+    Category.skill,
+    Category.drone,
+    Category.implant,
+    Category.subsystem
+)
+
+
+class PreloadJob:
+    """
+    Warm-up of cache handler - eager assembly of types (along with
+    their effects and modifiers), which are then pinned in cache
+    handler, so that they are not reassembled on first request.
+    Types are selected by any of passed filters; when no filters
+    are passed, all types are preloaded.
+
+    Required arguments:
+    cache_handler -- cache handler which should be warmed up
+
+    Optional arguments:
+    categories -- iterable with IDs of categories to preload
+    groups -- iterable with IDs of groups to preload
+    type_ids -- iterable with IDs of types to preload
+    callback -- callable which is called with job as argument
+    when job is finished (successfully or not)
+    """
+
+    def __init__(self, cache_handler, categories=None, groups=None, type_ids=None, callback=None):
+        self.__cache_handler = cache_handler
+        self.__categories = None if categories is None else set(categories)
+        self.__groups = None if groups is None else set(groups)
+        self.__type_ids = None if type_ids is None else set(type_ids)
+        self.__callback = callback
+        self.__done = Event()
+        self.__thread = None
+        # Assembled types, job keeps them alive
+        # Format: {type ID: type}
+        self.types = {}
+        # How long warm-up took, in seconds
+        self.duration = None
+        # Exception which stopped warm-up, if any
+        self.error = None
+
+    def run(self):
+        """
+        Preload types in current thread.
+
+        Possible exceptions:
+        Any exception raised by cache handler is re-raised
+        """
+        self.__run()
+        if self.error is not None:
+            raise self.error
+
+    def start(self):
+        """Preload types in background thread."""
+        self.__thread = Thread(target=self.__run, name='eos-cache-preload', daemon=True)
+        self.__thread.start()
+
+    def wait(self, timeout=None):
+        """
+        Block until job is finished.
+
+        Optional arguments:
+        timeout -- maximum time to wait, in seconds; if None,
+        waits indefinitely (default None)
+
+        Return value:
+        True if job is finished, False if timeout expired
+        """
+        return self.__done.wait(timeout)
+
+    @property
+    def done(self):
+        return self.__done.is_set()
+
+    def __run(self):
+        cache_handler = self.__cache_handler
+        started = perf_counter()
+        try:
+            if self.__categories is None and self.__groups is None and self.__type_ids is None:
+                type_ids = set(cache_handler._get_type_ids())
+            else:
+                type_ids = set(self.__type_ids or ())
+                if self.__categories or self.__groups:
+                    type_ids.update(cache_handler._get_type_ids(
+                        categories=self.__categories or (), groups=self.__groups or ()
+                    ))
+            types = {}
+            for type_id in sorted(type_ids):
+                types[type_id] = cache_handler.get_type(type_id)
+            self.types = types
+        except Exception as e:
+            self.error = e
+            logger.error('cache preload failed: {}'.format(e))
+        self.duration = perf_counter() - started
+        if self.error is None:
+            logger.info('cache preload finished: {} types in {:.3f}s'.format(len(self.types), self.duration))
+        self.__done.set()
+        if self.__callback is not None:
+            self.__callback(self)
+
+    def __repr__(self):
+        spec = ['done', 'duration', 'error']
+        return make_repr_str(self, spec)
@@ -0,0 +1,114 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:
+    SharedMemory = None
+
+from eos.util.repr import make_repr_str
+from .abc import synchronized
+from .binary_cache_handler import BinaryCacheHandler
+from .exception import CacheReadOnlyError
+
+
+class SharedMemoryCacheHandler(BinaryCacheHandler):
+    """
+    This cache handler keeps cache in shared memory segment, in
+    the same binary layout as MmapCacheHandler does, so that
+    several processes use single copy of data. Handler created
+    without segment name owns the segment: it is populated by
+    update_cache() and removed by close(). Other processes attach
+    to segment by its name and can only read it; handler can be
+    passed to them directly (e.g. as argument of pool initializer),
+    as pickled handler attaches to the same segment. Objects are
+    assembled lazily by each process. Processes which attach to
+    segment should be started by owner process, as segment is
+    removed when process tree which registered it finishes.
+
+    Optional arguments:
+    name -- name of existing segment to attach to; if None, new
+    segment is created on cache update (default None)
+    """
+
+    def __init__(self, name=None):
+        if SharedMemory is None:
+            raise RuntimeError('shared memory is not supported by this Python version')
+        super().__init__()
+        self.__is_owner = name is None
+        self.__segment = None
+        if name is not None:
+            self.__segment = SharedMemory(name=name)
+            self._load()
+
+    @property
+    def name(self):
+        """Name of shared memory segment, None if there's no segment yet."""
+        if self.__segment is None:
+            return None
+        return self.__segment.name
+
+    def update_cache(self, data, fingerprint):
+        if self.__is_owner is not True:
+            raise CacheReadOnlyError(self.name)
+        super().update_cache(data, fingerprint)
+
+    @synchronized
+    def close(self):
+        """
+        Detach from shared memory segment; if handler owns it, segment
+        is removed, but processes which are attached to it can still
+        use it until they detach.
+        """
+        self._unload()
+        self.__release_segment()
+
+    def _open_image(self):
+        if self.__segment is None:
+            return None
+        return self.__segment.buf.toreadonly()
+
+    def _close_image(self, image):
+        image.release()
+
+    def _store_image(self, image):
+        segment = SharedMemory(create=True, size=max(len(image), 1))
+        segment.buf[:len(image)] = image
+        # Processes attached to old segment keep using it
+        # until they detach
+        self.__release_segment()
+        self.__segment = segment
+
+    def __release_segment(self):
+        segment = self.__segment
+        if segment is None:
+            return
+        self.__segment = None
+        segment.close()
+        if self.__is_owner is True:
+            segment.unlink()
+
+    def __reduce__(self):
+        return type(self), (self.name,)
+
+    def __repr__(self):
+        spec = ['name']
+        return make_repr_str(self, spec)
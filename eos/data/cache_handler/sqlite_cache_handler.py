@@ -0,0 +1,454 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import json
+import os.path
+import sqlite3
+from collections import OrderedDict
+from logging import getLogger
+from weakref import WeakValueDictionary
+
+from eos.data.cache_object import *
+from eos.util.lru_cache import LruCache
+from eos.util.repr import make_repr_str
+from .abc import BaseCacheHandler, synchronized
+from .exception import TypeFetchError, AttributeFetchError, EffectFetchError, ModifierFetchError
+
+
+logger = getLogger(__name__)
+
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)',
+    'CREATE TABLE IF NOT EXISTS types (type_id INTEGER PRIMARY KEY, group_id, category, default_effect)',
+    'CREATE TABLE IF NOT EXISTS type_attributes ('
+    'type_id INTEGER, attribute_id INTEGER, value, PRIMARY KEY (type_id, attribute_id)) WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS type_effects ('
+    'type_id INTEGER, position INTEGER, effect_id INTEGER, PRIMARY KEY (type_id, position)) WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS attributes ('
+    'attribute_id INTEGER PRIMARY KEY, max_attribute, default_value, high_is_good, stackable)',
+    'CREATE TABLE IF NOT EXISTS effects ('
+    'effect_id INTEGER PRIMARY KEY, effect_category, is_offensive, is_assistance, duration_attribute, '
+    'discharge_attribute, range_attribute, falloff_attribute, tracking_speed_attribute, '
+    'fitting_usage_chance_attribute, build_status)',
+    'CREATE TABLE IF NOT EXISTS effect_modifiers ('
+    'effect_id INTEGER, position INTEGER, modifier_id INTEGER, PRIMARY KEY (effect_id, position)) WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS modifiers ('
+    'modifier_id INTEGER PRIMARY KEY, state, scope, src_attr, operator, tgt_attr, domain, '
+    'filter_type, filter_value)'
+)
+
+# Description of tables, where rows are updated on per-entity basis
+# Format: {table name: (key column, (value columns))}
+TABLES = OrderedDict((
+    ('types', ('type_id', ('group_id', 'category', 'default_effect'))),
+    ('type_attributes', ('type_id', ('attribute_id', 'value'))),
+    ('type_effects', ('type_id', ('position', 'effect_id'))),
+    ('attributes', ('attribute_id', ('max_attribute', 'default_value', 'high_is_good', 'stackable'))),
+    ('effects', ('effect_id', (
+        'effect_category', 'is_offensive', 'is_assistance', 'duration_attribute',
+        'discharge_attribute', 'range_attribute', 'falloff_attribute', 'tracking_speed_attribute',
+        'fitting_usage_chance_attribute', 'build_status'))),
+    ('effect_modifiers', ('effect_id', ('position', 'modifier_id'))),
+    ('modifiers', ('modifier_id', (
+        'state', 'scope', 'src_attr', 'operator', 'tgt_attr', 'domain', 'filter_type', 'filter_value')))
+))
+
+
+def _encode_flag(value):
+    """
+    SQLite has no boolean type, thus flags are stored
+    JSON-encoded to keep their original type.
+    """
+    return json.dumps(value)
+
+
+def _decode_flag(value):
+    return json.loads(value)
+
+
+class SQLiteCacheHandler(BaseCacheHandler):
+    """
+    This cache handler implements on-disk cache store in the form
+    of SQLite database. Rows are fetched only when entity is
+    requested; bounded cache of recently fetched rows and weakref
+    object cache for assembled objects are used to reduce amount
+    of queries.
+
+    Required arguments:
+    cache_path -- file name where on-disk cache will be stored
+
+    Optional arguments:
+    row_cache_size -- how many rows of each entity type are
+    kept in memory (default 1024)
+    """
+
+    def __init__(self, cache_path, row_cache_size=1024):
+        super().__init__()
+        self._cache_path = os.path.abspath(cache_path)
+        self.__connection = None
+        self.__fingerprint = None
+        # Initialize row cache
+        # Format: {entity ID: row}
+        self.__type_row_cache = LruCache(row_cache_size)
+        self.__attribute_row_cache = LruCache(row_cache_size)
+        self.__effect_row_cache = LruCache(row_cache_size)
+        self.__modifier_row_cache = LruCache(row_cache_size)
+        # Initialize weakref object cache
+        self.__type_obj_cache = WeakValueDictionary()
+        self.__attribute_obj_cache = WeakValueDictionary()
+        self.__effect_obj_cache = WeakValueDictionary()
+        self.__modifier_obj_cache = WeakValueDictionary()
+        # If cache doesn't exist, silently finish initialization,
+        # database will be created on update
+        if not os.path.exists(self._cache_path):
+            return
+        try:
+            self.__connect()
+            row = self.__connection.execute('SELECT value FROM meta WHERE key = ?', ('fingerprint',)).fetchone()
+        except KeyboardInterrupt:
+            raise
+        # If file is damaged, or anything else bad happens,
+        # do not load anything and leave values as initialized
+        except:
+            self.__disconnect()
+            msg = 'error during reading cache'
+            logger.error(msg)
+        else:
+            if row is not None:
+                self.__fingerprint = row[0]
+
+    @synchronized
+    def get_type(self, type_id):
+        try:
+            type_id = int(type_id)
+        except TypeError as e:
+            raise TypeFetchError(type_id) from e
+        try:
+            type_ = self.__type_obj_cache[type_id]
+        except KeyError:
+            type_data = self.__get_row(self.__type_row_cache, self.__fetch_type, type_id)
+            if type_data is None:
+                raise TypeFetchError(type_id)
+            type_ = Type(
+                type_id=type_id,
+                group=type_data[0],
+                category=type_data[1],
+                attributes={attr_id: attr_val for attr_id, attr_val in type_data[2]},
+                effects=tuple(self.get_effect(effect_id) for effect_id in type_data[3]),
+                default_effect=None if type_data[4] is None else self.get_effect(type_data[4])
+            )
+            self.__type_obj_cache[type_id] = type_
+        return type_
+
+    @synchronized
+    def get_attribute(self, attr_id):
+        try:
+            attr_id = int(attr_id)
+        except TypeError as e:
+            raise AttributeFetchError(attr_id) from e
+        try:
+            attribute = self.__attribute_obj_cache[attr_id]
+        except KeyError:
+            attr_data = self.__get_row(self.__attribute_row_cache, self.__fetch_attribute, attr_id)
+            if attr_data is None:
+                raise AttributeFetchError(attr_id)
+            attribute = Attribute(
+                attribute_id=attr_id,
+                max_attribute=attr_data[0],
+                default_value=attr_data[1],
+                high_is_good=attr_data[2],
+                stackable=attr_data[3]
+            )
+            self.__attribute_obj_cache[attr_id] = attribute
+        return attribute
+
+    @synchronized
+    def get_effect(self, effect_id):
+        try:
+            effect_id = int(effect_id)
+        except TypeError as e:
+            raise EffectFetchError(effect_id) from e
+        try:
+            effect = self.__effect_obj_cache[effect_id]
+        except KeyError:
+            effect_data = self.__get_row(self.__effect_row_cache, self.__fetch_effect, effect_id)
+            if effect_data is None:
+                raise EffectFetchError(effect_id)
+            effect = Effect(
+                effect_id=effect_id,
+                category=effect_data[0],
+                is_offensive=effect_data[1],
+                is_assistance=effect_data[2],
+                duration_attribute=effect_data[3],
+                discharge_attribute=effect_data[4],
+                range_attribute=effect_data[5],
+                falloff_attribute=effect_data[6],
+                tracking_speed_attribute=effect_data[7],
+                fitting_usage_chance_attribute=effect_data[8],
+                build_status=effect_data[9],
+                modifiers=tuple(self.get_modifier(modifier_id) for modifier_id in effect_data[10])
+            )
+            self.__effect_obj_cache[effect_id] = effect
+        return effect
+
+    @synchronized
+    def get_modifier(self, modifier_id):
+        try:
+            modifier_id = int(modifier_id)
+        except TypeError as e:
+            raise ModifierFetchError(modifier_id) from e
+        try:
+            modifier = self.__modifier_obj_cache[modifier_id]
+        except KeyError:
+            modifier_data = self.__get_row(self.__modifier_row_cache, self.__fetch_modifier, modifier_id)
+            if modifier_data is None:
+                raise ModifierFetchError(modifier_id)
+            modifier = Modifier(
+                modifier_id=modifier_id,
+                state=modifier_data[0],
+                scope=modifier_data[1],
+                src_attr=modifier_data[2],
+                operator=modifier_data[3],
+                tgt_attr=modifier_data[4],
+                domain=modifier_data[5],
+                filter_type=modifier_data[6],
+                filter_value=modifier_data[7]
+            )
+            self.__modifier_obj_cache[modifier_id] = modifier
+        return modifier
+
+    def get_fingerprint(self):
+        return self.__fingerprint
+
+    @synchronized
+    def update_cache(self, data, fingerprint):
+        if self.__connection is None:
+            cache_folder = os.path.dirname(self._cache_path)
+            if os.path.isdir(cache_folder) is not True:
+                os.makedirs(cache_folder, mode=0o755)
+            # If we have no connection while file exists, it's
+            # damaged; start from scratch
+            if os.path.exists(self._cache_path):
+                os.remove(self._cache_path)
+            self.__connect()
+        rows = self.__strip_data(data)
+        connection = self.__connection
+        # Only entities whose rows differ from stored ones
+        # are written, everything in single transaction
+        with connection:
+            for table, (key_column, value_columns) in TABLES.items():
+                self.__update_table(table, key_column, value_columns, rows[table])
+            connection.execute(
+                'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                ('fingerprint', fingerprint)
+            )
+        self.__fingerprint = fingerprint
+        # Clear row and object caches to make sure
+        # objects composed from old data are gone
+        for cache in (
+            self.__type_row_cache, self.__attribute_row_cache,
+            self.__effect_row_cache, self.__modifier_row_cache,
+            self.__type_obj_cache, self.__attribute_obj_cache,
+            self.__effect_obj_cache, self.__modifier_obj_cache
+        ):
+            cache.clear()
+        self._clear_preloaded()
+
+    def _get_generator_state_path(self):
+        return '{}.state'.format(self._cache_path)
+
+    @synchronized
+    def _get_type_ids(self, categories=None, groups=None):
+        if self.__connection is None:
+            return []
+        if categories is None and groups is None:
+            return [row[0] for row in self.__connection.execute('SELECT type_id FROM types')]
+        categories = tuple(categories or ())
+        groups = tuple(groups or ())
+        query = 'SELECT type_id FROM types WHERE category IN ({}) OR group_id IN ({})'.format(
+            ', '.join('?' * len(categories)), ', '.join('?' * len(groups)))
+        return [row[0] for row in self.__connection.execute(query, categories + groups)]
+
+    def __connect(self):
+        """Open database and make sure it has all the tables."""
+        # Connection is also used by background warm-up thread,
+        # access to it is serialized by handler lock
+        self.__connection = sqlite3.connect(self._cache_path, check_same_thread=False)
+        with self.__connection:
+            for statement in SCHEMA:
+                self.__connection.execute(statement)
+
+    def __disconnect(self):
+        if self.__connection is not None:
+            self.__connection.close()
+        self.__connection = None
+
+    def __strip_data(self, data):
+        """
+        Rework passed data into table rows.
+
+        Return value:
+        Dictionary in {table name: {entity ID: {(row values)}}} format,
+        where row values do not include entity ID
+        """
+        rows = {table: {} for table in TABLES}
+        for type_row in data['types']:
+            type_id = type_row['type_id']
+            rows['types'][type_id] = {
+                (type_row['group'], type_row['category'], type_row['default_effect'])
+            }
+            rows['type_attributes'][type_id] = set(type_row['attributes'].items())
+            rows['type_effects'][type_id] = set(enumerate(type_row['effects']))
+        for attr_row in data['attributes']:
+            rows['attributes'][attr_row['attribute_id']] = {(
+                attr_row['max_attribute'],
+                attr_row['default_value'],
+                _encode_flag(attr_row['high_is_good']),
+                _encode_flag(attr_row['stackable'])
+            )}
+        for effect_row in data['effects']:
+            effect_id = effect_row['effect_id']
+            rows['effects'][effect_id] = {(
+                effect_row['effect_category'],
+                _encode_flag(effect_row['is_offensive']),
+                _encode_flag(effect_row['is_assistance']),
+                effect_row['duration_attribute'],
+                effect_row['discharge_attribute'],
+                effect_row['range_attribute'],
+                effect_row['falloff_attribute'],
+                effect_row['tracking_speed_attribute'],
+                effect_row['fitting_usage_chance_attribute'],
+                effect_row['build_status']
+            )}
+            rows['effect_modifiers'][effect_id] = set(enumerate(effect_row['modifiers']))
+        for modifier_row in data['modifiers']:
+            rows['modifiers'][modifier_row['modifier_id']] = {(
+                modifier_row['state'],
+                modifier_row['scope'],
+                modifier_row['src_attr'],
+                modifier_row['operator'],
+                modifier_row['tgt_attr'],
+                modifier_row['domain'],
+                modifier_row['filter_type'],
+                modifier_row['filter_value']
+            )}
+        return rows
+
+    def __update_table(self, table, key_column, value_columns, new_rows):
+        """
+        Bring table contents in line with passed rows, touching
+        only rows of entities which have changed.
+
+        Required arguments:
+        table -- name of table
+        key_column -- name of column with entity ID
+        value_columns -- names of other columns
+        new_rows -- format: {entity ID: {(row values)}}
+        """
+        connection = self.__connection
+        # Format: {entity ID: {(row values)}}
+        old_rows = {}
+        query = 'SELECT {}, {} FROM {}'.format(key_column, ', '.join(value_columns), table)
+        for row in connection.execute(query):
+            old_rows.setdefault(row[0], set()).add(tuple(row[1:]))
+        delete_query = 'DELETE FROM {} WHERE {} = ?'.format(table, key_column)
+        insert_query = 'INSERT INTO {} ({}, {}) VALUES ({})'.format(
+            table, key_column, ', '.join(value_columns), ', '.join('?' * (len(value_columns) + 1)))
+        for entity_id in old_rows.keys() - new_rows.keys():
+            connection.execute(delete_query, (entity_id,))
+        for entity_id, entity_rows in new_rows.items():
+            if old_rows.get(entity_id, set()) == entity_rows:
+                continue
+            connection.execute(delete_query, (entity_id,))
+            connection.executemany(insert_query, ((entity_id,) + row for row in entity_rows))
+
+    def __get_row(self, row_cache, fetcher, entity_id):
+        """
+        Get entity data from row cache, or fetch it from database.
+
+        Required arguments:
+        row_cache -- row cache for given entity type
+        fetcher -- method which fetches row from database
+        entity_id -- ID of entity
+
+        Return value:
+        Entity data, or None if it's not found
+        """
+        row = row_cache.get(entity_id)
+        if row is None:
+            if self.__connection is None:
+                return None
+            row = fetcher(entity_id)
+            if row is None:
+                return None
+            row_cache.put(entity_id, row)
+        return row
+
+    def __fetch_type(self, type_id):
+        connection = self.__connection
+        row = connection.execute(
+            'SELECT group_id, category, default_effect FROM types WHERE type_id = ?', (type_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        group, category, default_effect = row
+        attributes = tuple(connection.execute(
+            'SELECT attribute_id, value FROM type_attributes WHERE type_id = ?', (type_id,)
+        ))
+        effects = tuple(r[0] for r in connection.execute(
+            'SELECT effect_id FROM type_effects WHERE type_id = ? ORDER BY position', (type_id,)
+        ))
+        return group, category, attributes, effects, default_effect
+
+    def __fetch_attribute(self, attr_id):
+        row = self.__connection.execute(
+            'SELECT max_attribute, default_value, high_is_good, stackable '
+            'FROM attributes WHERE attribute_id = ?', (attr_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        max_attribute, default_value, high_is_good, stackable = row
+        return max_attribute, default_value, _decode_flag(high_is_good), _decode_flag(stackable)
+
+    def __fetch_effect(self, effect_id):
+        connection = self.__connection
+        row = connection.execute(
+            'SELECT effect_category, is_offensive, is_assistance, duration_attribute, discharge_attribute, '
+            'range_attribute, falloff_attribute, tracking_speed_attribute, fitting_usage_chance_attribute, '
+            'build_status FROM effects WHERE effect_id = ?', (effect_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        modifiers = tuple(r[0] for r in connection.execute(
+            'SELECT modifier_id FROM effect_modifiers WHERE effect_id = ? ORDER BY position', (effect_id,)
+        ))
+        return (row[0], _decode_flag(row[1]), _decode_flag(row[2])) + tuple(row[3:]) + (modifiers,)
+
+    def __fetch_modifier(self, modifier_id):
+        return self.__connection.execute(
+            'SELECT state, scope, src_attr, operator, tgt_attr, domain, filter_type, filter_value '
+            'FROM modifiers WHERE modifier_id = ?', (modifier_id,)
+        ).fetchone()
+
+    def __repr__(self):
+        spec = [['cache_path', '_cache_path']]
+        return make_repr_str(self, spec)
@@ -25,6 +25,8 @@ from eos.util.repr import make_repr_str
 class Attribute:
     """Class-holder for attribute metadata"""
 
+    __slots__ = ('id', 'max_attribute', 'default_value', 'high_is_good', 'stackable', '__weakref__')
+
     def __init__(
         self,
         attribute_id=None,
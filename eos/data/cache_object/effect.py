@@ -21,7 +21,7 @@
 
 from eos.const.eos import State
 from eos.const.eve import EffectCategory
-from eos.util.cached_property import CachedProperty
+from eos.util.cached_property import CachedSlotProperty
 from eos.util.repr import make_repr_str
 
 
@@ -31,6 +31,13 @@ class Effect:
     does with other items.
     """
 
+    __slots__ = (
+        'id', 'category', 'is_offensive', 'is_assistance', 'duration_attribute',
+        'discharge_attribute', 'range_attribute', 'falloff_attribute',
+        'tracking_speed_attribute', 'fitting_usage_chance_attribute',
+        'build_status', 'modifiers', '_cached__state', '__weakref__'
+    )
+
     def __init__(
         self,
         effect_id=None,
@@ -44,7 +51,8 @@ class Effect:
         tracking_speed_attribute=None,
         fitting_usage_chance_attribute=None,
         build_status=None,
-        modifiers=()
+        modifiers=(),
+        state=None
     ):
         self.id = effect_id
 
@@ -88,6 +96,11 @@ class Effect:
         # Stores Modifiers which are assigned to given effect
         self.modifiers = modifiers
 
+        # State can be precalculated and passed here; if it
+        # isn't, it's derived from category on first access
+        if state is not None:
+            self._state = state
+
     # Format: {effect category ID: state ID}
     __effect_state_map = {
         EffectCategory.passive: State.offline,
@@ -98,13 +111,29 @@ class Effect:
         EffectCategory.system: State.offline
     }
 
-    @CachedProperty
+    @CachedSlotProperty
     def _state(self):
         """
         Return state of effect - if holder takes this state or
         higher, effect activates.
         """
-        return self.__effect_state_map[self.category]
+        return self._derive_state(self.category)
+
+    @classmethod
+    def _derive_state(cls, category):
+        """
+        Derive state of effect from its category.
+
+        Required arguments:
+        category -- effect category ID
+
+        Return value:
+        State class' attribute value
+
+        Possible exceptions:
+        KeyError -- raised when category is unknown
+        """
+        return cls.__effect_state_map[category]
 
     def __repr__(self):
         spec = ['id']
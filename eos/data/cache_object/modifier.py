@@ -30,6 +30,11 @@ class Modifier:
     apply it, and so on.
     """
 
+    __slots__ = (
+        'id', 'state', 'scope', 'src_attr', 'operator', 'tgt_attr',
+        'domain', 'filter_type', 'filter_value', '__weakref__'
+    )
+
     def __init__(
         self,
         modifier_id=None,
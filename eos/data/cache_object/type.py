@@ -21,7 +21,7 @@
 
 from eos.const.eos import Slot, State
 from eos.const.eve import Attribute, Effect, EffectCategory
-from eos.util.cached_property import CachedProperty
+from eos.util.cached_property import CachedSlotProperty
 from eos.util.repr import make_repr_str
 
 
@@ -31,6 +31,12 @@ class Type:
     incursion system-wide effects are actually items.
     """
 
+    __slots__ = (
+        'id', 'group', 'category', 'attributes', 'effects', 'default_effect',
+        '_cached_required_skills', '_cached_max_state', '_cached_is_targeted',
+        '_cached_slots', '__weakref__'
+    )
+
     def __init__(
         self,
         type_id=None,
@@ -38,7 +44,11 @@ class Type:
         category=None,
         attributes=None,
         effects=(),
-        default_effect=None
+        default_effect=None,
+        required_skills=None,
+        max_state=None,
+        is_targeted=None,
+        slots=None
     ):
         self.id = type_id
 
@@ -60,6 +70,17 @@ class Type:
         # Default effect of item, which defines its several major properties
         self.default_effect = default_effect
 
+        # Properties derived from data above can be precalculated and
+        # passed here; if they are not, they are derived on first access
+        if required_skills is not None:
+            self.required_skills = required_skills
+        if max_state is not None:
+            self.max_state = max_state
+        if is_targeted is not None:
+            self.is_targeted = is_targeted
+        if slots is not None:
+            self.slots = slots
+
     @property
     def modifiers(self):
         """ Get all modifiers spawned by item effects."""
@@ -80,7 +101,7 @@ class Type:
         Attribute.required_skill_6: Attribute.required_skill_6_level
     }
 
-    @CachedProperty
+    @CachedSlotProperty
     def required_skills(self):
         """
         Get skill requirements.
@@ -89,22 +110,35 @@ class Type:
         Dictionary with IDs of skills and corresponding skill levels,
         which are required to use type
         """
+        return self._derive_required_skills(self.attributes)
+
+    @classmethod
+    def _derive_required_skills(cls, attributes):
+        """
+        Derive skill requirements from type attributes.
+
+        Required arguments:
+        attributes -- map with type attributes
+
+        Return value:
+        Dictionary with IDs of skills and corresponding skill levels
+        """
         required_skills = {}
-        for srq_attr in self.__skillrq_attrs:
+        for srq_attr in cls.__skillrq_attrs:
             # Skip skill requirement attribute pair if any
             # of them is not available
             try:
-                srq = self.attributes[srq_attr]
+                srq = attributes[srq_attr]
             except KeyError:
                 continue
             try:
-                srq_lvl = self.attributes[self.__skillrq_attrs[srq_attr]]
+                srq_lvl = attributes[cls.__skillrq_attrs[srq_attr]]
             except KeyError:
                 continue
             required_skills[int(srq)] = int(srq_lvl)
         return required_skills
 
-    @CachedProperty
+    @CachedSlotProperty
     def max_state(self):
         """
         Get highest state this type is allowed to take.
@@ -112,17 +146,31 @@ class Type:
         Return value:
         State class' attribute value, representing highest state
         """
-        # All types can be at least offline,
-        # even when they have no effects
-        max_state = State.offline
         # We cycle through effects, because each effect isn't
         # guaranteed to produce modifier, thus effects are
         # more reliable data source
-        for effect in self.effects:
-            max_state = max(max_state, effect._state)
+        return self._derive_max_state(effect._state for effect in self.effects)
+
+    @classmethod
+    def _derive_max_state(cls, effect_states):
+        """
+        Derive highest state type can take from states
+        of its effects.
+
+        Required arguments:
+        effect_states -- iterable with states of type effects
+
+        Return value:
+        State class' attribute value, representing highest state
+        """
+        # All types can be at least offline,
+        # even when they have no effects
+        max_state = State.offline
+        for effect_state in effect_states:
+            max_state = max(max_state, effect_state)
         return max_state
 
-    @CachedProperty
+    @CachedSlotProperty
     def is_targeted(self):
         """
         Report if type is targeted or not. Targeted types cannot be
@@ -131,14 +179,21 @@ class Type:
         Return value:
         Boolean targeted flag
         """
-        # Assume type is unable to target by default
-        targeted = False
-        for effect in self.effects:
-            # If any of effects is targeted, then type is targeted
-            if effect.category == EffectCategory.target:
-                targeted = True
-                break
-        return targeted
+        return self._derive_is_targeted(effect.category for effect in self.effects)
+
+    @classmethod
+    def _derive_is_targeted(cls, effect_categories):
+        """
+        Derive targeted flag from categories of type effects.
+
+        Required arguments:
+        effect_categories -- iterable with categories of type effects
+
+        Return value:
+        Boolean targeted flag
+        """
+        # If any of effects is targeted, then type is targeted
+        return any(category == EffectCategory.target for category in effect_categories)
 
     # Format: {effect ID: slot ID}
     __effect_slot_map = {
@@ -151,20 +206,33 @@ class Type:
         Effect.subsystem: Slot.subsystem
     }
 
-    @CachedProperty
+    @CachedSlotProperty
     def slots(self):
         """
         Get types of slots this type occupies.
 
+        Return value:
+        Set with slot types
+        """
+        return self._derive_slots(effect.id for effect in self.effects)
+
+    @classmethod
+    def _derive_slots(cls, effect_ids):
+        """
+        Derive slot types from IDs of type effects.
+
+        Required arguments:
+        effect_ids -- iterable with IDs of type effects
+
         Return value:
         Set with slot types
         """
         # Container for slot types item uses
         slots = set()
-        for effect in self.effects:
+        for effect_id in effect_ids:
             # Convert effect ID to slot type item takes
             try:
-                slot = self.__effect_slot_map[effect.id]
+                slot = cls.__effect_slot_map[effect_id]
             # Silently skip effect if it's not in map
             except KeyError:
                 pass
@@ -26,13 +26,16 @@ from eos import __version__ as eos_version
 from eos.util.repr import make_repr_str
 from .cache_customizer import CacheCustomizer
 from .cache_generator import CacheGenerator
+from .cache_handler.preload import HOT_CATEGORIES
 from .exception import ExistingSourceError, UnknownSourceError
 
 
 logger = getLogger(__name__)
 
 
-Source = namedtuple('Source', ('alias', 'cache_handler'))
+Source = namedtuple('Source', ('alias', 'cache_handler', 'preload_job'))
+# Sources added without warm-up have no preload job
+Source.__new__.__defaults__ = (None,)
 
 
 class SourceManager:
@@ -50,7 +53,10 @@ class SourceManager:
     default = None
 
     @classmethod
-    def add(cls, alias, data_handler, cache_handler, make_default=False):
+    def add(
+        cls, alias, data_handler, cache_handler, make_default=False, preload=None,
+        generator_workers=None, generator_tree_memo=False
+    ):
         """
         Add source to source manager - this includes initializing
         all facilities hidden behind name 'source'. After source
@@ -66,6 +72,18 @@ class SourceManager:
         Optional arguments:
         make_default -- marks passed source default; it will be used
         by default for instantiating new fits
+        preload -- if True, types of commonly used categories (ships,
+        modules, charges, skills, etc.) are preloaded by cache handler
+        in background thread; if dictionary, it is used as keyword
+        arguments for cache handler's preload() method. Warm-up job is
+        accessible as preload_job of the source (default None, no
+        preloading)
+        generator_workers -- amount of processes to build modifiers
+        in when cache has to be generated; if None or 1, modifiers are
+        built in current process (default None)
+        generator_tree_memo -- if True, cache generator memoizes
+        conversion of expression subtrees and logs how much work
+        memoization saved (default False)
         """
         logger.info('adding source with alias "{}"'.format(alias))
         if alias in cls._sources:
@@ -85,13 +103,24 @@ class SourceManager:
                     cache_fp, current_fp)
                 logger.info(msg)
 
-            # Generate cache, apply customizations and write it
-            cache_data = CacheGenerator().run(data_handler)
+            # Generate cache, apply customizations and write it; state
+            # of previous generator run lets it skip unchanged data
+            generator = CacheGenerator(workers=generator_workers, tree_memo=generator_tree_memo)
+            cache_data = generator.run(data_handler, state=cache_handler.get_generator_state())
             CacheCustomizer().run_builtin(cache_data)
             cache_handler.update_cache(cache_data, current_fp)
+            cache_handler.update_generator_state(generator.get_state())
+
+        # Warm up cache, if requested
+        preload_job = None
+        if preload is True:
+            preload = {'categories': HOT_CATEGORIES, 'background': True}
+        if preload:
+            logger.info('preloading types for source with alias "{}"'.format(alias))
+            preload_job = cache_handler.preload(**preload)
 
         # Finally, add record to list of sources
-        source = Source(alias=alias, cache_handler=cache_handler)
+        source = Source(alias=alias, cache_handler=cache_handler, preload_job=preload_job)
         cls._sources[alias] = source
         if make_default is True:
             cls.default = source
@@ -19,5 +19,9 @@
 # ===============================================================================
 
 
+from .affector import AffectorTable
+from .exception import DependencyCycleError
+from .graph import AttributeGraph
 from .map import MutableAttributeMap
+from .metrics import CalculatorMetrics, MetricsSnapshot, process_metrics
 from .tracker import LinkTracker
@@ -26,3 +26,52 @@ from collections import namedtuple
 # for changes and unique identifier) and modifier (which describes whom and
 # how to modify), this tuple represents it
 Affector = namedtuple('Affector', ('source_holder', 'modifier'))
+
+
+class AffectorTable:
+    """
+    Keep affectors spawned by holder's item, grouped by ID of effect
+    which carries modifier, modifier state and modifier scope. Affector
+    objects are created once per item and reused afterwards.
+
+    Required arguments:
+    holder -- holder, whose affectors are stored in table
+    """
+
+    def __init__(self, holder):
+        groups = {}
+        for effect in holder.item.effects:
+            for modifier in effect.modifiers:
+                key = (effect.id, modifier.state, modifier.scope)
+                groups.setdefault(key, []).append(Affector(holder, modifier))
+        # Format: {(effect ID, state, scope): (affectors)}
+        self.__groups = {key: tuple(affectors) for key, affectors in groups.items()}
+
+    def get(self, effect_filter=None, state_filter=None, scope_filter=None):
+        """
+        Get affectors from the table.
+
+        Optional arguments:
+        effect filter -- filter results to include affectors, which
+        carry modifiers generated from effects with IDs on this list;
+        if None, no filtering occurs (default None)
+        state_filter -- filter results by state required by affector's
+        modifier, which should be in this iterable; if None, no
+        filtering occurs (default None)
+        scope_filter -- filter results by scope defined in affector's
+        modifier, which should be in this iterable; if None, no
+        filtering occurs (default None)
+
+        Return value:
+        Set with Affector objects, satisfying passed filters
+        """
+        affectors = set()
+        for (effect_id, state, scope), group in self.__groups.items():
+            if effect_filter is not None and effect_id not in effect_filter:
+                continue
+            if state_filter is not None and state not in state_filter:
+                continue
+            if scope_filter is not None and scope not in scope_filter:
+                continue
+            affectors.update(group)
+        return affectors
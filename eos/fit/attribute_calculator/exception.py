@@ -78,9 +78,10 @@ class AttributeMetaError(AttributeCalculatorError):
     pass
 
 
-class OperatorError(AttributeCalculatorError):
+# Exception classes used by attribute graph
+class DependencyCycleError(AttributeCalculatorError):
     """
-    Raised during calculation process, if attribute affector is
-    using operator which is not supported by calculate method.
+    Raised when attributes depend on each other, thus making
+    it impossible to order their calculation.
     """
     pass
@@ -0,0 +1,149 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from .exception import DependencyCycleError
+
+
+class AttributeGraph:
+    """
+    Dependency graph of attributes of holders. Nodes of graph are
+    (holder, attribute ID) tuples, edges lead from attribute to
+    attributes which are read during its calculation (values of
+    modification sources and capping attributes). Graph is a
+    snapshot: it should be rebuilt when holders, their states
+    or affectors change.
+
+    Required arguments:
+    holders -- iterable with holders, all attributes of which
+    (and attributes they depend on) are included into graph
+    """
+
+    def __init__(self, holders):
+        # Format: {(holder, attribute ID): {(holder, attribute ID)}}
+        self.__dependencies = {}
+        pending = []
+        for holder in holders:
+            for attr in holder.attributes.keys():
+                pending.append((holder, attr))
+        while pending:
+            node = pending.pop()
+            if node in self.__dependencies:
+                continue
+            holder, attr = node
+            dependencies = set(holder.attributes._get_dependencies(attr))
+            self.__dependencies[node] = dependencies
+            pending.extend(dependencies)
+
+    def __len__(self):
+        return len(self.__dependencies)
+
+    def __contains__(self, node):
+        return node in self.__dependencies
+
+    def get_dependencies(self, holder, attr):
+        """
+        Get attributes, upon which passed attribute depends.
+
+        Required arguments:
+        holder -- holder which carries attribute
+        attr -- ID of attribute
+
+        Return value:
+        Set with (holder, attribute ID) tuples
+        """
+        return set(self.__dependencies.get((holder, attr), ()))
+
+    def get_order(self):
+        """
+        Sort graph nodes topologically.
+
+        Return value:
+        List with (holder, attribute ID) tuples, where every
+        attribute goes after all attributes it depends on
+
+        Possible exceptions:
+        DependencyCycleError -- raised when some of attributes
+        depend on each other
+        """
+        # Format: {node: {dependent nodes}}
+        dependents = {}
+        # Format: {node: amount of not yet ordered dependencies}
+        remaining = {}
+        ready = []
+        for node, dependencies in self.__dependencies.items():
+            remaining[node] = len(dependencies)
+            if not dependencies:
+                ready.append(node)
+            for dependency in dependencies:
+                dependents.setdefault(dependency, set()).add(node)
+        order = []
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for dependent in dependents.get(node, ()):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) < len(self.__dependencies):
+            raise DependencyCycleError(self.__find_cycle(remaining))
+        return order
+
+    def evaluate_all(self):
+        """
+        Calculate values of all attributes in graph in single pass,
+        in topological order. As all dependencies of attribute are
+        already calculated when it's processed, no recursive
+        calculations are triggered.
+
+        Possible exceptions:
+        DependencyCycleError -- raised when some of attributes
+        depend on each other; nothing is calculated in this case
+        """
+        for holder, attr in self.get_order():
+            try:
+                holder.attributes[attr]
+            # Errors are logged by map
+            except KeyError:
+                pass
+
+    def __find_cycle(self, remaining):
+        """
+        Find one of dependency cycles in graph.
+
+        Required arguments:
+        remaining -- map with amounts of not ordered dependencies
+        per node, as left by topological sorting
+
+        Return value:
+        Tuple with nodes which form cycle, where each node
+        depends on the next one, and last one on the first
+        """
+        # Every node which couldn't be ordered has at least one
+        # dependency which couldn't be ordered as well; follow
+        # such dependencies until we visit some node twice
+        node = next(n for n, amount in remaining.items() if amount > 0)
+        # Format: {node: position in path}
+        path = {}
+        while node not in path:
+            path[node] = len(path)
+            node = next(d for d in self.__dependencies[node] if remaining[d] > 0)
+        cycle = sorted(path, key=path.get)[path[node]:]
+        return tuple(cycle)
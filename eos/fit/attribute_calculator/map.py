@@ -19,22 +19,22 @@
 # ===============================================================================
 
 
+from collections import namedtuple
 from logging import getLogger
-from math import exp
+from time import perf_counter
 
 from eos.const.eos import Operator
 from eos.const.eve import Category, Attribute
 from eos.data.cache_handler.exception import AttributeFetchError
+from eos.util.compact_dict import CompactFloatDict
 from eos.util.keyed_set import KeyedSet
-from .exception import BaseValueError, AttributeMetaError, OperatorError
+from .exception import BaseValueError, AttributeMetaError
+from .penalty import penalize_value_lists
 
 
 logger = getLogger(__name__)
 
 
-# Stacking penalty base constant, used in attribute calculations
-PENALTY_BASE = 1 / exp((1 / 2.67) ** 2)
-
 # Items belonging to these categories never have
 # their effects stacking penalized
 PENALTY_IMMUNE_CATEGORIES = (
@@ -54,17 +54,18 @@ PENALIZABLE_OPERATORS = (
     Operator.post_div
 )
 
-# Map which helps to normalize modifiers
+# Normalization functions for all supported operators;
+# None means that value is used as-is
 NORMALIZATION_MAP = {
-    Operator.pre_assign: lambda val: val,
-    Operator.pre_mul: lambda val: val,
+    Operator.pre_assign: None,
+    Operator.pre_mul: None,
     Operator.pre_div: lambda val: 1 / val,
-    Operator.mod_add: lambda val: val,
+    Operator.mod_add: None,
     Operator.mod_sub: lambda val: -val,
-    Operator.post_mul: lambda val: val,
+    Operator.post_mul: None,
     Operator.post_div: lambda val: 1 / val,
     Operator.post_percent: lambda val: val / 100 + 1,
-    Operator.post_assign: lambda val: val
+    Operator.post_assign: None
 }
 
 # List operator types, according to their already normalized values
@@ -94,6 +95,18 @@ LIMITED_PRECISION = (
 )
 
 
+# Everything which is needed to calculate value of attribute on holder,
+# besides values of source attributes. Operations are (operator,
+# normalization function, non-penalized sources, penalized sources)
+# tuples sorted by operator, where sources are (source holder, source
+# attribute ID) tuples. Dependencies are (holder, attribute ID) tuples
+# for all attributes which are read during calculation
+CalculationPlan = namedtuple(
+    'CalculationPlan',
+    ('base_value', 'high_is_good', 'max_attribute', 'operations', 'dependencies')
+)
+
+
 class MutableAttributeMap:
     """
     Calculate, store and provide access to modified attribute values.
@@ -105,15 +118,33 @@ class MutableAttributeMap:
     def __init__(self, holder):
         # Reference to holder for internal needs
         self.__holder = holder
-        # Actual container of calculated attributes
+        # Actual container of calculated attributes; all values
+        # are numbers, thus they are stored in compact form
         # Format: {attribute ID: value}
-        self.__modified_attributes = {}
+        self.__modified_attributes = CompactFloatDict()
+        # Calculation plans of attributes; they do not depend on
+        # source values and are kept until set of affectors which
+        # influence attribute changes
+        # Format: {attribute ID: CalculationPlan}
+        self.__plans = {}
         # This variable stores map of attributes which cap
         # something, and attributes capped by them. Initialized
         # to None to not waste memory, will be changed to dict
         # when needed.
         # Format {capping attribute ID: {capped attribute IDs}}
         self._cap_map = None
+        # Containers used only when link tracker works in lazy
+        # invalidation mode. Values are stamped with revisions of
+        # link tracker: when value has been verified last time (None
+        # if it has to be recalculated) and when it has changed last
+        # time. Values which aren't calculated (e.g. set manually)
+        # have no dependencies.
+        # Format: {attribute ID: revision}
+        self.__verified_at = {}
+        # Format: {attribute ID: revision}
+        self.__changed_at = {}
+        # Format: {attribute ID: ((holder, attribute ID), ...)}
+        self.__dependencies = {}
 
     def __getitem__(self, attr):
         # Special handling for skill level attribute
@@ -132,28 +163,29 @@ class MutableAttributeMap:
         if self.__holder._fit is None:
             val = self.__holder.item.attributes[attr]
             return val
+        link_tracker = self.__holder._fit._link_tracker
+        if link_tracker._lazy_invalidation is True:
+            return self.__get_verified(attr, link_tracker)
         # If value is stored, it's considered valid
         try:
             val = self.__modified_attributes[attr]
         # Else, we have to run full calculation process
         except KeyError:
-            try:
-                val = self.__modified_attributes[attr] = self.__calculate(attr)
-            except BaseValueError as e:
-                msg = 'unable to find base value for attribute {} on item {}'.format(
-                    e.args[0], self.__holder.item.id)
-                logger.warning(msg)
-                raise KeyError(attr) from e
-            except AttributeMetaError as e:
-                msg = 'unable to fetch metadata for attribute {}, requested for item {}'.format(
-                    e.args[0], self.__holder.item.id)
-                logger.error(msg)
-                raise KeyError(attr) from e
-            self.__holder._fit._link_tracker.clear_holder_attribute_dependents(self.__holder, attr)
+            if link_tracker._metrics is not None:
+                link_tracker._metrics.record_miss()
+            val, _ = self.__calculate_checked(attr)
+            self.__modified_attributes[attr] = val
+            link_tracker.clear_holder_attribute_dependents(self.__holder, attr)
+        else:
+            if link_tracker._metrics is not None:
+                link_tracker._metrics.record_hit()
         return val
 
     def __len__(self):
-        return len(self.keys())
+        # Count unique IDs from both attribute containers
+        # without building their union
+        item_attrs = self.__holder.item.attributes
+        return len(item_attrs) + sum(1 for attr in self.__modified_attributes if attr not in item_attrs)
 
     def __contains__(self, attr):
         # Seek for attribute in both modified attribute container
@@ -162,10 +194,21 @@ class MutableAttributeMap:
         return result
 
     def __iter__(self):
-        for k in self.keys():
-            yield k
+        item_attrs = self.__holder.item.attributes
+        yield from item_attrs
+        for attr in self.__modified_attributes:
+            if attr not in item_attrs:
+                yield attr
 
     def __delitem__(self, attr):
+        link_tracker = self.__holder._fit._link_tracker
+        # In lazy mode, just mark value as the one which
+        # has to be recalculated
+        if link_tracker._lazy_invalidation is True:
+            if attr in self.__modified_attributes:
+                link_tracker._bump_revision()
+                self.__verified_at[attr] = None
+            return
         # Clear the value in our calculated attributes dictionary
         try:
             del self.__modified_attributes[attr]
@@ -175,12 +218,24 @@ class MutableAttributeMap:
         # And make sure all other attributes relying on it
         # are cleared too
         else:
-            self.__holder._fit._link_tracker.clear_holder_attribute_dependents(self.__holder, attr)
+            if link_tracker._metrics is not None:
+                link_tracker._metrics.record_invalidation()
+            link_tracker.clear_holder_attribute_dependents(self.__holder, attr)
 
     def __setitem__(self, attr, value):
+        link_tracker = self.__holder._fit._link_tracker
+        # In lazy mode, stamp value without dependencies,
+        # dependents will notice change on access
+        if link_tracker._lazy_invalidation is True:
+            revision = link_tracker._bump_revision()
+            self.__modified_attributes[attr] = value
+            self.__verified_at[attr] = revision
+            self.__changed_at[attr] = revision
+            self.__dependencies.pop(attr, None)
+            return
         # Write value and clear all attributes relying on it
         self.__modified_attributes[attr] = value
-        self.__holder._fit._link_tracker.clear_holder_attribute_dependents(self.__holder, attr)
+        link_tracker.clear_holder_attribute_dependents(self.__holder, attr)
 
     def get(self, attr, default=None):
         try:
@@ -195,7 +250,183 @@ class MutableAttributeMap:
     def clear(self):
         """Reset map to its initial state."""
         self.__modified_attributes.clear()
+        self.__plans.clear()
         self._cap_map = None
+        self.__verified_at.clear()
+        self.__changed_at.clear()
+        self.__dependencies.clear()
+
+    def _clear_plan(self, attr):
+        """
+        Remove calculation plan of attribute, should be called
+        when set of affectors influencing it changes.
+
+        Required arguments:
+        attr -- ID of attribute
+        """
+        self.__plans.pop(attr, None)
+
+    def _clear_plans(self):
+        """Remove calculation plans of all attributes."""
+        self.__plans.clear()
+
+    def _mark_changed(self, attr):
+        """
+        Stamp attribute as changed without touching its value, used
+        in lazy invalidation mode when something besides map itself
+        (like skill level) defines value of attribute.
+
+        Required arguments:
+        attr -- ID of attribute
+        """
+        self.__changed_at[attr] = self.__holder._fit._link_tracker._bump_revision()
+
+    def _get_changed_at(self, attr):
+        """
+        Make sure value of attribute is up to date and return
+        revision at which it has changed last time. Used in
+        lazy invalidation mode.
+
+        Required arguments:
+        attr -- ID of attribute
+
+        Return value:
+        Revision number
+        """
+        try:
+            self[attr]
+        except KeyError:
+            pass
+        return self.__changed_at.get(attr, 0)
+
+    def _get_dependencies(self, attr):
+        """
+        Get attributes which are read during calculation of
+        value of passed attribute.
+
+        Required arguments:
+        attr -- ID of attribute
+
+        Return value:
+        Tuple with (holder, attribute ID) tuples; if attribute
+        cannot be calculated, tuple is empty
+        """
+        # Skill level doesn't rely on anything if it's
+        # taken from holder directly
+        if attr == Attribute.skill_level and hasattr(self.__holder, 'level'):
+            return ()
+        try:
+            plan = self.__plans[attr]
+        except KeyError:
+            try:
+                plan = self.__plans[attr] = self.__compile_plan(attr)
+            # Errors will be logged when attribute is accessed
+            except (BaseValueError, AttributeMetaError):
+                return ()
+        return plan.dependencies
+
+    def __get_verified(self, attr, link_tracker):
+        """
+        Get value of attribute in lazy invalidation mode. Stored
+        value is returned if none of its dependencies changed
+        since it was verified last time, else it's recalculated.
+
+        Required arguments:
+        attr -- ID of attribute
+        link_tracker -- link tracker of holder's fit
+
+        Return value:
+        Attribute value
+        """
+        revision = link_tracker._revision
+        metrics = link_tracker._metrics
+        try:
+            val = self.__modified_attributes[attr]
+        except KeyError:
+            pass
+        else:
+            verified_at = self.__verified_at[attr]
+            if verified_at == revision:
+                if metrics is not None:
+                    metrics.record_hit()
+                return val
+            if verified_at is not None and self.__is_up_to_date(attr, verified_at):
+                self.__verified_at[attr] = revision
+                if metrics is not None:
+                    metrics.record_hit()
+                return val
+        if metrics is not None:
+            metrics.record_miss()
+        try:
+            new_val, plan = self.__calculate_checked(attr)
+        # If attribute cannot be calculated anymore, it
+        # is changed as well
+        except KeyError:
+            if self.__modified_attributes.pop(attr, None) is not None:
+                self.__changed_at[attr] = revision
+            self.__verified_at.pop(attr, None)
+            self.__dependencies.pop(attr, None)
+            raise
+        # If value didn't change, keep old change stamp, this way
+        # dependents do not need to be recalculated
+        if attr not in self.__modified_attributes or self.__modified_attributes[attr] != new_val:
+            self.__changed_at[attr] = revision
+        self.__modified_attributes[attr] = new_val
+        self.__verified_at[attr] = revision
+        self.__dependencies[attr] = plan.dependencies
+        return new_val
+
+    def __is_up_to_date(self, attr, verified_at):
+        """
+        Check if none of dependencies of attribute has been changed
+        since passed revision.
+
+        Required arguments:
+        attr -- ID of attribute
+        verified_at -- revision to check against
+
+        Return value:
+        True if attribute value is up to date, else False
+        """
+        for dep_holder, dep_attr in self.__dependencies.get(attr, ()):
+            if dep_holder.attributes._get_changed_at(dep_attr) > verified_at:
+                return False
+        return True
+
+    def __calculate_checked(self, attr):
+        """
+        Calculate attribute value, logging calculation errors.
+
+        Required arguments:
+        attr -- ID of attribute to be calculated
+
+        Return value:
+        (attribute value, calculation plan) tuple
+
+        Possible exceptions:
+        KeyError -- raised when attribute cannot be calculated
+        """
+        metrics = self.__holder._fit._link_tracker._metrics
+        try:
+            if metrics is None:
+                return self.__calculate(attr)
+            start = perf_counter()
+            result, plan = self.__calculate(attr)
+            affector_amount = 0
+            for _, _, normal_sources, penalized_sources in plan.operations:
+                affector_amount += len(normal_sources) + len(penalized_sources)
+            metrics.record_calculation(attr, affector_amount, perf_counter() - start)
+            return result, plan
+        except BaseValueError as e:
+            msg = 'unable to find base value for attribute {} on item {}'.format(
+                e.args[0], self.__holder.item.id)
+            logger.warning(msg)
+            raise KeyError(attr) from e
+        except AttributeMetaError as e:
+            msg = 'unable to fetch metadata for attribute {}, requested for item {}'.format(
+                e.args[0], self.__holder.item.id)
+            logger.error(msg)
+            raise KeyError(attr) from e
 
     def __calculate(self, attr):
         """
@@ -205,90 +436,44 @@ class MutableAttributeMap:
         attr -- ID of attribute to be calculated
 
         Return value:
-        Calculated attribute value
+        (calculated attribute value, calculation plan) tuple
 
         Possible exceptions:
         BaseValueError -- attribute cannot be calculated, as its
         base value is not available
+        AttributeMetaError -- attribute cannot be calculated, as
+        its metadata is not available
         """
-        # Assign base item attributes first to make sure than in case when
-        # we're calculating attribute for item/fit without source, it fails
-        # with null source error (triggered by accessing item's attribute)
-        item_attrs = self.__holder.item.attributes
-        # Attribute object for attribute being calculated
         try:
-            attr_meta = self.__holder._fit.source.cache_handler.get_attribute(attr)
-        # Raise error if we can't get metadata for requested attribute
-        except (AttributeError, AttributeFetchError) as e:
-            raise AttributeMetaError(attr) from e
-        # Base attribute value which we'll use for modification
-        try:
-            result = item_attrs[attr]
-        # If attribute isn't available on base item,
-        # base off its default value
+            plan = self.__plans[attr]
         except KeyError:
-            result = attr_meta.default_value
-            # If original attribute is not specified and default
-            # value isn't available, raise error - without valid
-            # base we can't go on
-            if result is None:
-                raise BaseValueError(attr)
-        # Container for non-penalized modifiers
-        # Format: {operator: [values]}
-        normal_mods = {}
-        # Container for penalized modifiers
-        # Format: {operator: [values]}
-        penalized_mods = {}
-        # Now, go through all affectors affecting our holder
-        for affector in self.__holder._fit._link_tracker.get_affectors(self.__holder, attr=attr):
-            try:
-                source_holder, modifier = affector
-                operator = modifier.operator
-                # Decide if it should be stacking penalized or not, based on stackable property,
-                # source item category and operator
-                penalize = (
-                    attr_meta.stackable is False and
-                    source_holder.item.category not in PENALTY_IMMUNE_CATEGORIES and
-                    operator in PENALIZABLE_OPERATORS
-                )
-                try:
-                    mod_value = source_holder.attributes[modifier.src_attr]
-                # Silently skip current affector: error should already
-                # be logged by map before it raised KeyError
-                except KeyError:
-                    continue
-                # Normalize operations to just three types:
-                # assignments, additions, multiplications
-                try:
-                    normalization_func = NORMALIZATION_MAP[operator]
-                # Raise error on any unknown operator types
-                except KeyError as e:
-                    raise OperatorError(operator) from e
-                mod_value = normalization_func(mod_value)
-                # Add value to appropriate dictionary
-                if penalize is True:
-                    mod_list = penalized_mods.setdefault(operator, [])
-                else:
-                    mod_list = normal_mods.setdefault(operator, [])
-                mod_list.append(mod_value)
-            # Handle operator type failure
-            except OperatorError as e:
-                msg = 'malformed modifier on item {}: unknown operator {}'.format(
-                    source_holder.item.id, e.args[0])
-                logger.warning(msg)
+            plan = self.__plans[attr] = self.__compile_plan(attr)
+        result = plan.base_value
+        # Format: [(operator, [values])]
+        operation_values = []
+        # Penalized modifiers are aggregated into single value on
+        # per-operator basis; lists of penalized values for all
+        # operators are processed in one go
+        penalized_lists = []
+        penalized_targets = []
+        for operator, normalization_func, normal_sources, penalized_sources in plan.operations:
+            mod_list = self.__get_source_values(normal_sources, normalization_func)
+            if penalized_sources:
+                penalized_list = self.__get_source_values(penalized_sources, normalization_func)
+                if penalized_list:
+                    penalized_lists.append(penalized_list)
+                    penalized_targets.append(mod_list)
+            operation_values.append((operator, mod_list))
+        if penalized_lists:
+            for mod_list, penalized_value in zip(penalized_targets, penalize_value_lists(penalized_lists)):
+                mod_list.append(penalized_value)
+        # Calculate result according to operator order
+        for operator, mod_list in operation_values:
+            if not mod_list:
                 continue
-        # When data gathering is complete, process penalized modifiers
-        # They are penalized on per-operator basis
-        for operator, mod_list in penalized_mods.items():
-            penalized_value = self.__penalize_values(mod_list)
-            mod_list = normal_mods.setdefault(operator, [])
-            mod_list.append(penalized_value)
-        # Calculate result of normal dictionary, according to operator order
-        for operator in sorted(normal_mods):
-            mod_list = normal_mods[operator]
             # Pick best modifier for assignments, based on high_is_good value
             if operator in ASSIGNMENTS:
-                result = max(mod_list) if attr_meta.high_is_good is True else min(mod_list)
+                result = max(mod_list) if plan.high_is_good is True else min(mod_list)
             elif operator in ADDITIONS:
                 for mod_val in mod_list:
                     result += mod_val
@@ -297,9 +482,9 @@ class MutableAttributeMap:
                     result *= mod_val
         # If attribute has upper cap, do not let
         # its value to grow above it
-        if attr_meta.max_attribute is not None:
+        if plan.max_attribute is not None:
             try:
-                max_value = self[attr_meta.max_attribute]
+                max_value = self[plan.max_attribute]
             # If max value isn't available, don't
             # cap anything
             except KeyError:
@@ -311,49 +496,114 @@ class MutableAttributeMap:
                 if self._cap_map is None:
                     self._cap_map = KeyedSet()
                 # Fill cap map with data: capping attribute and capped attribute
-                self._cap_map.add_data(attr_meta.max_attribute, attr)
+                self._cap_map.add_data(plan.max_attribute, attr)
         # Some of attributes are rounded for whatever reason,
         # deal with it after all the calculations
         if attr in LIMITED_PRECISION:
             result = round(result, 2)
-        return result
+        return result, plan
 
-    def __penalize_values(self, mod_list):
+    def __compile_plan(self, attr):
         """
-        Calculate aggregated factor of passed factors, taking into
-        consideration stacking penalty.
+        Gather all the data needed to calculate attribute value,
+        which doesn't depend on values of source attributes.
 
-        Positional argument:
-        mod_list -- list of factors
+        Required arguments:
+        attr -- ID of attribute to be calculated
 
         Return value:
-        Final aggregated factor of passed mod_list
+        CalculationPlan object
+
+        Possible exceptions:
+        BaseValueError -- attribute cannot be calculated, as its
+        base value is not available
+        AttributeMetaError -- attribute cannot be calculated, as
+        its metadata is not available
         """
-        # Gather positive modifiers into one chain, negative
-        # into another
-        chain_positive = []
-        chain_negative = []
-        for mod_val in mod_list:
-            # Transform value into form of multiplier - 1 for ease of
-            # stacking chain calculation
-            mod_val -= 1
-            if mod_val >= 0:
-                chain_positive.append(mod_val)
+        # Assign base item attributes first to make sure than in case when
+        # we're calculating attribute for item/fit without source, it fails
+        # with null source error (triggered by accessing item's attribute)
+        item_attrs = self.__holder.item.attributes
+        # Attribute object for attribute being calculated
+        try:
+            attr_meta = self.__holder._fit.source.cache_handler.get_attribute(attr)
+        # Raise error if we can't get metadata for requested attribute
+        except (AttributeError, AttributeFetchError) as e:
+            raise AttributeMetaError(attr) from e
+        # Base attribute value which we'll use for modification
+        try:
+            base_value = item_attrs[attr]
+        # If attribute isn't available on base item,
+        # base off its default value
+        except KeyError:
+            base_value = attr_meta.default_value
+            # If original attribute is not specified and default
+            # value isn't available, raise error - without valid
+            # base we can't go on
+            if base_value is None:
+                raise BaseValueError(attr)
+        # Format: {operator: ([non-penalized sources], [penalized sources])}
+        sources = {}
+        # Now, go through all affectors affecting our holder
+        for source_holder, modifier in self.__holder._fit._link_tracker.get_affectors(self.__holder, attr=attr):
+            operator = modifier.operator
+            # Skip affectors with unknown operator types
+            if operator not in NORMALIZATION_MAP:
+                msg = 'malformed modifier on item {}: unknown operator {}'.format(
+                    source_holder.item.id, operator)
+                logger.warning(msg)
+                continue
+            # Decide if it should be stacking penalized or not, based on stackable property,
+            # source item category and operator
+            penalize = (
+                attr_meta.stackable is False and
+                source_holder.item.category not in PENALTY_IMMUNE_CATEGORIES and
+                operator in PENALIZABLE_OPERATORS
+            )
+            normal_sources, penalized_sources = sources.setdefault(operator, ([], []))
+            if penalize is True:
+                penalized_sources.append((source_holder, modifier.src_attr))
             else:
-                chain_negative.append(mod_val)
-        # Strongest modifiers always go first
-        chain_positive.sort(reverse=True)
-        chain_negative.sort()
-        # Base final multiplier on 1
-        list_result = 1
-        for chain in (chain_positive, chain_negative):
-            # Same for intermediate per-chain result
-            chain_result = 1
-            for position, modifier in enumerate(chain):
-                # Ignore 12th modifier and further as non-significant
-                if position > 10:
-                    break
-                # Apply stacking penalty based on modifier position
-                chain_result *= 1 + modifier * PENALTY_BASE ** (position ** 2)
-            list_result *= chain_result
-        return list_result
+                normal_sources.append((source_holder, modifier.src_attr))
+        operations = tuple(
+            (operator, NORMALIZATION_MAP[operator], tuple(normal_sources), tuple(penalized_sources))
+            for operator, (normal_sources, penalized_sources) in sorted(sources.items())
+        )
+        dependencies = []
+        for _, _, normal_sources, penalized_sources in operations:
+            for source_holder, src_attr in normal_sources + penalized_sources:
+                dependencies.append((source_holder, src_attr))
+        if attr_meta.max_attribute is not None:
+            dependencies.append((self.__holder, attr_meta.max_attribute))
+        return CalculationPlan(
+            base_value=base_value,
+            high_is_good=attr_meta.high_is_good,
+            max_attribute=attr_meta.max_attribute,
+            operations=operations,
+            dependencies=tuple(dependencies)
+        )
+
+    @staticmethod
+    def __get_source_values(sources, normalization_func):
+        """
+        Fetch normalized values of source attributes.
+
+        Required arguments:
+        sources -- iterable with (source holder, source attribute ID) tuples
+        normalization_func -- function to normalize values with, or None
+
+        Return value:
+        List with values
+        """
+        values = []
+        for source_holder, src_attr in sources:
+            try:
+                mod_value = source_holder.attributes[src_attr]
+            # Silently skip current source: error should already
+            # be logged by map before it raised KeyError
+            except KeyError:
+                continue
+            if normalization_func is not None:
+                mod_value = normalization_func(mod_value)
+            values.append(mod_value)
+        return values
@@ -0,0 +1,142 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from collections import Counter, namedtuple
+
+
+# Immutable copy of metrics data.
+# hits -- amount of attribute accesses served by stored value
+# misses -- amount of attribute accesses which required calculation
+# calculations -- format: {attribute ID: amount of calculations}
+# affectors_scanned -- format: {attribute ID: total amount of
+# affectors processed during calculations}
+# calculation_time -- format: {attribute ID: total time in seconds};
+# time of calculation includes time spent on calculation of
+# attributes it relies on
+# cascade_sizes -- format: {amount of values cleared by single
+# invalidation: amount of such invalidations}; invalidations which
+# didn't clear anything are not recorded, as well as invalidations
+# in lazy invalidation mode
+MetricsSnapshot = namedtuple(
+    'MetricsSnapshot',
+    ('hits', 'misses', 'calculations', 'affectors_scanned', 'calculation_time', 'cascade_sizes')
+)
+
+
+class CalculatorMetrics:
+    """
+    Collect performance data of attribute calculator. Instrumented
+    code checks if metrics object is assigned, thus when metrics
+    are not collected, overhead is limited to this check.
+
+    Optional arguments:
+    parent -- metrics object, to which all data should be
+    reported in addition to this one (default None)
+    """
+
+    def __init__(self, parent=None):
+        self.__parent = parent
+        self.__hits = 0
+        self.__misses = 0
+        # Format: {attribute ID: value}
+        self.__calculations = Counter()
+        self.__affectors_scanned = Counter()
+        self.__calculation_time = Counter()
+        # Format: {cascade size: amount}
+        self.__cascade_sizes = Counter()
+        # Nesting level of invalidation currently in progress
+        # and amount of values it cleared so far
+        self.__cascade_depth = 0
+        self.__cascade_size = 0
+
+    def record_hit(self):
+        self.__hits += 1
+        if self.__parent is not None:
+            self.__parent.record_hit()
+
+    def record_miss(self):
+        self.__misses += 1
+        if self.__parent is not None:
+            self.__parent.record_miss()
+
+    def record_calculation(self, attr, affector_amount, duration):
+        """
+        Record data about finished calculation.
+
+        Required arguments:
+        attr -- ID of calculated attribute
+        affector_amount -- amount of affectors processed
+        duration -- time taken by calculation, in seconds
+        """
+        self.__calculations[attr] += 1
+        self.__affectors_scanned[attr] += affector_amount
+        self.__calculation_time[attr] += duration
+        if self.__parent is not None:
+            self.__parent.record_calculation(attr, affector_amount, duration)
+
+    def start_cascade(self):
+        """Mark start of invalidation, nested calls are merged."""
+        self.__cascade_depth += 1
+
+    def finish_cascade(self):
+        """Mark end of invalidation, record its size when outermost one ends."""
+        self.__cascade_depth -= 1
+        if self.__cascade_depth == 0 and self.__cascade_size > 0:
+            self.__record_cascade(self.__cascade_size)
+            self.__cascade_size = 0
+
+    def record_invalidation(self):
+        """Record clearing of single attribute value."""
+        self.__cascade_size += 1
+
+    def __record_cascade(self, size):
+        self.__cascade_sizes[size] += 1
+        if self.__parent is not None:
+            self.__parent.__record_cascade(size)
+
+    def snapshot(self):
+        """
+        Get copy of collected data.
+
+        Return value:
+        MetricsSnapshot object
+        """
+        return MetricsSnapshot(
+            hits=self.__hits,
+            misses=self.__misses,
+            calculations=dict(self.__calculations),
+            affectors_scanned=dict(self.__affectors_scanned),
+            calculation_time=dict(self.__calculation_time),
+            cascade_sizes=dict(self.__cascade_sizes)
+        )
+
+    def reset(self):
+        """Discard all collected data."""
+        self.__hits = 0
+        self.__misses = 0
+        self.__calculations.clear()
+        self.__affectors_scanned.clear()
+        self.__calculation_time.clear()
+        self.__cascade_sizes.clear()
+
+
+# Metrics of all instrumented fits
+process_metrics = CalculatorMetrics()
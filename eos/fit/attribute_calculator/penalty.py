@@ -0,0 +1,91 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+"""
+Stacking penalty calculation. Besides function which processes single
+list of modification values, there's batched version, which processes
+multiple lists at once.
+"""
+
+
+from math import exp
+
+
+PENALTY_BASE = 1 / exp((1 / 2.67) ** 2)
+
+# Only this amount of strongest modifiers in each chain is
+# taken into consideration, others are non-significant
+PENALTY_CHAIN_LENGTH = 11
+
+# Penalty coefficient for each position in chain
+PENALTY_FACTORS = tuple(PENALTY_BASE ** (position ** 2) for position in range(PENALTY_CHAIN_LENGTH))
+
+
+def penalize_values(mod_list):
+    """
+    Calculate aggregated factor of passed factors, taking into
+    consideration stacking penalty.
+
+    Required arguments:
+    mod_list -- iterable with factors
+
+    Return value:
+    Final aggregated factor of passed mod_list
+    """
+    # Gather positive modifiers into one chain, negative
+    # into another; modifiers are transformed into form of
+    # multiplier - 1 for ease of stacking chain calculation
+    chain_positive = []
+    chain_negative = []
+    for mod_val in mod_list:
+        mod_val -= 1
+        if mod_val >= 0:
+            chain_positive.append(mod_val)
+        else:
+            chain_negative.append(mod_val)
+    # Strongest modifiers always go first
+    chain_positive.sort(reverse=True)
+    chain_negative.sort()
+    # Base final multiplier on 1
+    list_result = 1
+    for chain in (chain_positive, chain_negative):
+        # Apply stacking penalty based on modifier position; zip
+        # also drops modifiers which are too far in chain
+        for modifier, factor in zip(chain, PENALTY_FACTORS):
+            list_result *= 1 + modifier * factor
+    return list_result
+
+
+def penalize_value_lists(mod_lists):
+    """
+    Batched version of penalize_values. Batches are formed per
+    attribute, including when all attributes of fit are evaluated
+    via attribute graph: lists are processed one by one anyway, so
+    gathering lists of multiple holders would not save anything.
+
+    Required arguments:
+    mod_lists -- iterable with lists of factors
+
+    Return value:
+    List with aggregated factors, one per passed list
+    """
+    return [penalize_values(mod_list) for mod_list in mod_lists]
+
@@ -22,13 +22,17 @@
 from logging import getLogger
 
 from eos.const.eos import Domain, FilterType
-from eos.util.keyed_set import KeyedSet
+from eos.util.keyed_set import KeyedSet, SubKeyedSet
 from .exception import DirectDomainError, FilteredDomainError, FilteredSelfReferenceError, FilterTypeError
 
 
 logger = getLogger(__name__)
 
 
+def _get_target_attribute(affector):
+    return affector.modifier.tgt_attr
+
+
 class LinkRegister:
     """
     Keep track of currently existing links between affectors
@@ -38,6 +42,10 @@ class LinkRegister:
     doesn't know anything about states and scopes, just
     affectors and affectees.
 
+    Affector maps additionally index affectors by their target
+    attribute, which allows to fetch affectors influencing
+    specific attribute without filtering them.
+
     Required arguments:
     fit -- fit, to which this register is bound to
     """
@@ -47,6 +55,10 @@ class LinkRegister:
         # keeping data for
         self._fit = fit
 
+        # All holders registered as affectees
+        # Format: {targetHolders}
+        self.__affectees = set()
+
         # Keep track of holders belonging to certain domain
         # Format: {domain: {targetHolders}}
         self.__affectee_domain = KeyedSet()
@@ -61,25 +73,30 @@ class LinkRegister:
 
         # Keep track of affectors influencing all holders belonging to certain domain
         # Format: {domain: {affectors}}
-        self.__affector_domain = KeyedSet()
+        self.__affector_domain = SubKeyedSet(_get_target_attribute)
 
         # Keep track of affectors influencing holders belonging to certain domain and group
         # Format: {(domain, group): {affectors}}
-        self.__affector_domain_group = KeyedSet()
+        self.__affector_domain_group = SubKeyedSet(_get_target_attribute)
 
         # Keep track of affectors influencing holders belonging to certain domain and having certain skill requirement
         # Format: {(domain, skill): {affectors}}
-        self.__affector_domain_skill = KeyedSet()
+        self.__affector_domain_skill = SubKeyedSet(_get_target_attribute)
 
         # Keep track of affectors influencing holders directly
         # Format: {targetHolder: {affectors}}
-        self.__active_direct_affectors = KeyedSet()
+        self.__active_direct_affectors = SubKeyedSet(_get_target_attribute)
 
         # Keep track of affectors which influence something directly,
         # but are disabled as their target domain is not available
         # Format: {source_holder: {affectors}}
         self.__disabled_direct_affectors = KeyedSet()
 
+        # Keep track of registered affectors which use certain attribute of
+        # their carrier as modification source
+        # Format: {(source_holder, source attribute): {affectors}}
+        self.__affector_source_attr = KeyedSet()
+
     def register_affectee(self, target_holder):
         """
         Add passed target holder to register's maps, so it can be affected by
@@ -88,6 +105,7 @@ class LinkRegister:
         Required arguments:
         target_holder -- holder to register
         """
+        self.__affectees.add(target_holder)
         for key, affectee_map in self.__get_affectee_maps(target_holder):
             # Add data to map
             affectee_map.add_data(key, target_holder)
@@ -109,6 +127,7 @@ class LinkRegister:
         Required arguments:
         target_holder -- holder to unregister
         """
+        self.__affectees.discard(target_holder)
         for key, affectee_map in self.__get_affectee_maps(target_holder):
             affectee_map.rm_data(key, target_holder)
         # When removing holder from register, make sure to move modifiers which
@@ -135,6 +154,10 @@ class LinkRegister:
             affector_map.add_data(key, affector)
         except Exception as e:
             self.__handle_affector_errors(e, affector)
+        # Index only affectors which made it into affector maps
+        else:
+            source_key = (affector.source_holder, affector.modifier.src_attr)
+            self.__affector_source_attr.add_data(source_key, affector)
 
     def unregister_affector(self, affector):
         """
@@ -144,6 +167,10 @@ class LinkRegister:
         Required arguments:
         affector -- affector to unregister
         """
+        # Source index is cleaned up unconditionally, as removal of
+        # affectors which were never added is no-op
+        source_key = (affector.source_holder, affector.modifier.src_attr)
+        self.__affector_source_attr.rm_data(source_key, affector)
         try:
             key, affector_map = self.__get_affector_map(affector)
             affector_map.rm_data(key, affector)
@@ -208,7 +235,7 @@ class LinkRegister:
             self.__handle_affector_errors(e, affector)
         return affectees
 
-    def get_affectors(self, target_holder):
+    def get_affectors(self, target_holder, attr=None):
         """
         Get all affectors, which influence passed holder.
 
@@ -216,23 +243,57 @@ class LinkRegister:
         target_holder -- holder, for which we're seeking for affecting it
         affectors
 
+        Optional arguments:
+        attr -- target attribute ID filter; only affectors which
+        influence attribute with this ID will be returned. If None,
+        all affectors influencing holder are returned (default None)
+
         Return value:
         Set with affectors, incluencing target_holder
         """
-        affectors = set()
-        # Add all affectors which directly affect it
-        affectors.update(self.__active_direct_affectors.get(target_holder) or set())
-        # Then all affectors which affect domain of passed holder
         domain = target_holder._domain
-        affectors.update(self.__affector_domain.get(domain) or set())
-        # All affectors which affect domain and group of passed holder
-        group = target_holder.item.group
-        affectors.update(self.__affector_domain_group.get((domain, group)) or set())
-        # Same, but for domain & skill requirement of passed holder
+        # Direct affectors of passed holder, then all affectors which affect
+        # its domain, domain and group, and domain and skill requirement
+        affector_maps = [
+            (self.__active_direct_affectors, target_holder),
+            (self.__affector_domain, domain),
+            (self.__affector_domain_group, (domain, target_holder.item.group))
+        ]
         for skill in target_holder.item.required_skills:
-            affectors.update(self.__affector_domain_skill.get((domain, skill)) or set())
+            affector_maps.append((self.__affector_domain_skill, (domain, skill)))
+        affectors = set()
+        for affector_map, key in affector_maps:
+            if attr is None:
+                affectors.update(affector_map.get_data(key))
+            # When attribute is specified, take only affectors
+            # targeting it from map's attribute index
+            else:
+                affectors.update(affector_map.get_sub_data(key, attr))
         return affectors
 
+    def get_source_affectors(self, source_holder, src_attr):
+        """
+        Get all registered affectors, which are carried by passed holder
+        and use passed attribute as modification source.
+
+        Required arguments:
+        source_holder -- holder, which carries affectors in question
+        src_attr -- ID of source attribute
+
+        Return value:
+        Set with affectors
+        """
+        return set(self.__affector_source_attr.get_data((source_holder, src_attr)))
+
+    def get_registered_affectees(self):
+        """
+        Get all holders registered as affectees.
+
+        Return value:
+        Set with holders
+        """
+        return set(self.__affectees)
+
     # General-purpose auxiliary methods
     def __get_affectee_maps(self, target_holder):
         """
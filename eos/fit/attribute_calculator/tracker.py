@@ -20,7 +20,8 @@
 
 
 from eos.const.eos import State, Scope
-from .affector import Affector
+from .graph import AttributeGraph
+from .metrics import CalculatorMetrics, process_metrics
 from .register import LinkRegister
 
 
@@ -34,11 +35,62 @@ class LinkTracker:
 
     Required arguments:
     fit -- Fit object to which tracker is assigned
+
+    Optional arguments:
+    lazy_invalidation -- when False, change of attribute value
+    immediately clears all calculated values relying on it; when
+    True, change just bumps revision counter of tracker, and values
+    relying on changed attribute are checked when they are accessed
+    (default False)
+    instrumentation -- when True, performance metrics of attribute
+    calculation are collected (default False)
     """
 
-    def __init__(self, fit):
+    def __init__(self, fit, lazy_invalidation=False, instrumentation=False):
         self._fit = fit
         self._register = LinkRegister(fit)
+        self._lazy_invalidation = lazy_invalidation
+        # Revision counter for lazy invalidation mode,
+        # gets incremented on every attribute change
+        self._revision = 0
+        # Metrics object when instrumentation is enabled, else None
+        self._metrics = None
+        if instrumentation is True:
+            self.enable_instrumentation()
+
+    def enable_instrumentation(self):
+        """
+        Start collecting performance metrics of attribute calculation;
+        they are also added to process-wide metrics.
+        """
+        if self._metrics is None:
+            self._metrics = CalculatorMetrics(parent=process_metrics)
+
+    def disable_instrumentation(self):
+        """Stop collecting metrics and discard collected data."""
+        self._metrics = None
+
+    def get_metrics(self):
+        """
+        Get metrics collected for this tracker.
+
+        Return value:
+        MetricsSnapshot object, or None if instrumentation
+        is disabled
+        """
+        if self._metrics is None:
+            return None
+        return self._metrics.snapshot()
+
+    def _bump_revision(self):
+        """
+        Increment revision counter.
+
+        Return value:
+        New revision number
+        """
+        self._revision += 1
+        return self._revision
 
     def get_affectors(self, holder, attr=None):
         """
@@ -56,14 +108,7 @@ class LinkTracker:
         Return value:
         Set with Affector objects
         """
-        if attr is None:
-            affectors = self._register.get_affectors(holder)
-        else:
-            affectors = set()
-            for affector in self._register.get_affectors(holder):
-                if affector.modifier.tgt_attr == attr:
-                    affectors.add(affector)
-        return affectors
+        return self._register.get_affectors(holder, attr=attr)
 
     def get_affectees(self, affector):
         """
@@ -77,6 +122,27 @@ class LinkTracker:
         """
         return self._register.get_affectees(affector)
 
+    def get_attribute_graph(self):
+        """
+        Build dependency graph of attributes of all holders
+        added to tracker.
+
+        Return value:
+        AttributeGraph object
+        """
+        return AttributeGraph(self._register.get_registered_affectees())
+
+    def evaluate_all(self):
+        """
+        Calculate all attributes of all holders added to
+        tracker in single topologically ordered pass.
+
+        Possible exceptions:
+        DependencyCycleError -- raised when some of attributes
+        depend on each other
+        """
+        self.get_attribute_graph().evaluate_all()
+
     def add_holder(self, holder):
         """
         Put the holder under influence of registered affectors.
@@ -85,6 +151,7 @@ class LinkTracker:
         holder -- holder which is added to tracker
         """
         self._register.register_affectee(holder)
+        holder.attributes._clear_plans()
 
     def remove_holder(self, holder):
         """
@@ -94,6 +161,7 @@ class LinkTracker:
         holder -- holder which is removed from tracker
         """
         self._register.unregister_affectee(holder)
+        holder.attributes._clear_plans()
 
     def enable_states(self, holder, states):
         """
@@ -106,8 +174,8 @@ class LinkTracker:
         """
         processed_effects = holder._enabled_effects
         processed_scopes = (Scope.local,)
-        affectors = self.__generate_affectors(
-            holder, effect_filter=processed_effects,
+        affectors = holder._affector_table.get(
+            effect_filter=processed_effects,
             state_filter=states, scope_filter=processed_scopes
         )
         self.__enable_affectors(affectors)
@@ -123,8 +191,8 @@ class LinkTracker:
         """
         processed_effects = holder._enabled_effects
         processed_scopes = (Scope.local,)
-        affectors = self.__generate_affectors(
-            holder, effect_filter=processed_effects,
+        affectors = holder._affector_table.get(
+            effect_filter=processed_effects,
             state_filter=states, scope_filter=processed_scopes
         )
         self.__disable_affectors(affectors)
@@ -139,8 +207,8 @@ class LinkTracker:
         """
         processed_states = set(filter(lambda s: s <= holder.state, State))
         processed_scopes = (Scope.local,)
-        affectors = self.__generate_affectors(
-            holder, effect_filter=effect_ids, state_filter=processed_states,
+        affectors = holder._affector_table.get(
+            effect_filter=effect_ids, state_filter=processed_states,
             scope_filter=processed_scopes
         )
         self.__enable_affectors(affectors)
@@ -155,8 +223,8 @@ class LinkTracker:
         """
         processed_states = set(filter(lambda s: s <= holder.state, State))
         processed_scopes = (Scope.local,)
-        affectors = self.__generate_affectors(
-            holder, effect_filter=effect_ids, state_filter=processed_states,
+        affectors = holder._affector_table.get(
+            effect_filter=effect_ids, state_filter=processed_states,
             scope_filter=processed_scopes
         )
         self.__disable_affectors(affectors)
@@ -165,6 +233,30 @@ class LinkTracker:
         """
         Clear calculated attributes relying on the passed attribute.
 
+        Required arguments:
+        holder -- holder, which carries attribute in question
+        attr -- ID of attribute
+        """
+        # In lazy mode, dependents will check attribute's
+        # change stamp on their own
+        if self._lazy_invalidation is True:
+            holder.attributes._mark_changed(attr)
+            return
+        metrics = self._metrics
+        if metrics is None:
+            self.__clear_holder_attribute_dependents(holder, attr)
+            return
+        metrics.start_cascade()
+        try:
+            self.__clear_holder_attribute_dependents(holder, attr)
+        finally:
+            metrics.finish_cascade()
+
+    def __clear_holder_attribute_dependents(self, holder, attr):
+        """
+        Clear calculated attributes relying on the passed attribute,
+        eager invalidation mode only.
+
         Required arguments:
         holder -- holder, which carries attribute in question
         attr -- ID of attribute
@@ -174,50 +266,14 @@ class LinkTracker:
         if cap_map is not None:
             for capped_attr in (cap_map.get(attr) or ()):
                 del holder.attributes[capped_attr]
-        # Clear attributes which are using this attribute as modification source
-        for affector in self.__generate_affectors(holder, effect_filter=holder._enabled_effects):
-            modifier = affector.modifier
-            # Skip affectors which do not use attribute being damaged as source
-            if modifier.src_attr != attr:
-                continue
+        # Clear attributes which are using this attribute as modification
+        # source; only registered affectors can influence anything, so
+        # we take them straight from register's source index
+        for affector in self._register.get_source_affectors(holder, attr):
             # Go through all holders targeted by modifier
             for target_holder in self.get_affectees(affector):
                 # And remove target attribute
-                del target_holder.attributes[modifier.tgt_attr]
-
-    def __generate_affectors(self, holder, effect_filter=None, state_filter=None, scope_filter=None):
-        """
-        Get all affectors spawned by the holder.
-
-        Required arguments:
-        holder -- holder, for which affectors are generated
-
-        Optional arguments:
-        effect filter -- filter results to include affectors, which
-        carry modifiers generated from effects with IDs on this list;
-        if None, no filtering occurs (default None)
-        state_filter -- filter results by state required by affector's
-        modifier, which should be in this iterable; if None, no
-        filtering occurs (default None)
-        scope_filter -- filter results by scope defined in affector's
-        modifier, which should be in this iterable; if None, no
-        filtering occurs (default None)
-
-        Return value:
-        Set with Affector objects, satisfying passed filters
-        """
-        affectors = set()
-        for effect in holder.item.effects:
-            if effect_filter is not None and effect.id not in effect_filter:
-                continue
-            for modifier in effect.modifiers:
-                if state_filter is not None and modifier.state not in state_filter:
-                    continue
-                if scope_filter is not None and modifier.scope not in scope_filter:
-                    continue
-                affector = Affector(holder, modifier)
-                affectors.add(affector)
-        return affectors
+                del target_holder.attributes[affector.modifier.tgt_attr]
 
     def __enable_affectors(self, affectors):
         """
@@ -249,11 +305,31 @@ class LinkTracker:
         Clear calculated attributes which are relying on
         passed affectors.
 
+        Required arguments:
+        affectors -- iterable with affectors in question
+        """
+        metrics = self._metrics
+        if metrics is not None:
+            metrics.start_cascade()
+        try:
+            self.__clear_affectors_targets(affectors)
+        finally:
+            if metrics is not None:
+                metrics.finish_cascade()
+
+    def __clear_affectors_targets(self, affectors):
+        """
+        Clear target attributes of passed affectors.
+
         Required arguments:
         affectors -- iterable with affectors in question
         """
         for affector in affectors:
+            tgt_attr = affector.modifier.tgt_attr
             # Go through all holders targeted by modifier
             for target_holder in self.get_affectees(affector):
+                # As set of affectors for target attribute is changed,
+                # its calculation plan is no longer valid
+                target_holder.attributes._clear_plan(tgt_attr)
                 # And remove target attribute
-                del target_holder.attributes[affector.modifier.tgt_attr]
+                del target_holder.attributes[tgt_attr]
@@ -19,6 +19,8 @@
 # ===============================================================================
 
 
+from contextlib import contextmanager
+
 from eos.const.eos import State
 from eos.const.eve import Type
 from eos.data.source import SourceManager, Source
@@ -37,9 +39,16 @@ class Fit:
 
     Optional arguments:
     source -- source to use for this fit
+    lazy_invalidation -- if True, calculated attribute values are not
+    cleared when values they rely on change, instead they are verified
+    when accessed. It makes fit changes cheaper, and moves the cost to
+    attribute access (default False)
+    instrumentation -- if True, performance metrics of attribute
+    calculation are collected for this fit, see get_calculator_metrics
+    (default False)
     """
 
-    def __init__(self, source=None):
+    def __init__(self, source=None, lazy_invalidation=False, instrumentation=False):
         self.__source = None
         # Character-related holder containers
         self.skills = HolderRestrictedSet(self, Skill)
@@ -57,8 +66,19 @@ class Fit:
         # Service containers
         self._holders = set()
         self._volatile_holders = set()
+        # Batch mode data: how many batch contexts we're in, holders
+        # whose registration in services is postponed until batch is
+        # over, and flag which tells if volatile data cleanup has been
+        # requested during batch
+        self.__batch_depth = 0
+        self.__batch_holders = set()
+        self.__batch_cleanup = False
         # Initialize services
-        self._link_tracker = LinkTracker(self)  # Tracks links between holders assigned to fit
+        # Tracks links between holders assigned to fit
+        self._link_tracker = LinkTracker(
+            self, lazy_invalidation=lazy_invalidation,
+            instrumentation=instrumentation
+        )
         self._restriction_tracker = RestrictionTracker(self)  # Tracks various restrictions related to given fitting
         self.stats = StatTracker(self)  # Access point for all the fitting stats
         # Use default source, unless specified otherwise
@@ -86,11 +106,71 @@ class Fit:
         """
         self._restriction_tracker.validate(skip_checks)
 
+    def evaluate_all(self):
+        """
+        Calculate all attributes of all holders on fit in single
+        pass, ordered according to dependencies between them.
+
+        Possible exceptions:
+        DependencyCycleError -- raised when some of attributes
+        depend on each other
+        """
+        self._link_tracker.evaluate_all()
+
+    def get_calculator_metrics(self):
+        """
+        Get performance metrics of attribute calculation on this fit.
+
+        Return value:
+        MetricsSnapshot object, or None if fit has been
+        created without instrumentation
+        """
+        return self._link_tracker.get_metrics()
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager for bulk fit changes. While in batch mode,
+        holders added to fit are not registered in source-dependent
+        services (link, restriction and stat trackers), and volatile
+        data cleanup requests are only recorded. Everything is
+        processed once, when outermost batch context is exited.
+
+        Until then, attributes of added holders do not take fit
+        modifications into account, and fit stats may be stale.
+        """
+        self.__batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.__batch_depth -= 1
+            if self.__batch_depth == 0:
+                self.__flush_batch()
+
+    def __flush_batch(self):
+        """Process all the changes postponed during batch mode."""
+        holders = self.__batch_holders
+        self.__batch_holders = set()
+        # Attributes of postponed holders could be calculated without
+        # their modifiers, thus get rid of them
+        for holder in holders:
+            holder.attributes.clear()
+        # Register all affectees first, so that affectors find all their
+        # targets upon registration
+        for holder in holders:
+            self._link_tracker.add_holder(holder)
+        for holder in holders:
+            self.__enable_holder_states(holder)
+        if self.__batch_cleanup is True:
+            self.__batch_cleanup = False
+            self._request_volatile_cleanup(source_check=False)
+
     def _request_volatile_cleanup(self, source_check=True):
         """
         Clear all the 'cached', but volatile stats, which should
         be no longer actual on any fit/holder changes. Called
-        automatically be eos components when needed.
+        automatically be eos components when needed. In batch
+        mode cleanup is postponed until batch is over.
 
         Optional arguments:
         source_check -- check if fit has source assigned, do not
@@ -98,6 +178,9 @@ class Fit:
         """
         if source_check is True and self.source is None:
             return
+        if self.__batch_depth > 0:
+            self.__batch_cleanup = True
+            return
         self.stats._clear_volatile_attrs()
         for holder in self._volatile_holders:
             holder._clear_volatile_attrs()
@@ -139,10 +222,17 @@ class Fit:
         """
         Make all of the fit services aware of passed holder.
         Should be called when fit has valid source as services
-        cannot work without it.
+        cannot work without it. In batch mode holder is registered
+        when batch is over.
         """
+        if self.__batch_depth > 0:
+            self.__batch_holders.add(holder)
+            return
         self._link_tracker.add_holder(holder)
-        # Switch states upwards up to holder's state
+        self.__enable_holder_states(holder)
+
+    def __enable_holder_states(self, holder):
+        """Switch states of holder in services upwards up to its state."""
         enabled_states = set(filter(lambda s: s <= holder.state, State))
         if len(enabled_states) > 0:
             self._link_tracker.enable_states(holder, enabled_states)
@@ -151,6 +241,14 @@ class Fit:
 
     def _disable_services(self, holder):
         """Remove holder from all source-relying services."""
+        # Holders postponed by batch mode are not registered in services;
+        # link tracker still has to drop affectors of effects enabled on
+        # holder during batch, and direct affectors targeting holder
+        if holder in self.__batch_holders:
+            self.__batch_holders.remove(holder)
+            self._link_tracker.disable_states(holder, set(State))
+            self._link_tracker.remove_holder(holder)
+            return
         # Switch states downwards from current holder's state
         disabled_states = set(filter(lambda s: s <= holder.state, State))
         if len(disabled_states) > 0:
@@ -173,6 +271,10 @@ class Fit:
         if self.source is None:
             return
         self._request_volatile_cleanup()
+        # Holders postponed by batch mode will be registered
+        # with their actual state when batch is over
+        if holder in self.__batch_holders:
+            return
         # Get states which are passed during enabling/disabling
         # into single set (other should stay empty)
         enabled_states = set(filter(lambda s: holder.state < s <= new_state, State))
@@ -22,7 +22,7 @@
 from collections import namedtuple
 from random import random
 
-from eos.fit.attribute_calculator import MutableAttributeMap
+from eos.fit.attribute_calculator import AffectorTable, MutableAttributeMap
 from .null_source import NullSourceItem
 
 
@@ -48,6 +48,8 @@ class HolderBase:
         # Special dictionary subclass that holds modified attributes
         # and data related to their calculation
         self.attributes = MutableAttributeMap(self)
+        # Affectors spawned by holder's item, built on demand
+        self.__affector_table = None
         # Which fit this holder is bound to
         self.__fit = None
         # Contains IDs of effects which are prohibited to be run on this holder.
@@ -71,6 +73,16 @@ class HolderBase:
         self.__fit = new_fit
         self._refresh_source()
 
+    @property
+    def _affector_table(self):
+        """
+        Return table with affectors spawned by holder's item. It is
+        built on first access and kept until holder's source changes.
+        """
+        if self.__affector_table is None:
+            self.__affector_table = AffectorTable(self)
+        return self.__affector_table
+
     # Effect methods
     @property
     def _effect_data(self):
@@ -197,6 +209,7 @@ class HolderBase:
         which is source-dependent.
         """
         self.attributes.clear()
+        self.__affector_table = None
         try:
             type_getter = self._fit.source.cache_handler.get_type
         # When we're asked to refresh source, but we have no fit or
@@ -47,3 +47,39 @@ class CachedProperty:
         value = self.__method(instance)
         setattr(instance, self.__method.__name__, value)
         return value
+
+
+class CachedSlotProperty:
+    """
+    Counterpart of CachedProperty for classes which define __slots__
+    and thus cannot shadow descriptor with instance attribute. Result
+    of decorated method is stored in slot named _cached_<method name>,
+    which class has to define. Value can be assigned to property,
+    which overrides cached result; to clear cache, delete property.
+    """
+
+    def __init__(self, method):
+        self.__method = method
+        self.__slot = '_cached_{}'.format(method.__name__)
+
+    def __get__(self, instance, owner):
+        # Return descriptor if called from class
+        if instance is None:
+            return self
+        # Return cached value if there's any, else execute
+        # decorated method and store returned value in slot
+        try:
+            return getattr(instance, self.__slot)
+        except AttributeError:
+            value = self.__method(instance)
+            setattr(instance, self.__slot, value)
+            return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.__slot, value)
+
+    def __delete__(self, instance):
+        try:
+            delattr(instance, self.__slot)
+        except AttributeError:
+            pass
@@ -0,0 +1,159 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from array import array
+from bisect import bisect_left
+from collections.abc import KeysView
+from itertools import chain
+
+
+_no_default = object()
+# Largest key which fits into unsigned int array
+_max_key = 2 ** 32 - 1
+
+
+class CompactFloatDict:
+    """
+    Dictionary-like container, which maps non-negative integer keys
+    to float values. Keys and values are kept in two sorted arrays,
+    thus it doesn't need per-entry objects and takes several times
+    less memory than regular dictionary. Access is done via binary
+    search, and insertion requires moving part of arrays, so it's
+    suitable only for relatively small sets of data. Entries which
+    arrays cannot hold (e.g. integer values, which should not be
+    turned into floats, or out-of-range keys) are kept in regular
+    dictionary, created on demand.
+    """
+
+    __slots__ = ('__keys', '__values', '__extra')
+
+    def __init__(self):
+        self.__keys = array('I')
+        self.__values = array('d')
+        # Format: {key: value}
+        self.__extra = None
+
+    def __find(self, key):
+        """
+        Find position of key in key array.
+
+        Required arguments:
+        key -- key to search for
+
+        Return value:
+        (position, found flag) tuple; when key is not found,
+        position is where it should be inserted
+        """
+        keys = self.__keys
+        try:
+            pos = bisect_left(keys, key)
+        # Keys which cannot be compared to integers
+        # are never stored in arrays
+        except TypeError:
+            return None, False
+        return pos, pos < len(keys) and keys[pos] == key
+
+    def __getitem__(self, key):
+        pos, found = self.__find(key)
+        if found:
+            return self.__values[pos]
+        if self.__extra is None:
+            raise KeyError(key)
+        return self.__extra[key]
+
+    def __setitem__(self, key, value):
+        pos, found = self.__find(key)
+        # Both key and value are checked before any of containers
+        # is changed, so that arrays never get out of sync
+        if type(key) is int and 0 <= key <= _max_key and type(value) is float:
+            if found:
+                self.__values[pos] = value
+                return
+            if self.__extra is not None:
+                self.__extra.pop(key, None)
+            self.__keys.insert(pos, key)
+            self.__values.insert(pos, value)
+        else:
+            if self.__extra is None:
+                self.__extra = {}
+            self.__extra[key] = value
+            if found:
+                del self.__keys[pos]
+                del self.__values[pos]
+
+    def __delitem__(self, key):
+        pos, found = self.__find(key)
+        if found:
+            del self.__keys[pos]
+            del self.__values[pos]
+        elif self.__extra is None:
+            raise KeyError(key)
+        else:
+            del self.__extra[key]
+
+    def __contains__(self, key):
+        if self.__find(key)[1]:
+            return True
+        return self.__extra is not None and key in self.__extra
+
+    def __len__(self):
+        return len(self.__keys) + len(self.__extra or ())
+
+    def __iter__(self):
+        # Iterate over copies, so that container
+        # can be changed during iteration
+        return chain(self.__keys.tolist(), list(self.__extra or ()))
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, default=_no_default):
+        pos, found = self.__find(key)
+        if found:
+            value = self.__values[pos]
+            del self.__keys[pos]
+            del self.__values[pos]
+            return value
+        if self.__extra is not None and key in self.__extra:
+            return self.__extra.pop(key)
+        if default is _no_default:
+            raise KeyError(key)
+        return default
+
+    def keys(self):
+        return KeysView(self)
+
+    def items(self):
+        items = zip(self.__keys.tolist(), self.__values.tolist())
+        if self.__extra is None:
+            return items
+        return chain(items, self.__extra.items())
+
+    def clear(self):
+        del self.__keys[:]
+        del self.__values[:]
+        self.__extra = None
+
+    def __repr__(self):
+        return 'CompactFloatDict({})'.format(dict(self.items()))
@@ -100,3 +100,55 @@ class KeyedSet(dict):
         set with data
         """
         return self.get(key) or set()
+
+
+class SubKeyedSet(KeyedSet):
+    """
+    KeyedSet, which additionally indexes its data by composite
+    (key, sub-key) pair, where sub-key is produced from data object.
+    It allows to fetch subset of data stored under key without
+    iterating over the whole set.
+
+    Required arguments:
+    sub_key_getter -- callable which takes data object and
+    returns sub-key for it
+    """
+
+    def __init__(self, sub_key_getter):
+        super().__init__()
+        self.__sub_key_getter = sub_key_getter
+        # Format: {(key, sub-key): {data}}
+        self.__sub_index = KeyedSet()
+
+    def add_data_set(self, key, data_set):
+        data_set = tuple(data_set)
+        super().add_data_set(key, data_set)
+        for data in data_set:
+            self.__sub_index.add_data((key, self.__sub_key_getter(data)), data)
+
+    def rm_data_set(self, key, data_set):
+        data_set = tuple(data_set)
+        super().rm_data_set(key, data_set)
+        for data in data_set:
+            self.__sub_index.rm_data((key, self.__sub_key_getter(data)), data)
+
+    def add_data(self, key, data):
+        super().add_data(key, data)
+        self.__sub_index.add_data((key, self.__sub_key_getter(data)), data)
+
+    def rm_data(self, key, data):
+        super().rm_data(key, data)
+        self.__sub_index.rm_data((key, self.__sub_key_getter(data)), data)
+
+    def get_sub_data(self, key, sub_key):
+        """
+        Get data set for key and sub-key with safe fallback.
+
+        Required arguments:
+        key -- key to access dictionary value (data set)
+        sub_key -- sub-key to filter data set with
+
+        Return value:
+        set with data
+        """
+        return self.__sub_index.get_data((key, sub_key))
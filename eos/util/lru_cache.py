@@ -0,0 +1,103 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from collections import OrderedDict, namedtuple
+
+
+LruCacheStats = namedtuple('LruCacheStats', ('hits', 'misses', 'size', 'max_size'))
+
+
+class LruCache:
+    """
+    Container which keeps strong references to limited amount of
+    values, evicting least recently used ones when it's full. It is
+    not thread-safe, owners should serialize access to it.
+
+    Required arguments:
+    max_size -- maximum amount of values to keep; when 0,
+    nothing is kept
+    """
+
+    def __init__(self, max_size):
+        self.__max_size = max_size
+        # Format: {key: value}, ordered from least to most recently used
+        self.__data = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self):
+        return len(self.__data)
+
+    def get(self, key, default=None):
+        """
+        Get value and mark it as most recently used.
+
+        Required arguments:
+        key -- key of value
+
+        Optional arguments:
+        default -- value returned when there's no value for key
+
+        Return value:
+        Stored value, or default
+        """
+        try:
+            value = self.__data[key]
+        except KeyError:
+            self.__misses += 1
+            return default
+        self.__data.move_to_end(key)
+        self.__hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Store value, evicting least recently used one if needed.
+
+        Required arguments:
+        key -- key of value
+        value -- value to store
+        """
+        if self.__max_size <= 0:
+            return
+        data = self.__data
+        data[key] = value
+        data.move_to_end(key)
+        while len(data) > self.__max_size:
+            data.popitem(last=False)
+
+    def clear(self):
+        """Remove all values, statistics are kept."""
+        self.__data.clear()
+
+    def get_stats(self):
+        """
+        Get usage statistics.
+
+        Return value:
+        LruCacheStats object
+        """
+        return LruCacheStats(
+            hits=self.__hits,
+            misses=self.__misses,
+            size=len(self.__data),
+            max_size=self.__max_size
+        )
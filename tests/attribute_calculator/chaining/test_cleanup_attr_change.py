@@ -71,3 +71,69 @@ class TestCleanupChainChange(AttrCalcTestCase):
         self.fit.items.remove(holder3)
         self.assertEqual(len(self.log), 0)
         self.assert_link_buffers_empty(self.fit)
+
+    def test_attribute_state_switch(self):
+        src_attr = self.ch.attribute(attribute_id=1)
+        tgt_attr = self.ch.attribute(attribute_id=2)
+        modifier = Modifier()
+        modifier.state = State.active
+        modifier.scope = Scope.local
+        modifier.src_attr = src_attr.id
+        modifier.operator = Operator.post_percent
+        modifier.tgt_attr = tgt_attr.id
+        modifier.domain = Domain.ship
+        modifier.filter_type = None
+        modifier.filter_value = None
+        effect = self.ch.effect(effect_id=1, category=EffectCategory.active)
+        effect.modifiers = (modifier,)
+        holder1 = IndependentItem(self.ch.type_(type_id=1, effects=(effect,), attributes={src_attr.id: 20}))
+        holder2 = ShipItem(self.ch.type_(type_id=2, attributes={tgt_attr.id: 100}))
+        self.fit.items.add(holder1)
+        self.fit.ship = holder2
+        self.assertAlmostEqual(holder2.attributes[tgt_attr.id], 100)
+        # Source attribute change of affector which is
+        # not in effect must not break anything
+        holder1.attributes[src_attr.id] = 50
+        self.assertAlmostEqual(holder2.attributes[tgt_attr.id], 100)
+        holder1.state = State.active
+        self.assertAlmostEqual(holder2.attributes[tgt_attr.id], 150)
+        holder1.attributes[src_attr.id] = 30
+        self.assertAlmostEqual(holder2.attributes[tgt_attr.id], 130)
+        holder1.state = State.offline
+        holder1.attributes[src_attr.id] = 10
+        self.assertAlmostEqual(holder2.attributes[tgt_attr.id], 100)
+        self.fit.items.remove(holder1)
+        self.fit.ship = None
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(self.fit)
+
+    def test_attribute_penalized(self):
+        src_attr = self.ch.attribute(attribute_id=1)
+        tgt_attr = self.ch.attribute(attribute_id=2, stackable=0)
+        modifier = Modifier()
+        modifier.state = State.offline
+        modifier.scope = Scope.local
+        modifier.src_attr = src_attr.id
+        modifier.operator = Operator.post_percent
+        modifier.tgt_attr = tgt_attr.id
+        modifier.domain = Domain.ship
+        modifier.filter_type = None
+        modifier.filter_value = None
+        effect = self.ch.effect(effect_id=1, category=EffectCategory.passive)
+        effect.modifiers = (modifier,)
+        holder1 = IndependentItem(self.ch.type_(type_id=1, effects=(effect,), attributes={src_attr.id: 50}))
+        holder2 = IndependentItem(self.ch.type_(type_id=2, effects=(effect,), attributes={src_attr.id: 100}))
+        holder3 = ShipItem(self.ch.type_(type_id=3, attributes={tgt_attr.id: 100}))
+        self.fit.items.add(holder1)
+        self.fit.items.add(holder2)
+        self.fit.ship = holder3
+        self.assertAlmostEqual(holder3.attributes[tgt_attr.id], 286.912, places=3)
+        # Values of sources must be re-read and re-penalized
+        holder2.attributes[src_attr.id] = 20
+        self.assertAlmostEqual(holder3.attributes[tgt_attr.id], 176.0736, places=3)
+        self.fit.items.remove(holder1)
+        self.assertAlmostEqual(holder3.attributes[tgt_attr.id], 120)
+        self.fit.items.remove(holder2)
+        self.fit.ship = None
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(self.fit)
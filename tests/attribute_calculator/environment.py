@@ -20,7 +20,7 @@
 
 
 from eos.const.eos import State, Domain
-from eos.fit.attribute_calculator import LinkTracker, MutableAttributeMap
+from eos.fit.attribute_calculator import AffectorTable, LinkTracker, MutableAttributeMap
 
 
 class HolderContainer:
@@ -52,9 +52,12 @@ class Source:
 
 class Fit:
 
-    def __init__(self, cache_handler):
+    def __init__(self, cache_handler, lazy_invalidation=False, instrumentation=False):
         self.source = Source(cache_handler)
-        self._link_tracker = LinkTracker(self)
+        self._link_tracker = LinkTracker(
+            self, lazy_invalidation=lazy_invalidation,
+            instrumentation=instrumentation
+        )
         self.__ship = None
         self.__character = None
         self.items = HolderContainer(self)
@@ -110,10 +113,20 @@ class Holder:
 
     def __init__(self, type_):
         self.__fit = None
-        self.item = type_
+        self.__item = type_
         self.attributes = MutableAttributeMap(self)
         self._disabled_effects = set()
         self.__state = State.offline
+        self.__affector_table = None
+
+    @property
+    def item(self):
+        return self.__item
+
+    @item.setter
+    def item(self, new_item):
+        self.__affector_table = None
+        self.__item = new_item
 
     @property
     def _fit(self):
@@ -124,6 +137,12 @@ class Holder:
         self.attributes.clear()
         self.__fit = new_fit
 
+    @property
+    def _affector_table(self):
+        if self.__affector_table is None:
+            self.__affector_table = AffectorTable(self)
+        return self.__affector_table
+
     @property
     def state(self):
         return self.__state
@@ -83,5 +83,5 @@ class TestDomainFilterUnknown(AttrCalcTestCase):
         self.assertNotAlmostEqual(influence_target.attributes[self.tgt_attr.id], 100)
         self.fit.items.remove(influence_target)
         self.fit.items.remove(influence_source)
-        self.assertEqual(len(self.log), 5)
+        self.assertEqual(len(self.log), 4)
         self.assert_link_buffers_empty(self.fit)
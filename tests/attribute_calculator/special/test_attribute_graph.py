@@ -0,0 +1,132 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from eos.const.eos import State, Domain, Scope, FilterType, Operator
+from eos.const.eve import EffectCategory
+from eos.data.cache_object.modifier import Modifier
+from eos.fit.attribute_calculator import DependencyCycleError
+from tests.attribute_calculator.attrcalc_testcase import AttrCalcTestCase
+from tests.attribute_calculator.environment import IndependentItem, CharacterItem, ShipItem
+
+
+class TestAttributeGraph(AttrCalcTestCase):
+    """Test ordered calculation of all attributes of fit"""
+
+    def make_modifier(self, src_attr, tgt_attr, domain, filter_type=None):
+        modifier = Modifier()
+        modifier.state = State.offline
+        modifier.scope = Scope.local
+        modifier.src_attr = src_attr
+        modifier.operator = Operator.post_percent
+        modifier.tgt_attr = tgt_attr
+        modifier.domain = domain
+        modifier.filter_type = filter_type
+        modifier.filter_value = None
+        return modifier
+
+    def test_order(self):
+        attr1 = self.ch.attribute(attribute_id=1)
+        attr2 = self.ch.attribute(attribute_id=2)
+        attr3 = self.ch.attribute(attribute_id=3)
+        attr4 = self.ch.attribute(attribute_id=4, max_attribute=5)
+        attr5 = self.ch.attribute(attribute_id=5)
+        effect1 = self.ch.effect(effect_id=1, category=EffectCategory.passive)
+        effect1.modifiers = (self.make_modifier(attr1.id, attr2.id, Domain.self_),)
+        effect2 = self.ch.effect(effect_id=2, category=EffectCategory.passive)
+        effect2.modifiers = (self.make_modifier(attr2.id, attr3.id, Domain.ship),)
+        effect3 = self.ch.effect(effect_id=3, category=EffectCategory.passive)
+        effect3.modifiers = (self.make_modifier(attr3.id, attr4.id, Domain.ship, FilterType.all_),)
+        holder1 = CharacterItem(self.ch.type_(
+            type_id=1, effects=(effect1, effect2), attributes={attr1.id: 100, attr2.id: 20}
+        ))
+        holder2 = IndependentItem(self.ch.type_(type_id=2, effects=(effect3,), attributes={attr3.id: 150}))
+        holder3 = ShipItem(self.ch.type_(type_id=3, attributes={attr4.id: 12.5, attr5.id: 40}))
+        self.fit.items.add(holder1)
+        self.fit.ship = holder2
+        self.fit.items.add(holder3)
+        graph = self.fit._link_tracker.get_attribute_graph()
+        self.assertEqual(len(graph), 5)
+        self.assertEqual(graph.get_dependencies(holder3, attr4.id), {(holder2, attr3.id), (holder3, attr5.id)})
+        self.assertEqual(graph.get_dependencies(holder2, attr3.id), {(holder1, attr2.id)})
+        self.assertEqual(graph.get_dependencies(holder1, attr1.id), set())
+        order = graph.get_order()
+        self.assertEqual(len(order), 5)
+        for node in order:
+            for dependency in graph.get_dependencies(*node):
+                self.assertLess(order.index(dependency), order.index(node))
+        self.fit.items.remove(holder1)
+        self.fit.ship = None
+        self.fit.items.remove(holder3)
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(self.fit)
+
+    def test_evaluate_all(self):
+        attr1 = self.ch.attribute(attribute_id=1)
+        attr2 = self.ch.attribute(attribute_id=2)
+        attr3 = self.ch.attribute(attribute_id=3)
+        effect1 = self.ch.effect(effect_id=1, category=EffectCategory.passive)
+        effect1.modifiers = (self.make_modifier(attr1.id, attr2.id, Domain.ship),)
+        effect2 = self.ch.effect(effect_id=2, category=EffectCategory.passive)
+        effect2.modifiers = (self.make_modifier(attr2.id, attr3.id, Domain.ship, FilterType.all_),)
+        holder1 = CharacterItem(self.ch.type_(type_id=1, effects=(effect1,), attributes={attr1.id: 100}))
+        holder2 = IndependentItem(self.ch.type_(type_id=2, effects=(effect2,), attributes={attr2.id: 50}))
+        holder3 = ShipItem(self.ch.type_(type_id=3, attributes={attr3.id: 10}))
+        self.fit.items.add(holder1)
+        self.fit.ship = holder2
+        self.fit.items.add(holder3)
+        self.fit._link_tracker.evaluate_all()
+        # Values must be calculated and stored without
+        # accessing them
+        modified = holder3.attributes._MutableAttributeMap__modified_attributes
+        self.assertAlmostEqual(modified[attr3.id], 20)
+        modified = holder2.attributes._MutableAttributeMap__modified_attributes
+        self.assertAlmostEqual(modified[attr2.id], 100)
+        self.assertAlmostEqual(holder3.attributes[attr3.id], 20)
+        self.fit.items.remove(holder1)
+        self.fit.ship = None
+        self.fit.items.remove(holder3)
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(self.fit)
+
+    def test_cycle(self):
+        attr1 = self.ch.attribute(attribute_id=1)
+        attr2 = self.ch.attribute(attribute_id=2)
+        attr3 = self.ch.attribute(attribute_id=3)
+        effect = self.ch.effect(effect_id=1, category=EffectCategory.passive)
+        effect.modifiers = (
+            self.make_modifier(attr1.id, attr2.id, Domain.self_),
+            self.make_modifier(attr2.id, attr1.id, Domain.self_),
+            self.make_modifier(attr2.id, attr3.id, Domain.self_)
+        )
+        holder = IndependentItem(self.ch.type_(
+            type_id=1, effects=(effect,), attributes={attr1.id: 10, attr2.id: 20, attr3.id: 30}
+        ))
+        self.fit.items.add(holder)
+        graph = self.fit._link_tracker.get_attribute_graph()
+        with self.assertRaises(DependencyCycleError) as cm:
+            graph.evaluate_all()
+        cycle = cm.exception.args[0]
+        self.assertEqual(set(cycle), {(holder, attr1.id), (holder, attr2.id)})
+        # Nothing should be calculated
+        self.assertEqual(len(holder.attributes._MutableAttributeMap__modified_attributes), 0)
+        self.fit.items.remove(holder)
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(self.fit)
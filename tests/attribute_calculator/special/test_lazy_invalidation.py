@@ -0,0 +1,153 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from eos.const.eos import State, Domain, Scope, FilterType, Operator
+from eos.const.eve import Attribute, EffectCategory
+from eos.data.cache_object.modifier import Modifier
+from tests.attribute_calculator.attrcalc_testcase import AttrCalcTestCase
+from tests.attribute_calculator.environment import Fit, IndependentItem, CharacterItem, ShipItem, Skill
+
+
+class TestLazyInvalidation(AttrCalcTestCase):
+    """Test calculated values verification in lazy invalidation mode"""
+
+    def setUp(self):
+        super().setUp()
+        self.fit = Fit(self.ch, lazy_invalidation=True)
+
+    def make_modifier(self, src_attr, tgt_attr, operator=Operator.post_percent, filter_type=None):
+        modifier = Modifier()
+        modifier.state = State.offline
+        modifier.scope = Scope.local
+        modifier.src_attr = src_attr
+        modifier.operator = operator
+        modifier.tgt_attr = tgt_attr
+        modifier.domain = Domain.ship
+        modifier.filter_type = filter_type
+        modifier.filter_value = None
+        return modifier
+
+    def test_chain_change(self):
+        attr1 = self.ch.attribute(attribute_id=1)
+        attr2 = self.ch.attribute(attribute_id=2)
+        attr3 = self.ch.attribute(attribute_id=3)
+        effect1 = self.ch.effect(effect_id=1, category=EffectCategory.passive)
+        effect1.modifiers = (self.make_modifier(attr1.id, attr2.id, operator=Operator.post_mul),)
+        holder1 = CharacterItem(self.ch.type_(type_id=1, effects=(effect1,), attributes={attr1.id: 5}))
+        effect2 = self.ch.effect(effect_id=2, category=EffectCategory.passive)
+        effect2.modifiers = (self.make_modifier(attr2.id, attr3.id, filter_type=FilterType.all_),)
+        holder2 = IndependentItem(self.ch.type_(type_id=2, effects=(effect2,), attributes={attr2.id: 7.5}))
+        holder3 = ShipItem(self.ch.type_(type_id=3, attributes={attr3.id: 0.5}))
+        self.fit.items.add(holder1)
+        self.fit.ship = holder2
+        self.fit.items.add(holder3)
+        self.assertAlmostEqual(holder3.attributes[attr3.id], 0.6875)
+        holder1.attributes[attr1.id] = 4
+        # Change must be noticed through the whole chain
+        self.assertAlmostEqual(holder3.attributes[attr3.id], 0.65)
+        self.fit.items.remove(holder1)
+        self.assertAlmostEqual(holder3.attributes[attr3.id], 0.5375)
+        self.fit.ship = None
+        self.assertAlmostEqual(holder3.attributes[attr3.id], 0.5)
+        self.fit.items.remove(holder3)
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(self.fit)
+
+    def test_holder_addition(self):
+        src_attr = self.ch.attribute(attribute_id=1)
+        tgt_attr = self.ch.attribute(attribute_id=2)
+        effect = self.ch.effect(effect_id=1, category=EffectCategory.passive)
+        effect.modifiers = (self.make_modifier(src_attr.id, tgt_attr.id, filter_type=FilterType.all_),)
+        holder1 = IndependentItem(self.ch.type_(type_id=1, effects=(effect,), attributes={src_attr.id: 20}))
+        holder2 = ShipItem(self.ch.type_(type_id=2, attributes={tgt_attr.id: 100}))
+        self.fit.items.add(holder2)
+        self.assertAlmostEqual(holder2.attributes[tgt_attr.id], 100)
+        self.fit.items.add(holder1)
+        self.assertAlmostEqual(holder2.attributes[tgt_attr.id], 120)
+        self.fit.items.remove(holder1)
+        self.assertAlmostEqual(holder2.attributes[tgt_attr.id], 100)
+        self.fit.items.remove(holder2)
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(self.fit)
+
+    def test_cap_change(self):
+        src_attr = self.ch.attribute(attribute_id=1)
+        capped_attr = self.ch.attribute(attribute_id=2, max_attribute=3)
+        capping_attr = self.ch.attribute(attribute_id=3)
+        effect = self.ch.effect(effect_id=1, category=EffectCategory.passive)
+        effect.modifiers = (self.make_modifier(src_attr.id, capped_attr.id),)
+        holder = ShipItem(self.ch.type_(type_id=1, effects=(effect,), attributes={
+            src_attr.id: 50, capped_attr.id: 100, capping_attr.id: 200}))
+        self.fit.ship = holder
+        self.assertAlmostEqual(holder.attributes[capped_attr.id], 150)
+        holder.attributes[capping_attr.id] = 120
+        self.assertAlmostEqual(holder.attributes[capped_attr.id], 120)
+        holder.attributes[src_attr.id] = 10
+        self.assertAlmostEqual(holder.attributes[capped_attr.id], 110)
+        self.fit.ship = None
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(self.fit)
+
+    def test_skill_level_change(self):
+        tgt_attr = self.ch.attribute(attribute_id=1)
+        self.ch.attribute(attribute_id=Attribute.skill_level)
+        effect = self.ch.effect(effect_id=1, category=EffectCategory.passive)
+        effect.modifiers = (self.make_modifier(Attribute.skill_level, tgt_attr.id, operator=Operator.mod_add),)
+        skill = Skill(self.ch.type_(type_id=1, effects=(effect,)))
+        skill.level = 3
+        ship = ShipItem(self.ch.type_(type_id=2, attributes={tgt_attr.id: 10}))
+        self.fit.items.add(skill)
+        self.fit.ship = ship
+        self.assertAlmostEqual(ship.attributes[tgt_attr.id], 13)
+        skill.level = 5
+        self.fit._link_tracker.clear_holder_attribute_dependents(skill, Attribute.skill_level)
+        self.assertAlmostEqual(ship.attributes[tgt_attr.id], 15)
+        self.fit.items.remove(skill)
+        self.fit.ship = None
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(self.fit)
+
+    def test_unchanged_intermediate(self):
+        # When intermediate value is recalculated into the same value,
+        # its dependents are still valid and should not be recalculated
+        attr1 = self.ch.attribute(attribute_id=1)
+        attr2 = self.ch.attribute(attribute_id=2, max_attribute=4)
+        attr3 = self.ch.attribute(attribute_id=3)
+        self.ch.attribute(attribute_id=4)
+        effect1 = self.ch.effect(effect_id=1, category=EffectCategory.passive)
+        effect1.modifiers = (self.make_modifier(attr1.id, attr2.id),)
+        holder1 = CharacterItem(self.ch.type_(type_id=1, effects=(effect1,), attributes={attr1.id: 50}))
+        effect2 = self.ch.effect(effect_id=2, category=EffectCategory.passive)
+        effect2.modifiers = (self.make_modifier(attr2.id, attr3.id, operator=Operator.mod_add),)
+        holder2 = ShipItem(self.ch.type_(type_id=2, effects=(effect2,), attributes={
+            attr2.id: 100, attr3.id: 1, 4: 120}))
+        self.fit.items.add(holder1)
+        self.fit.ship = holder2
+        self.assertAlmostEqual(holder2.attributes[attr3.id], 121)
+        # Overwrite calculated value to see if it is recalculated
+        holder2.attributes._MutableAttributeMap__modified_attributes[attr3.id] = 0
+        holder1.attributes[attr1.id] = 60
+        self.assertAlmostEqual(holder2.attributes[attr2.id], 120)
+        self.assertAlmostEqual(holder2.attributes[attr3.id], 0)
+        self.fit.items.remove(holder1)
+        self.fit.ship = None
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(self.fit)
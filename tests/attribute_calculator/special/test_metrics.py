@@ -0,0 +1,101 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from eos.const.eos import State, Domain, Scope, FilterType, Operator
+from eos.const.eve import EffectCategory
+from eos.data.cache_object.modifier import Modifier
+from eos.fit.attribute_calculator import process_metrics
+from tests.attribute_calculator.attrcalc_testcase import AttrCalcTestCase
+from tests.attribute_calculator.environment import Fit, IndependentItem, ShipItem
+
+
+class TestMetrics(AttrCalcTestCase):
+    """Test collection of attribute calculator metrics"""
+
+    def setUp(self):
+        super().setUp()
+        self.src_attr = self.ch.attribute(attribute_id=1)
+        self.tgt_attr = self.ch.attribute(attribute_id=2)
+        modifier = Modifier()
+        modifier.state = State.offline
+        modifier.scope = Scope.local
+        modifier.src_attr = self.src_attr.id
+        modifier.operator = Operator.post_percent
+        modifier.tgt_attr = self.tgt_attr.id
+        modifier.domain = Domain.ship
+        modifier.filter_type = FilterType.all_
+        modifier.filter_value = None
+        effect = self.ch.effect(effect_id=1, category=EffectCategory.passive)
+        effect.modifiers = (modifier,)
+        self.ship = IndependentItem(self.ch.type_(type_id=1, effects=(effect,), attributes={self.src_attr.id: 20}))
+        self.module = ShipItem(self.ch.type_(type_id=2, attributes={self.tgt_attr.id: 100}))
+
+    def test_disabled(self):
+        self.fit.ship = self.ship
+        self.fit.items.add(self.module)
+        self.assertAlmostEqual(self.module.attributes[self.tgt_attr.id], 120)
+        self.assertIsNone(self.fit._link_tracker.get_metrics())
+        self.fit.items.remove(self.module)
+        self.fit.ship = None
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(self.fit)
+
+    def test_fit(self):
+        fit = Fit(self.ch, instrumentation=True)
+        fit.ship = self.ship
+        fit.items.add(self.module)
+        self.assertAlmostEqual(self.module.attributes[self.tgt_attr.id], 120)
+        self.assertAlmostEqual(self.module.attributes[self.tgt_attr.id], 120)
+        metrics = fit._link_tracker.get_metrics()
+        self.assertEqual(metrics.hits, 1)
+        self.assertEqual(metrics.misses, 2)
+        self.assertEqual(metrics.calculations, {self.src_attr.id: 1, self.tgt_attr.id: 1})
+        self.assertEqual(metrics.affectors_scanned, {self.src_attr.id: 0, self.tgt_attr.id: 1})
+        self.assertEqual(set(metrics.calculation_time), {self.src_attr.id, self.tgt_attr.id})
+        self.assertEqual(metrics.cascade_sizes, {})
+        # Change of source attribute value clears target
+        self.ship.attributes[self.src_attr.id] = 50
+        self.assertAlmostEqual(self.module.attributes[self.tgt_attr.id], 150)
+        metrics = fit._link_tracker.get_metrics()
+        self.assertEqual(metrics.cascade_sizes, {1: 1})
+        self.assertEqual(metrics.calculations, {self.src_attr.id: 1, self.tgt_attr.id: 2})
+        fit.items.remove(self.module)
+        fit.ship = None
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(fit)
+
+    def test_process(self):
+        before = process_metrics.snapshot()
+        fit = Fit(self.ch, instrumentation=True)
+        fit.ship = self.ship
+        fit.items.add(self.module)
+        self.assertAlmostEqual(self.module.attributes[self.tgt_attr.id], 120)
+        self.assertAlmostEqual(self.module.attributes[self.tgt_attr.id], 120)
+        after = process_metrics.snapshot()
+        self.assertEqual(after.hits - before.hits, 1)
+        self.assertEqual(after.misses - before.misses, 2)
+        self.assertEqual(
+            after.calculations[self.tgt_attr.id] - before.calculations.get(self.tgt_attr.id, 0), 1
+        )
+        fit.items.remove(self.module)
+        fit.ship = None
+        self.assertEqual(len(self.log), 0)
+        self.assert_link_buffers_empty(fit)
@@ -0,0 +1,56 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from eos.fit.attribute_calculator.penalty import penalize_values, penalize_value_lists
+from tests.eos_testcase import EosTestCase
+
+
+class TestPenalty(EosTestCase):
+    """Test stacking penalty routines directly"""
+
+    def setUp(self):
+        super().setUp()
+        self.mod_lists = [
+            [1.5, 1.1, 1.25, 0.8, 0.5, 1],
+            [1.2] * 15,
+            [0.9, 0.7],
+            [],
+            [1.3]
+        ]
+
+    def test_single(self):
+        self.assertAlmostEqual(penalize_values([1.5]), 1.5)
+        self.assertAlmostEqual(penalize_values([1.5, 1.5]), 1.5 * (1 + 0.5 * 0.8691199806), places=6)
+        self.assertAlmostEqual(penalize_values([]), 1)
+        self.assertEqual(len(self.log), 0)
+
+    def test_chain_length(self):
+        # Modifiers beyond 11th position in chain
+        # should have no effect
+        self.assertEqual(penalize_values([1.2] * 11), penalize_values([1.2] * 20))
+        self.assertEqual(len(self.log), 0)
+
+    def test_batch(self):
+        results = penalize_value_lists(self.mod_lists)
+        self.assertEqual(len(results), len(self.mod_lists))
+        for mod_list, result in zip(self.mod_lists, results):
+            self.assertAlmostEqual(result, penalize_values(mod_list))
+        self.assertEqual(len(self.log), 0)
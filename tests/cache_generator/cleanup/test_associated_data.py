@@ -130,13 +130,16 @@ class TestAssociatedData(GeneratorTestCase):
         self.dh.data['evegroups'].append({'groupID': 5, 'categoryID': 16, 'groupName_en-us': ''})
         mod_builder.return_value.build.return_value = ([], 0)
         data = self.run_generator()
-        self.assertEqual(len(self.log), 2)
+        self.assertEqual(len(self.log), 3)
         literal_stats = self.log[0]
         self.assertEqual(literal_stats.name, 'eos.data.cache_generator.converter')
         self.assertEqual(literal_stats.levelno, logging.INFO)
         clean_stats = self.log[1]
         self.assertEqual(clean_stats.name, 'eos.data.cache_generator.cleaner')
         self.assertEqual(clean_stats.levelno, logging.INFO)
+        yaml_stats = self.log[2]
+        self.assertEqual(yaml_stats.name, 'eos.data.cache_generator.generator')
+        self.assertEqual(yaml_stats.levelno, logging.INFO)
         self.assertEqual(
             clean_stats.msg,
             'cleaned: 0.0% from dgmattribs, 0.0% from dgmeffects, 0.0% from dgmexpressions, '
@@ -241,13 +244,16 @@ class TestAssociatedData(GeneratorTestCase):
         self.dh.data['evegroups'].append({'groupID': 6, 'categoryID': 50, 'groupName_en-us': ''})
         mod_builder.return_value.build.return_value = ([], 0)
         data = self.run_generator()
-        self.assertEqual(len(self.log), 2)
+        self.assertEqual(len(self.log), 3)
         literal_stats = self.log[0]
         self.assertEqual(literal_stats.name, 'eos.data.cache_generator.converter')
         self.assertEqual(literal_stats.levelno, logging.INFO)
         clean_stats = self.log[1]
         self.assertEqual(clean_stats.name, 'eos.data.cache_generator.cleaner')
         self.assertEqual(clean_stats.levelno, logging.INFO)
+        yaml_stats = self.log[2]
+        self.assertEqual(yaml_stats.name, 'eos.data.cache_generator.generator')
+        self.assertEqual(yaml_stats.levelno, logging.INFO)
         self.assertEqual(
             clean_stats.msg,
             'cleaned: 0.0% from dgmeffects, 0.0% from dgmexpressions, 0.0% from dgmtypeeffects, '
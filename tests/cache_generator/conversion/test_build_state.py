@@ -0,0 +1,132 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import json
+import logging
+from unittest.mock import patch
+
+from tests.cache_generator.generator_testcase import GeneratorTestCase
+
+
+@patch('eos.data.cache_generator.converter.ModifierBuilder')
+class TestConversionBuildState(GeneratorTestCase):
+    """
+    Generator can reuse modifiers built during previous
+    run for effects whose data didn't change.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.dh.data['evetypes'].append({'typeID': 1, 'groupID': 1, 'typeName_en-us': ''})
+        self.dh.data['dgmtypeattribs'].append({'typeID': 1, 'attributeID': 2, 'value': 5.0})
+        self.dh.data['dgmtypeattribs'].append({'typeID': 1, 'attributeID': 3, 'value': 10.0})
+        self.dh.data['dgmattribs'].append({'attributeID': 2})
+        self.dh.data['dgmattribs'].append({'attributeID': 3})
+        self.dh.data['dgmtypeeffects'].append({'typeID': 1, 'effectID': 111})
+        self.dh.data['dgmeffects'].append({
+            'effectID': 111, 'preExpression': 1,
+            'postExpression': 11, 'effectCategory': 0
+        })
+        self.dh.data['dgmexpressions'].append({
+            'expressionID': 1, 'operandID': 6, 'arg1': None, 'arg2': None,
+            'expressionValue': None, 'expressionTypeID': None,
+            'expressionGroupID': None, 'expressionAttributeID': None
+        })
+
+    def make_modifier(self):
+        return self.mod(
+            state=2, scope=3, src_attr=2, operator=5,
+            tgt_attr=3, domain=7, filter_type=None, filter_value=None
+        )
+
+    def run_twice(self, mod_builder, change=None, state_filter=None):
+        """
+        Run generator, apply changes to data and state, and
+        run generator again with state from first run.
+
+        Return value:
+        Data generated by second run
+        """
+        mod_builder.return_value.build.return_value = ([self.make_modifier()], 1)
+        self.run_generator()
+        if change is not None:
+            change()
+        # State is persisted as JSON
+        state = json.loads(json.dumps(self.generator_state))
+        if state_filter is not None:
+            state = state_filter(state)
+        mod_builder.return_value.build.reset_mock()
+        return self.run_generator(state=state)
+
+    def check_modifiers(self, data):
+        self.assertEqual(data['effects'][111]['modifiers'], [1])
+        self.assertEqual(data['effects'][111]['build_status'], 1)
+        expected = {
+            'modifier_id': 1, 'state': 2, 'scope': 3, 'src_attr': 2, 'operator': 5,
+            'tgt_attr': 3, 'domain': 7, 'filter_type': None, 'filter_value': None
+        }
+        self.assertEqual(data['modifiers'][1], expected)
+
+    def test_reuse(self, mod_builder):
+        data = self.run_twice(mod_builder)
+        self.assertFalse(mod_builder.return_value.build.called)
+        self.check_modifiers(data)
+
+    def test_effect_changed(self, mod_builder):
+        def change():
+            self.dh.data['dgmeffects'][0]['effectCategory'] = 1
+        data = self.run_twice(mod_builder, change=change)
+        self.assertEqual(mod_builder.return_value.build.call_count, 1)
+        self.check_modifiers(data)
+
+    def test_expression_changed(self, mod_builder):
+        def change():
+            self.dh.data['dgmexpressions'][0]['expressionValue'] = 'stuff'
+        self.run_twice(mod_builder, change=change)
+        self.assertEqual(mod_builder.return_value.build.call_count, 1)
+
+    def test_attribute_removed(self, mod_builder):
+        # Reused modifiers cannot refer attributes
+        # which are not in data anymore
+        def change():
+            del self.dh.data['dgmattribs'][1]
+            del self.dh.data['dgmtypeattribs'][1]
+        self.run_twice(mod_builder, change=change)
+        self.assertEqual(mod_builder.return_value.build.call_count, 1)
+
+    def test_version_mismatch(self, mod_builder):
+        def state_filter(state):
+            state['eos_version'] = 'some other version'
+            return state
+        data = self.run_twice(mod_builder, state_filter=state_filter)
+        self.assertEqual(mod_builder.return_value.build.call_count, 1)
+        self.check_modifiers(data)
+
+    def test_malformed(self, mod_builder):
+        def state_filter(state):
+            del state['effects']
+            return state
+        data = self.run_twice(mod_builder, state_filter=state_filter)
+        self.assertEqual(mod_builder.return_value.build.call_count, 1)
+        self.check_modifiers(data)
+        warnings = [r for r in self.log if r.levelno == logging.WARNING]
+        self.assertEqual(len(warnings), 1)
+        self.assertEqual(warnings[0].msg, 'generator state is malformed, running full build')
@@ -22,6 +22,8 @@
 import logging
 from unittest.mock import patch
 
+from eos.data.cache_generator.yaml_cache import YamlCache
+
 from tests.cache_generator.generator_testcase import GeneratorTestCase
 
 
@@ -46,13 +48,16 @@ class TestConversionModifier(GeneratorTestCase):
         )
         mod_builder.return_value.build.return_value = ([mod], 0)
         data = self.run_generator()
-        self.assertEqual(len(self.log), 2)
+        self.assertEqual(len(self.log), 3)
         literal_stats = self.log[0]
         self.assertEqual(literal_stats.name, 'eos.data.cache_generator.converter')
         self.assertEqual(literal_stats.levelno, logging.INFO)
         clean_stats = self.log[1]
         self.assertEqual(clean_stats.name, 'eos.data.cache_generator.cleaner')
         self.assertEqual(clean_stats.levelno, logging.INFO)
+        yaml_stats = self.log[2]
+        self.assertEqual(yaml_stats.name, 'eos.data.cache_generator.generator')
+        self.assertEqual(yaml_stats.levelno, logging.INFO)
         self.assertEqual(len(data['modifiers']), 1)
         self.assertIn(1, data['modifiers'])
         expected = {
@@ -83,13 +88,16 @@ class TestConversionModifier(GeneratorTestCase):
         )
         mod_builder.return_value.build.return_value = ([mod1, mod2], 0)
         data = self.run_generator()
-        self.assertEqual(len(self.log), 2)
+        self.assertEqual(len(self.log), 3)
         literal_stats = self.log[0]
         self.assertEqual(literal_stats.name, 'eos.data.cache_generator.converter')
         self.assertEqual(literal_stats.levelno, logging.INFO)
         clean_stats = self.log[1]
         self.assertEqual(clean_stats.name, 'eos.data.cache_generator.cleaner')
         self.assertEqual(clean_stats.levelno, logging.INFO)
+        yaml_stats = self.log[2]
+        self.assertEqual(yaml_stats.name, 'eos.data.cache_generator.generator')
+        self.assertEqual(yaml_stats.levelno, logging.INFO)
         self.assertEqual(len(data['modifiers']), 2)
         self.assertIn(1, data['modifiers'])
         expected = {
@@ -133,13 +141,16 @@ class TestConversionModifier(GeneratorTestCase):
         arg_map = {333: mod1, 444: mod2}
         mod_builder.return_value.build.side_effect = lambda eff_row: ([arg_map[eff_row['effect_id']]], 0)
         data = self.run_generator()
-        self.assertEqual(len(self.log), 2)
+        self.assertEqual(len(self.log), 3)
         literal_stats = self.log[0]
         self.assertEqual(literal_stats.name, 'eos.data.cache_generator.converter')
         self.assertEqual(literal_stats.levelno, logging.INFO)
         clean_stats = self.log[1]
         self.assertEqual(clean_stats.name, 'eos.data.cache_generator.cleaner')
         self.assertEqual(clean_stats.levelno, logging.INFO)
+        yaml_stats = self.log[2]
+        self.assertEqual(yaml_stats.name, 'eos.data.cache_generator.generator')
+        self.assertEqual(yaml_stats.levelno, logging.INFO)
         self.assertEqual(len(data['modifiers']), 2)
         self.assertIn(1, data['modifiers'])
         expected = {
@@ -181,13 +192,16 @@ class TestConversionModifier(GeneratorTestCase):
         )
         mod_builder.return_value.build.return_value = ([mod1, mod2], 0)
         data = self.run_generator()
-        self.assertEqual(len(self.log), 2)
+        self.assertEqual(len(self.log), 3)
         literal_stats = self.log[0]
         self.assertEqual(literal_stats.name, 'eos.data.cache_generator.converter')
         self.assertEqual(literal_stats.levelno, logging.INFO)
         clean_stats = self.log[1]
         self.assertEqual(clean_stats.name, 'eos.data.cache_generator.cleaner')
         self.assertEqual(clean_stats.levelno, logging.INFO)
+        yaml_stats = self.log[2]
+        self.assertEqual(yaml_stats.name, 'eos.data.cache_generator.generator')
+        self.assertEqual(yaml_stats.levelno, logging.INFO)
         self.assertEqual(len(data['modifiers']), 1)
         self.assertIn(1, data['modifiers'])
         expected = {
@@ -226,13 +240,16 @@ class TestConversionModifier(GeneratorTestCase):
         arg_map = {333: mod1, 444: mod2}
         mod_builder.return_value.build.side_effect = lambda eff_row: ([arg_map[eff_row['effect_id']]], 0)
         data = self.run_generator()
-        self.assertEqual(len(self.log), 2)
+        self.assertEqual(len(self.log), 3)
         literal_stats = self.log[0]
         self.assertEqual(literal_stats.name, 'eos.data.cache_generator.converter')
         self.assertEqual(literal_stats.levelno, logging.INFO)
         clean_stats = self.log[1]
         self.assertEqual(clean_stats.name, 'eos.data.cache_generator.cleaner')
         self.assertEqual(clean_stats.levelno, logging.INFO)
+        yaml_stats = self.log[2]
+        self.assertEqual(yaml_stats.name, 'eos.data.cache_generator.generator')
+        self.assertEqual(yaml_stats.levelno, logging.INFO)
         self.assertEqual(len(data['modifiers']), 1)
         self.assertIn(1, data['modifiers'])
         expected = {
@@ -273,19 +290,26 @@ class TestConversionModifier(GeneratorTestCase):
         self._setup_args_capture(mod_builder.return_value.build, builder_args)
         mod_builder.return_value.build.return_value = ([], 0)
         self.run_generator()
-        self.assertEqual(len(self.log), 2)
+        self.assertEqual(len(self.log), 3)
         literal_stats = self.log[0]
         self.assertEqual(literal_stats.name, 'eos.data.cache_generator.converter')
         self.assertEqual(literal_stats.levelno, logging.INFO)
         clean_stats = self.log[1]
         self.assertEqual(clean_stats.name, 'eos.data.cache_generator.cleaner')
         self.assertEqual(clean_stats.levelno, logging.INFO)
+        yaml_stats = self.log[2]
+        self.assertEqual(yaml_stats.name, 'eos.data.cache_generator.generator')
+        self.assertEqual(yaml_stats.levelno, logging.INFO)
         call1, call2 = mod_builder.mock_calls
         # Check initialization
         name, args, kwargs = call1
         self.assertEqual(name, '')
         self.assertEqual(len(args), 1)
-        self.assertEqual(len(kwargs), 0)
+        # Modifier infos are parsed using cache shared with cleaner
+        self.assertEqual(set(kwargs), {'yaml_cache', 'tree_memo'})
+        self.assertIsInstance(kwargs['yaml_cache'], YamlCache)
+        # Memoization of expression subtrees is disabled by default
+        self.assertIs(kwargs['tree_memo'], False)
         expressions = args[0]
         # Expression order isn't stable in passed list, so verify
         # passed argument using membership check
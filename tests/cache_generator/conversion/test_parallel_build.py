@@ -0,0 +1,101 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import logging
+
+from eos.const.eos import EffectBuildStatus
+from eos.data.cache_generator import CacheGenerator
+from tests.cache_generator.generator_testcase import GeneratorTestCase
+
+
+class TestConversionParallelBuild(GeneratorTestCase):
+    """
+    Modifiers built in worker processes should be the
+    same as modifiers built in current process.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.dh.data['evetypes'].append({'typeID': 1, 'groupID': 1, 'typeName_en-us': ''})
+        for attr_id in range(10, 20):
+            self.dh.data['dgmattribs'].append({'attributeID': attr_id})
+        for effect_id in range(100, 110):
+            self.dh.data['dgmtypeeffects'].append({'typeID': 1, 'effectID': effect_id})
+            # Make some of effects share modifiers, and some
+            # have multiple ones
+            modinfo = ''
+            for tgt_attr in range(effect_id % 3, effect_id % 3 + effect_id % 2 + 1):
+                modinfo += (
+                    '- domain: shipID\n  func: ItemModifier\n  modifiedAttributeID: {}\n'
+                    '  modifyingAttributeID: {}\n  operator: 6\n'
+                ).format(tgt_attr + 10, effect_id % 5 + 15)
+            self.dh.data['dgmeffects'].append({
+                'effectID': effect_id, 'effectCategory': 0, 'modifierInfo': modinfo
+            })
+
+    def run_generator_with(self, workers):
+        generator = CacheGenerator(workers=workers)
+        return generator.run(self.dh), generator.get_state()
+
+    def test_same_as_serial(self):
+        serial_data, serial_state = self.run_generator_with(None)
+        parallel_data, parallel_state = self.run_generator_with(2)
+        self.assertEqual(len(serial_data['modifiers']), 13)
+        for effect_row in serial_data['effects']:
+            self.assertEqual(effect_row['build_status'], EffectBuildStatus.ok_full)
+        # Modifier IDs are assigned in the very same way
+        self.assertEqual(
+            sorted(parallel_data['modifiers'], key=lambda row: row['modifier_id']),
+            sorted(serial_data['modifiers'], key=lambda row: row['modifier_id'])
+        )
+        self.assertEqual(
+            sorted(parallel_data['effects'], key=lambda row: row['effect_id']),
+            sorted(serial_data['effects'], key=lambda row: row['effect_id'])
+        )
+        self.assertEqual(parallel_state, serial_state)
+        for log_record in self.log:
+            self.assertEqual(log_record.levelno, logging.INFO)
+
+    def test_log_same_as_serial(self):
+        # Effect with modifier which cannot be built
+        self.dh.data['dgmtypeeffects'].append({'typeID': 1, 'effectID': 110})
+        self.dh.data['dgmeffects'].append({
+            'effectID': 110, 'effectCategory': 0, 'modifierInfo': (
+                '- domain: shipID\n  func: UnknownFunc\n  modifiedAttributeID: 10\n'
+                '  modifyingAttributeID: 15\n  operator: 6\n')
+        })
+        self.run_generator_with(None)
+        serial_records = [
+            (r.name, r.levelno, r.getMessage()) for r in self.log
+            if r.name.startswith('eos.data.cache_generator.modifier_builder')
+        ]
+        serial_log_len = len(self.log)
+        self.run_generator_with(2)
+        parallel_records = [
+            (r.name, r.levelno, r.getMessage()) for r in self.log[serial_log_len:]
+            if r.name.startswith('eos.data.cache_generator.modifier_builder')
+        ]
+        self.assertEqual(len(serial_records), 1)
+        self.assertEqual(serial_records[0][1], logging.WARNING)
+        self.assertEqual(
+            serial_records[0][2],
+            'failed to build one of the modifiers of effect 110: unknown filter function UnknownFunc')
+        self.assertEqual(parallel_records, serial_records)
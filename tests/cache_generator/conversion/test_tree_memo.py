@@ -0,0 +1,107 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import logging
+
+from eos.const.eos import EffectBuildStatus
+from eos.const.eve import Operand
+from eos.data.cache_generator import CacheGenerator
+from tests.cache_generator.generator_testcase import GeneratorTestCase
+
+
+class TestConversionTreeMemo(GeneratorTestCase):
+    """
+    Counters of expression subtree memoization should be
+    logged, including ones gathered by worker processes.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.dh.data['evetypes'].append({'typeID': 1, 'groupID': 1, 'typeName_en-us': ''})
+        self.dh.data['dgmattribs'].append({'attributeID': 9})
+        self.dh.data['dgmattribs'].append({'attributeID': 327})
+        # Effects 100 and 101 have structurally equal trees, effect
+        # 102 uses the very same tree as effect 100
+        add_mod_id_1, rm_mod_id_1 = self.make_tree(0)
+        add_mod_id_2, rm_mod_id_2 = self.make_tree(100)
+        for effect_id, add_mod_id, rm_mod_id in (
+            (100, add_mod_id_1, rm_mod_id_1),
+            (101, add_mod_id_2, rm_mod_id_2),
+            (102, add_mod_id_1, rm_mod_id_1)
+        ):
+            self.dh.data['dgmtypeeffects'].append({'typeID': 1, 'effectID': effect_id})
+            self.dh.data['dgmeffects'].append({
+                'effectID': effect_id, 'effectCategory': 0,
+                'preExpression': add_mod_id, 'postExpression': rm_mod_id
+            })
+
+    def make_tree(self, id_offset):
+        def make(expression_id, operand_id, arg1=None, arg2=None, value=None, attr_id=None):
+            self.dh.data['dgmexpressions'].append({
+                'expressionID': id_offset + expression_id, 'operandID': operand_id,
+                'arg1': None if arg1 is None else id_offset + arg1,
+                'arg2': None if arg2 is None else id_offset + arg2,
+                'expressionValue': value, 'expressionTypeID': None,
+                'expressionGroupID': None, 'expressionAttributeID': attr_id
+            })
+        make(1, Operand.def_loc, value='Ship')
+        make(2, Operand.def_attr, attr_id=9)
+        make(3, Operand.def_optr, value='PostPercent')
+        make(4, Operand.def_attr, attr_id=327)
+        make(5, Operand.itm_attr, arg1=1, arg2=2)
+        make(6, Operand.optr_tgt, arg1=3, arg2=5)
+        make(7, Operand.add_itm_mod, arg1=6, arg2=4)
+        make(8, Operand.rm_itm_mod, arg1=6, arg2=4)
+        return id_offset + 7, id_offset + 8
+
+    def run_generator_with(self, workers):
+        generator = CacheGenerator(workers=workers, tree_memo=True)
+        return generator.run(self.dh)
+
+    def get_memo_record(self):
+        memo_records = [r for r in self.log if r.msg.startswith('expression subtree memo')]
+        self.assertEqual(len(memo_records), 1)
+        memo_record = memo_records[0]
+        self.assertEqual(memo_record.name, 'eos.data.cache_generator.generator')
+        self.assertEqual(memo_record.levelno, logging.INFO)
+        return memo_record
+
+    def test_serial(self):
+        data = self.run_generator_with(None)
+        self.assertEqual(len(data['modifiers']), 1)
+        for effect_row in data['effects']:
+            self.assertEqual(effect_row['build_status'], EffectBuildStatus.ok_full)
+            self.assertEqual(effect_row['modifiers'], [1])
+        self.assertEqual(
+            self.get_memo_record().msg,
+            'expression subtree memo: 2 subtrees converted, 2 reused by ID, '
+            '2 reused by structure, 24 node visits saved'
+        )
+
+    def test_workers(self):
+        data = self.run_generator_with(2)
+        self.assertEqual(len(data['modifiers']), 1)
+        # Workers do not share memo, but counters of all of
+        # them are summed up
+        subtrees_converted, id_hits, structure_hits, nodes_saved = (
+            int(word) for word in self.get_memo_record().msg.split() if word.isdigit())
+        self.assertEqual(subtrees_converted + id_hits + structure_hits, 6)
+        self.assertGreaterEqual(subtrees_converted, 2)
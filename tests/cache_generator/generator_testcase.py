@@ -30,19 +30,24 @@ class GeneratorTestCase(EosTestCase):
     Additional functionality provided:
 
     self.dh -- default data handler
+    self.generator_state -- state of generator after last run
     """
 
     def setUp(self):
         super().setUp()
         self.dh = DataHandler()
 
-    def run_generator(self):
+    def run_generator(self, state=None):
         """
         Run generator and rework data structure into
         keyed tables so it's easier to check.
+
+        Optional arguments:
+        state -- generator state to pass to generator
         """
         generator = CacheGenerator()
-        data = generator.run(self.dh)
+        data = generator.run(self.dh, state=state)
+        self.generator_state = generator.get_state()
         keys = {
             'types': 'type_id',
             'attributes': 'attribute_id',
@@ -0,0 +1,82 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from eos.data.cache_generator.yaml_cache import YamlCache, _parse_simple
+
+
+MODINFO_YAML = (
+    '- domain: shipID\n  func: LocationRequiredSkillModifier\n  modifiedAttributeID: 22\n'
+    '  modifyingAttributeID: -11\n  operator: 6\n  skillTypeID: 3300\n'
+    '- domain:\n  func: ItemModifier\n  modifiedAttributeID: 0\n  operator: ~\n'
+)
+
+
+def test_simple_same_as_yaml():
+    assert _parse_simple(MODINFO_YAML) == yaml.safe_load(MODINFO_YAML)
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '[]',
+    '- domain: shipID\n  operator: 6.5\n',
+    '- domain: shipID\n  operator: 06\n',
+    '- domain: yes\n',
+    '- domain: "shipID"\n',
+    '- domain: shipID\n    func: ItemModifier\n',
+    '  domain: shipID\n',
+    'domain: shipID\n'
+])
+def test_simple_rejects_other_shapes(text):
+    assert _parse_simple(text) is None
+
+
+def test_parses_once():
+    yaml_cache = YamlCache()
+    text = '- domain: 6.5\n'
+    with patch('eos.data.cache_generator.yaml_cache.yaml.load', wraps=yaml.load) as load, \
+            patch('eos.data.cache_generator.yaml_cache.yaml.safe_load', wraps=yaml.safe_load) as safe_load:
+        data1 = yaml_cache.load(text)
+        data2 = yaml_cache.load(text)
+    assert data1 == [{'domain': 6.5}]
+    assert data2 is data1
+    assert load.call_count + safe_load.call_count == 1
+    assert yaml_cache.parse_count == 1
+
+
+def test_error_cached():
+    yaml_cache = YamlCache()
+    with pytest.raises(yaml.YAMLError):
+        yaml_cache.load('- a: [')
+    with pytest.raises(yaml.YAMLError):
+        yaml_cache.load('- a: [')
+    assert yaml_cache.parse_count == 1
+
+
+@patch('eos.data.cache_generator.yaml_cache._Loader', None)
+def test_without_libyaml():
+    yaml_cache = YamlCache()
+    assert yaml_cache.load(MODINFO_YAML) == yaml.safe_load(MODINFO_YAML)
+    assert yaml_cache.load('- domain: 6.5\n') == [{'domain': 6.5}]
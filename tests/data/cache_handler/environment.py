@@ -0,0 +1,109 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+def make_cache_data():
+    """
+    Compose data in the form cache generator produces it.
+
+    Return value:
+    Dictionary in {entity type: [{field name: field value}] format
+    """
+    return {
+        'types': [
+            {
+                'type_id': 1, 'group': 5, 'category': 7,
+                'attributes': {2: 10.5, 3: 20}, 'effects': [100, 101], 'default_effect': 101
+            },
+            {
+                'type_id': 2, 'group': None, 'category': None,
+                'attributes': {}, 'effects': [], 'default_effect': None
+            }
+        ],
+        'attributes': [
+            {'attribute_id': 2, 'max_attribute': 3, 'default_value': 0.0, 'high_is_good': True, 'stackable': False},
+            {'attribute_id': 3, 'max_attribute': None, 'default_value': None, 'high_is_good': 0, 'stackable': 1}
+        ],
+        'effects': [
+            {
+                'effect_id': 100, 'effect_category': 0, 'is_offensive': False, 'is_assistance': False,
+                'duration_attribute': None, 'discharge_attribute': None, 'range_attribute': None,
+                'falloff_attribute': None, 'tracking_speed_attribute': None,
+                'fitting_usage_chance_attribute': None, 'build_status': 1, 'modifiers': [1000]
+            },
+            {
+                'effect_id': 101, 'effect_category': 1, 'is_offensive': True, 'is_assistance': False,
+                'duration_attribute': 2, 'discharge_attribute': 3, 'range_attribute': None,
+                'falloff_attribute': None, 'tracking_speed_attribute': None,
+                'fitting_usage_chance_attribute': None, 'build_status': 2, 'modifiers': [1000, 1001]
+            }
+        ],
+        'modifiers': [
+            {
+                'modifier_id': 1000, 'state': 1, 'scope': 1, 'src_attr': 2, 'operator': 4,
+                'tgt_attr': 3, 'domain': 2, 'filter_type': None, 'filter_value': None
+            },
+            {
+                'modifier_id': 1001, 'state': 3, 'scope': 1, 'src_attr': 3, 'operator': 6,
+                'tgt_attr': 2, 'domain': 1, 'filter_type': 2, 'filter_value': 55
+            }
+        ]
+    }
+
+
+def check_cache_contents(cache_handler):
+    """
+    Make sure that cache handler provides objects built from
+    data returned by make_cache_data().
+
+    Required arguments:
+    cache_handler -- cache handler to check
+    """
+    type_ = cache_handler.get_type(1)
+    assert type_.id == 1
+    assert type_.group == 5
+    assert type_.category == 7
+    assert type_.attributes == {2: 10.5, 3: 20}
+    assert tuple(e.id for e in type_.effects) == (100, 101)
+    assert type_.default_effect.id == 101
+    type_ = cache_handler.get_type(2)
+    assert type_.group is None
+    assert type_.attributes == {}
+    assert type_.effects == ()
+    assert type_.default_effect is None
+    attribute = cache_handler.get_attribute(2)
+    assert attribute.max_attribute == 3
+    assert attribute.default_value == 0.0
+    assert attribute.high_is_good is True
+    assert attribute.stackable is False
+    attribute = cache_handler.get_attribute(3)
+    assert attribute.max_attribute is None
+    assert attribute.default_value is None
+    effect = cache_handler.get_effect(101)
+    assert effect.category == 1
+    assert effect.is_offensive is True
+    assert effect.duration_attribute == 2
+    assert effect.build_status == 2
+    assert tuple(m.id for m in effect.modifiers) == (1000, 1001)
+    modifier = cache_handler.get_modifier(1001)
+    assert modifier.state == 3
+    assert modifier.operator == 6
+    assert modifier.filter_type == 2
+    assert modifier.filter_value == 55
@@ -0,0 +1,106 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import logging
+
+import pytest
+
+from eos.data.cache_handler import MmapCacheHandler, SQLiteCacheHandler
+from eos.data.cache_handler.exception import TypeFetchError, AttributeFetchError, EffectFetchError, ModifierFetchError
+from .environment import make_cache_data, check_cache_contents
+
+
+# Format: (cache handler class, name of cache file)
+HANDLERS = (
+    (MmapCacheHandler, 'eve.bin'),
+    (SQLiteCacheHandler, 'eve.sqlite')
+)
+
+
+@pytest.fixture(params=HANDLERS, ids=('mmap', 'sqlite'))
+def handler_spec(request, tmpdir):
+    handler_class, file_name = request.param
+    return handler_class, str(tmpdir.join('cache', file_name))
+
+
+def test_no_cache(handler_spec):
+    handler_class, cache_path = handler_spec
+    cache_handler = handler_class(cache_path)
+    assert cache_handler.get_fingerprint() is None
+    with pytest.raises(TypeFetchError):
+        cache_handler.get_type(1)
+
+
+def test_update(handler_spec):
+    handler_class, cache_path = handler_spec
+    cache_handler = handler_class(cache_path)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    assert cache_handler.get_fingerprint() == 'fingerprint'
+    check_cache_contents(cache_handler)
+
+
+def test_load(handler_spec):
+    handler_class, cache_path = handler_spec
+    handler_class(cache_path).update_cache(make_cache_data(), 'fingerprint')
+    cache_handler = handler_class(cache_path)
+    assert cache_handler.get_fingerprint() == 'fingerprint'
+    check_cache_contents(cache_handler)
+
+
+def test_missing(handler_spec):
+    handler_class, cache_path = handler_spec
+    cache_handler = handler_class(cache_path)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    with pytest.raises(TypeFetchError):
+        cache_handler.get_type(3)
+    with pytest.raises(TypeFetchError):
+        cache_handler.get_type(0)
+    with pytest.raises(AttributeFetchError):
+        cache_handler.get_attribute(4)
+    with pytest.raises(EffectFetchError):
+        cache_handler.get_effect(102)
+    with pytest.raises(ModifierFetchError):
+        cache_handler.get_modifier(None)
+
+
+def test_object_reuse(handler_spec):
+    handler_class, cache_path = handler_spec
+    cache_handler = handler_class(cache_path)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    type_ = cache_handler.get_type(1)
+    assert cache_handler.get_type(1) is type_
+    assert type_.effects[0].modifiers[0] is cache_handler.get_modifier(1000)
+
+
+def test_damaged(handler_spec, caplog):
+    handler_class, cache_path = handler_spec
+    handler_class(cache_path).update_cache(make_cache_data(), 'fingerprint')
+    with open(cache_path, 'wb') as file:
+        file.write(b'garbage')
+    with caplog.at_level(logging.ERROR):
+        cache_handler = handler_class(cache_path)
+    assert cache_handler.get_fingerprint() is None
+    assert 'error during reading cache' in caplog.text
+    with pytest.raises(TypeFetchError):
+        cache_handler.get_type(1)
+    # Damaged cache should be replaced on update
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    check_cache_contents(cache_handler)
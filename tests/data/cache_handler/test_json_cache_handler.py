@@ -0,0 +1,203 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import gc
+import weakref
+
+import pytest
+
+from eos.const.eos import Slot, State
+from eos.const.eve import Attribute, Effect, EffectCategory
+from eos.data.cache_handler import JsonCacheHandler
+from eos.data.cache_handler.codec import encode, get_codec
+from eos.data.cache_handler.exception import TypeFetchError, UnknownCodecError
+from .environment import make_cache_data, check_cache_contents
+
+
+@pytest.fixture
+def cache_path(tmpdir):
+    tmpdir.mkdir('cache')
+    return str(tmpdir.join('cache', 'eve.json.bz2'))
+
+
+def test_no_cache(cache_path):
+    cache_handler = JsonCacheHandler(cache_path)
+    assert cache_handler.get_fingerprint() is None
+    with pytest.raises(TypeFetchError):
+        cache_handler.get_type(1)
+
+
+def test_update(cache_path):
+    cache_handler = JsonCacheHandler(cache_path)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    assert cache_handler.get_fingerprint() == 'fingerprint'
+    check_cache_contents(cache_handler)
+
+
+def test_load(cache_path):
+    JsonCacheHandler(cache_path).update_cache(make_cache_data(), 'fingerprint')
+    cache_handler = JsonCacheHandler(cache_path)
+    assert cache_handler.get_fingerprint() == 'fingerprint'
+    check_cache_contents(cache_handler)
+
+
+def test_strong_cache(cache_path):
+    cache_handler = JsonCacheHandler(cache_path, strong_cache_size=1)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    type_ref = weakref.ref(cache_handler.get_type(1))
+    gc.collect()
+    # Type is kept alive by strong cache
+    assert type_ref() is cache_handler.get_type(1)
+    stats = cache_handler.get_strong_cache_stats()['types']
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.size == 1
+    assert stats.max_size == 1
+    # Least recently used type is evicted
+    cache_handler.get_type(2)
+    gc.collect()
+    assert type_ref() is None
+
+
+def test_strong_cache_disabled(cache_path):
+    cache_handler = JsonCacheHandler(cache_path, strong_cache_size=0)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    type_ref = weakref.ref(cache_handler.get_type(1))
+    gc.collect()
+    assert type_ref() is None
+    assert cache_handler.get_strong_cache_stats()['types'].size == 0
+
+
+def test_strong_cache_update(cache_path):
+    cache_handler = JsonCacheHandler(cache_path)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    type_ = cache_handler.get_type(1)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    # Objects built from old data should be discarded
+    assert cache_handler.get_type(1) is not type_
+
+
+@pytest.mark.parametrize('codec', ['json_bz2', 'json_zlib', 'json', 'pickle', 'marshal'])
+def test_codec(cache_path, codec):
+    JsonCacheHandler(cache_path, codec=codec).update_cache(make_cache_data(), 'fingerprint')
+    # Codec is detected on load, regardless of codec chosen
+    cache_handler = JsonCacheHandler(cache_path, codec='json')
+    assert cache_handler.get_fingerprint() == 'fingerprint'
+    check_cache_contents(cache_handler)
+
+
+def test_codec_legacy(cache_path):
+    # Files without header are bz2-compressed JSON
+    JsonCacheHandler(cache_path).update_cache(make_cache_data(), 'fingerprint')
+    with open(cache_path, 'rb') as file:
+        raw = file.read()
+    with open(cache_path, 'wb') as file:
+        file.write(raw[len(b'EOSC') + 1 + len(b'json_bz2'):])
+    cache_handler = JsonCacheHandler(cache_path)
+    assert cache_handler.get_fingerprint() == 'fingerprint'
+    check_cache_contents(cache_handler)
+
+
+def test_codec_unknown(cache_path):
+    with pytest.raises(UnknownCodecError):
+        JsonCacheHandler(cache_path, codec='yaml')
+
+
+def test_derived_properties(cache_path):
+    data = make_cache_data()
+    data['types'][0]['attributes'].update({Attribute.required_skill_1: 50, Attribute.required_skill_1_level: 3})
+    data['types'][0]['effects'].append(Effect.hi_power)
+    data['effects'].append({
+        'effect_id': Effect.hi_power, 'effect_category': EffectCategory.target, 'is_offensive': False,
+        'is_assistance': False, 'duration_attribute': None, 'discharge_attribute': None,
+        'range_attribute': None, 'falloff_attribute': None, 'tracking_speed_attribute': None,
+        'fitting_usage_chance_attribute': None, 'build_status': 1, 'modifiers': []
+    })
+    JsonCacheHandler(cache_path).update_cache(data, 'fingerprint')
+    type_ = JsonCacheHandler(cache_path).get_type(1)
+    # Properties should be taken from cache rather
+    # than derived at run time
+    for prop in ('required_skills', 'max_state', 'is_targeted', 'slots'):
+        assert hasattr(type_, '_cached_{}'.format(prop))
+    assert hasattr(type_.effects[0], '_cached__state')
+    assert type_.required_skills == {50: 3}
+    assert type_.max_state is State.active
+    assert type_.is_targeted is True
+    assert type_.slots == {Slot.module_high}
+    assert type_.effects[0]._state is State.offline
+
+
+def test_derived_properties_legacy(cache_path):
+    # Caches without derived properties are still readable,
+    # properties are derived at run time then
+    data = {
+        'types': {'1': [5, 7, [[2, 10.5]], [100], None]},
+        'attributes': {},
+        'effects': {'100': [1, False, False, None, None, None, None, None, None, 1, []]},
+        'modifiers': {},
+        'fingerprint': 'fingerprint'
+    }
+    with open(cache_path, 'wb') as file:
+        file.write(encode(data, get_codec('json')))
+    type_ = JsonCacheHandler(cache_path).get_type(1)
+    assert not hasattr(type_, '_cached_max_state')
+    assert type_.max_state is State.active
+    assert type_.required_skills == {}
+
+
+def test_interning_keeps_value_types(cache_path):
+    # Equal values of different types, like 1 and 1.0,
+    # should not be merged when data is interned
+    data = make_cache_data()
+    data['types'][0]['attributes'] = {2: 1.0, 3: True}
+    data['types'][1]['attributes'] = {2: 1, 3: 1}
+    JsonCacheHandler(cache_path).update_cache(data, 'fingerprint')
+    cache_handler = JsonCacheHandler(cache_path)
+    assert type(cache_handler.get_type(1).attributes[2]) is float
+    assert type(cache_handler.get_type(1).attributes[3]) is bool
+    assert type(cache_handler.get_type(2).attributes[2]) is int
+    assert type(cache_handler.get_type(2).attributes[3]) is int
+
+
+def test_derived_property_override(cache_path):
+    JsonCacheHandler(cache_path).update_cache(make_cache_data(), 'fingerprint')
+    type_ = JsonCacheHandler(cache_path).get_type(1)
+    type_.slots = {Slot.rig}
+    assert type_.slots == {Slot.rig}
+    # Deleting value makes it derived again
+    del type_.slots
+    assert type_.slots == set()
+
+
+def test_generator_state(cache_path):
+    cache_handler = JsonCacheHandler(cache_path)
+    assert cache_handler.get_generator_state() is None
+    cache_handler.update_generator_state({'version': 1, 'effects': {'5': ['digest', 1, []]}})
+    state = JsonCacheHandler(cache_path).get_generator_state()
+    assert state == {'version': 1, 'effects': {'5': ['digest', 1, []]}}
+
+
+def test_generator_state_damaged(cache_path, caplog):
+    cache_handler = JsonCacheHandler(cache_path)
+    with open('{}.state'.format(cache_path), 'wb') as file:
+        file.write(b'garbage')
+    assert cache_handler.get_generator_state() is None
+    assert 'error during reading generator state' in caplog.text
@@ -0,0 +1,111 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import gc
+import weakref
+from unittest.mock import Mock
+
+import pytest
+
+from eos.data.cache_handler import JsonCacheHandler, MmapCacheHandler, SQLiteCacheHandler
+from eos.data.cache_handler.exception import TypeFetchError
+from .environment import make_cache_data
+
+
+HANDLER_CLASSES = (
+    lambda path: JsonCacheHandler(path, strong_cache_size=0),
+    MmapCacheHandler,
+    SQLiteCacheHandler
+)
+
+
+@pytest.fixture(params=HANDLER_CLASSES, ids=('json', 'mmap', 'sqlite'))
+def cache_handler(request, tmpdir):
+    cache_handler = request.param(str(tmpdir.join('cache')))
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    return cache_handler
+
+
+def test_all(cache_handler):
+    job = cache_handler.preload()
+    assert job.done is True
+    assert job.error is None
+    assert sorted(job.types) == [1, 2]
+
+
+@pytest.mark.parametrize('filters, type_ids', (
+    ({'categories': [7]}, [1]),
+    ({'groups': [5]}, [1]),
+    ({'categories': [8], 'groups': [9]}, []),
+    ({'type_ids': [2]}, [2]),
+    ({'categories': [7], 'type_ids': [2]}, [1, 2])
+))
+def test_filters(cache_handler, filters, type_ids):
+    job = cache_handler.preload(**filters)
+    assert sorted(job.types) == type_ids
+
+
+def test_pinning(cache_handler):
+    cache_handler.preload(type_ids=[1])
+    type_ref = weakref.ref(cache_handler.get_type(1))
+    effect_ref = weakref.ref(cache_handler.get_effect(101))
+    modifier_ref = weakref.ref(cache_handler.get_modifier(1001))
+    gc.collect()
+    assert type_ref() is cache_handler.get_type(1)
+    assert effect_ref() is not None
+    assert modifier_ref() is not None
+    # Types assembled from old data are released
+    # when cache is updated
+    cache_handler.update_cache(make_cache_data(), 'fingerprint2')
+    gc.collect()
+    assert type_ref() is None
+
+
+def test_background(cache_handler):
+    callback = Mock()
+    job = cache_handler.preload(categories=[7], background=True, callback=callback)
+    assert job.wait(5) is True
+    assert job.done is True
+    assert sorted(job.types) == [1]
+    callback.assert_called_once_with(job)
+
+
+def test_error(cache_handler):
+    with pytest.raises(TypeFetchError):
+        cache_handler.preload(type_ids=[1, 3])
+
+
+def test_error_background(cache_handler):
+    job = cache_handler.preload(type_ids=[1, 3], background=True)
+    assert job.wait(5) is True
+    assert isinstance(job.error, TypeFetchError)
+
+
+def test_background_serialized(cache_handler):
+    # Warm-up thread has to wait while handler
+    # is used by other thread
+    with cache_handler._lock:
+        job = cache_handler.preload(background=True)
+        assert job.wait(0.1) is False
+        cache_handler.get_type(2)
+    assert job.wait(5) is True
+    assert job.error is None
+    assert sorted(job.types) == [1, 2]
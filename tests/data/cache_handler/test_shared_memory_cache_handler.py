@@ -0,0 +1,102 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import pickle
+from multiprocessing import Pool
+
+import pytest
+
+from eos.data.cache_handler import SharedMemoryCacheHandler
+from eos.data.cache_handler.exception import CacheReadOnlyError, TypeFetchError
+from .environment import make_cache_data, check_cache_contents
+
+
+@pytest.fixture
+def cache_handler():
+    cache_handler = SharedMemoryCacheHandler()
+    yield cache_handler
+    cache_handler.close()
+
+
+def get_type_attributes(cache_handler, type_id):
+    return cache_handler.get_type(type_id).attributes
+
+
+def test_no_cache(cache_handler):
+    assert cache_handler.name is None
+    assert cache_handler.get_fingerprint() is None
+    with pytest.raises(TypeFetchError):
+        cache_handler.get_type(1)
+
+
+def test_update(cache_handler):
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    assert cache_handler.get_fingerprint() == 'fingerprint'
+    check_cache_contents(cache_handler)
+
+
+def test_attach(cache_handler):
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    attached = SharedMemoryCacheHandler(cache_handler.name)
+    assert attached.get_fingerprint() == 'fingerprint'
+    check_cache_contents(attached)
+    with pytest.raises(CacheReadOnlyError):
+        attached.update_cache(make_cache_data(), 'fingerprint2')
+    attached.close()
+    # Segment stays alive until owner closes it
+    check_cache_contents(cache_handler)
+
+
+def test_update_attached(cache_handler):
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    attached = SharedMemoryCacheHandler(cache_handler.name)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint2')
+    # Attached handlers keep using old segment
+    assert attached.get_fingerprint() == 'fingerprint'
+    check_cache_contents(attached)
+    attached.close()
+    attached = SharedMemoryCacheHandler(cache_handler.name)
+    assert attached.get_fingerprint() == 'fingerprint2'
+    attached.close()
+
+
+def test_close(cache_handler):
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    name = cache_handler.name
+    cache_handler.close()
+    assert cache_handler.get_fingerprint() is None
+    with pytest.raises(FileNotFoundError):
+        SharedMemoryCacheHandler(name)
+
+
+def test_pickle(cache_handler):
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    unpickled = pickle.loads(pickle.dumps(cache_handler))
+    assert unpickled.name == cache_handler.name
+    check_cache_contents(unpickled)
+    unpickled.close()
+
+
+def test_worker_processes(cache_handler):
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    with Pool(2) as pool:
+        results = pool.starmap(get_type_attributes, [(cache_handler, 1), (cache_handler, 2)])
+    assert results == [{2: 10.5, 3: 20}, {}]
@@ -0,0 +1,102 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import gc
+
+import pytest
+
+from eos.data.cache_handler import SQLiteCacheHandler
+from eos.data.cache_handler.exception import TypeFetchError
+from .environment import make_cache_data, check_cache_contents
+
+
+# Behavior shared with other file-based cache handlers is
+# tested in test_file_cache_handler.py
+
+
+@pytest.fixture
+def cache_path(tmpdir):
+    return str(tmpdir.join('cache', 'eve.sqlite'))
+
+
+def test_update_incremental(cache_path):
+    cache_handler = SQLiteCacheHandler(cache_path)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint1')
+    data = make_cache_data()
+    data['types'][0]['attributes'] = {2: 11, 4: 1.0}
+    data['types'][0]['effects'] = [101]
+    del data['types'][1]
+    data['modifiers'][1]['filter_value'] = 56
+    cache_handler.update_cache(data, 'fingerprint2')
+    cache_handler = SQLiteCacheHandler(cache_path)
+    assert cache_handler.get_fingerprint() == 'fingerprint2'
+    type_ = cache_handler.get_type(1)
+    assert type_.attributes == {2: 11, 4: 1.0}
+    assert tuple(e.id for e in type_.effects) == (101,)
+    with pytest.raises(TypeFetchError):
+        cache_handler.get_type(2)
+    assert cache_handler.get_modifier(1001).filter_value == 56
+    assert cache_handler.get_attribute(2).high_is_good is True
+
+
+def check_contents_counting_queries(cache_handler):
+    """
+    Check contents of cache, while counting queries which
+    are sent to database.
+
+    Return value:
+    Amount of queries
+    """
+    # Release objects assembled during previous checks,
+    # so that data is requested from row cache again
+    gc.collect()
+    queries = []
+    cache_handler._SQLiteCacheHandler__connection.set_trace_callback(queries.append)
+    try:
+        check_cache_contents(cache_handler)
+    finally:
+        cache_handler._SQLiteCacheHandler__connection.set_trace_callback(None)
+    return len(queries)
+
+
+def get_row_cache_sizes(cache_handler):
+    return [
+        getattr(cache_handler, '_SQLiteCacheHandler__{}_row_cache'.format(entity)).get_stats().size
+        for entity in ('type', 'attribute', 'effect', 'modifier')
+    ]
+
+
+def test_row_cache_bound(cache_path):
+    cache_handler = SQLiteCacheHandler(cache_path, row_cache_size=1)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    assert check_contents_counting_queries(cache_handler) > 0
+    assert get_row_cache_sizes(cache_handler) == [1, 1, 1, 1]
+    # Evicted rows are fetched from database again
+    assert check_contents_counting_queries(cache_handler) > 0
+    assert get_row_cache_sizes(cache_handler) == [1, 1, 1, 1]
+
+
+def test_row_cache_unbound(cache_path):
+    cache_handler = SQLiteCacheHandler(cache_path)
+    cache_handler.update_cache(make_cache_data(), 'fingerprint')
+    assert check_contents_counting_queries(cache_handler) > 0
+    # When all rows fit into row cache, database is not queried
+    assert check_contents_counting_queries(cache_handler) == 0
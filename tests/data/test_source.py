@@ -22,6 +22,7 @@
 import pytest
 
 from eos import SourceManager
+from eos.data.cache_handler.preload import HOT_CATEGORIES
 from eos.data.source import Source
 from eos.data.exception import ExistingSourceError, UnknownSourceError
 from unittest.mock import MagicMock, Mock
@@ -125,3 +126,23 @@ def test_list_sources_correctly(mock_data_handler, mock_cache_handler):
     sources = SourceManager.list()
 
     assert sorted(sources) == sorted(['source one', 'source two', 'source three'])
+
+
+def test_add_no_preload(mock_data_handler, mock_cache_handler):
+    SourceManager.add('test', mock_data_handler, mock_cache_handler)
+
+    assert not mock_cache_handler.preload.called
+    assert SourceManager.get('test').preload_job is None
+
+
+def test_add_preload_hot_categories(mock_data_handler, mock_cache_handler):
+    SourceManager.add('test', mock_data_handler, mock_cache_handler, preload=True)
+
+    mock_cache_handler.preload.assert_called_once_with(categories=HOT_CATEGORIES, background=True)
+    assert SourceManager.get('test').preload_job is mock_cache_handler.preload.return_value
+
+
+def test_add_preload_arguments(mock_data_handler, mock_cache_handler):
+    SourceManager.add('test', mock_data_handler, mock_cache_handler, preload={'groups': [25]})
+
+    mock_cache_handler.preload.assert_called_once_with(groups=[25])
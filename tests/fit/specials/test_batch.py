@@ -0,0 +1,143 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from unittest.mock import Mock
+
+from eos.const.eos import State
+from eos.data.source import Source
+from eos.fit.holder.container import HolderSet
+from tests.fit.environment import CachingModule
+from tests.fit.fit_testcase import FitTestCase
+
+
+class TestFitBatch(FitTestCase):
+
+    def make_fit(self, *args, **kwargs):
+        fit = super().make_fit(*args, **kwargs)
+        fit.unordered = HolderSet(fit, CachingModule)
+        return fit
+
+    def custom_membership_check(self, fit, holder):
+        self.assertIn(holder, fit.unordered)
+
+    def test_addition(self):
+        source = Mock(spec_set=Source)
+        fit = self.make_fit(source=source)
+        holder1 = CachingModule(1, State.online)
+        holder2 = CachingModule(2, State.offline)
+        st_cleans_before = len(fit.stats._clear_volatile_attrs.mock_calls)
+        # Action
+        with fit.batch():
+            fit.unordered.add(holder1)
+            fit.unordered.add(holder2)
+            # Checks
+            self.assertEqual(len(fit.lt), 0)
+            self.assertEqual(len(fit.rt), 0)
+            self.assertEqual(len(fit.st), 0)
+            self.assertEqual(len(fit.stats._clear_volatile_attrs.mock_calls), st_cleans_before)
+        # Checks
+        self.assertEqual(len(fit.lt), 2)
+        self.assertEqual(fit.lt[holder1], {State.offline, State.online})
+        self.assertEqual(fit.lt[holder2], {State.offline})
+        self.assertEqual(len(fit.rt), 2)
+        self.assertEqual(fit.rt[holder1], {State.offline, State.online})
+        self.assertEqual(fit.rt[holder2], {State.offline})
+        self.assertEqual(len(fit.st), 2)
+        self.assertEqual(fit.st[holder1], {State.offline, State.online})
+        self.assertEqual(fit.st[holder2], {State.offline})
+        self.assertEqual(len(fit.stats._clear_volatile_attrs.mock_calls) - st_cleans_before, 1)
+        self.assertEqual(len(holder1._clear_volatile_attrs.mock_calls), 1)
+        self.assertEqual(len(holder2._clear_volatile_attrs.mock_calls), 1)
+        # Misc
+        fit.unordered.remove(holder1)
+        fit.unordered.remove(holder2)
+        self.assert_fit_buffers_empty(fit)
+
+    def test_state_switch(self):
+        source = Mock(spec_set=Source)
+        fit = self.make_fit(source=source)
+        holder = CachingModule(1, State.offline)
+        # Action
+        with fit.batch():
+            fit.unordered.add(holder)
+            holder.state = State.active
+            holder.state = State.online
+        # Checks
+        self.assertEqual(len(fit.lt), 1)
+        self.assertEqual(fit.lt[holder], {State.offline, State.online})
+        self.assertEqual(len(fit.rt), 1)
+        self.assertEqual(fit.rt[holder], {State.offline, State.online})
+        self.assertEqual(len(fit.st), 1)
+        self.assertEqual(fit.st[holder], {State.offline, State.online})
+        # Misc
+        fit.unordered.remove(holder)
+        self.assert_fit_buffers_empty(fit)
+
+    def test_nested(self):
+        source = Mock(spec_set=Source)
+        fit = self.make_fit(source=source)
+        holder = CachingModule(1, State.offline)
+        # Action
+        with fit.batch():
+            with fit.batch():
+                fit.unordered.add(holder)
+            # Checks
+            self.assertEqual(len(fit.lt), 0)
+        # Checks
+        self.assertEqual(len(fit.lt), 1)
+        self.assertEqual(fit.lt[holder], {State.offline})
+        # Misc
+        fit.unordered.remove(holder)
+        self.assert_fit_buffers_empty(fit)
+
+    def test_exception(self):
+        source = Mock(spec_set=Source)
+        fit = self.make_fit(source=source)
+        holder = CachingModule(1, State.offline)
+        # Action
+        with self.assertRaises(ZeroDivisionError):
+            with fit.batch():
+                fit.unordered.add(holder)
+                1 / 0
+        # Checks
+        self.assertEqual(len(fit.lt), 1)
+        self.assertEqual(fit.lt[holder], {State.offline})
+        self.assertEqual(len(fit.rt), 1)
+        self.assertEqual(len(fit.st), 1)
+        # Misc
+        fit.unordered.remove(holder)
+        self.assert_fit_buffers_empty(fit)
+
+    def test_no_source(self):
+        fit = self.make_fit()
+        holder = CachingModule(1, State.offline)
+        st_cleans_before = len(fit.stats._clear_volatile_attrs.mock_calls)
+        # Action
+        with fit.batch():
+            fit.unordered.add(holder)
+        # Checks
+        self.assertEqual(len(fit.lt), 0)
+        self.assertEqual(len(fit.rt), 0)
+        self.assertEqual(len(fit.st), 0)
+        self.assertEqual(len(fit.stats._clear_volatile_attrs.mock_calls), st_cleans_before)
+        # Misc
+        fit.unordered.remove(holder)
+        self.assert_fit_buffers_empty(fit)
@@ -0,0 +1,152 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import logging
+
+from eos.const.eos import EffectBuildStatus
+from eos.const.eve import EffectCategory, Operand
+from eos.data.cache_generator.modifier_builder import ModifierBuilder
+from tests.modifier_builder.modbuilder_testcase import ModBuilderTestCase
+
+
+class TestBuilderMemo(ModBuilderTestCase):
+    """Test reuse of results of expression subtree conversion"""
+
+    def setUp(self):
+        super().setUp()
+        self.e_add_mod, self.e_rm_mod = self.make_tree(0)
+
+    def make_tree(self, id_offset):
+        e_tgt = self.ef.make(id_offset + 1, operandID=Operand.def_loc, expressionValue='Ship')
+        e_tgt_attr = self.ef.make(id_offset + 2, operandID=Operand.def_attr, expressionAttributeID=9)
+        e_optr = self.ef.make(id_offset + 3, operandID=Operand.def_optr, expressionValue='PostPercent')
+        e_src_attr = self.ef.make(id_offset + 4, operandID=Operand.def_attr, expressionAttributeID=327)
+        e_tgt_spec = self.ef.make(
+            id_offset + 5, operandID=Operand.itm_attr,
+            arg1=e_tgt['expressionID'],
+            arg2=e_tgt_attr['expressionID']
+        )
+        e_optr_tgt = self.ef.make(
+            id_offset + 6, operandID=Operand.optr_tgt,
+            arg1=e_optr['expressionID'],
+            arg2=e_tgt_spec['expressionID']
+        )
+        e_add_mod = self.ef.make(
+            id_offset + 7, operandID=Operand.add_itm_mod,
+            arg1=e_optr_tgt['expressionID'],
+            arg2=e_src_attr['expressionID']
+        )
+        e_rm_mod = self.ef.make(
+            id_offset + 8, operandID=Operand.rm_itm_mod,
+            arg1=e_optr_tgt['expressionID'],
+            arg2=e_src_attr['expressionID']
+        )
+        return e_add_mod, e_rm_mod
+
+    def build(self, builder, pre_expression, post_expression, effect_id=1):
+        effect_row = {
+            'effect_id': effect_id,
+            'pre_expression': pre_expression,
+            'post_expression': post_expression,
+            'effect_category': EffectCategory.passive,
+            'modifier_info': None
+        }
+        return builder.build(effect_row)
+
+    def check_modifiers(self, modifiers):
+        self.assertEqual(len(modifiers), 1)
+        modifier = modifiers[0]
+        self.assertEqual(modifier.src_attr, 327)
+        self.assertEqual(modifier.tgt_attr, 9)
+
+    def test_same_id(self):
+        builder = ModifierBuilder(self.ef.data, tree_memo=True)
+        for _ in range(2):
+            modifiers, status = self.build(builder, self.e_add_mod['expressionID'], self.e_rm_mod['expressionID'])
+            self.assertEqual(status, EffectBuildStatus.ok_full)
+            self.check_modifiers(modifiers)
+        stats = builder.tree_memo_stats
+        self.assertEqual(stats.subtrees_converted, 2)
+        self.assertEqual(stats.id_hits, 2)
+        self.assertEqual(stats.structure_hits, 0)
+        # Each hit saves visits of 6 nodes below action node
+        self.assertEqual(stats.nodes_saved, 12)
+        self.assertEqual(len(self.log), 0)
+
+    def test_equal_structure(self):
+        e_add_mod2, e_rm_mod2 = self.make_tree(100)
+        builder = ModifierBuilder(self.ef.data, tree_memo=True)
+        modifiers, status = self.build(builder, self.e_add_mod['expressionID'], self.e_rm_mod['expressionID'])
+        self.assertEqual(status, EffectBuildStatus.ok_full)
+        self.check_modifiers(modifiers)
+        modifiers, status = self.build(builder, e_add_mod2['expressionID'], e_rm_mod2['expressionID'])
+        self.assertEqual(status, EffectBuildStatus.ok_full)
+        self.check_modifiers(modifiers)
+        stats = builder.tree_memo_stats
+        self.assertEqual(stats.subtrees_converted, 2)
+        self.assertEqual(stats.id_hits, 0)
+        self.assertEqual(stats.structure_hits, 2)
+        self.assertEqual(len(self.log), 0)
+
+    def test_repeated_subtree_in_tree(self):
+        # Each occurrence of subtree has to produce its own action
+        e_splice = self.ef.make(
+            200, operandID=Operand.splice,
+            arg1=self.e_add_mod['expressionID'],
+            arg2=self.e_add_mod['expressionID']
+        )
+        builder = ModifierBuilder(self.ef.data, tree_memo=True)
+        modifiers, status = self.build(builder, e_splice['expressionID'], self.e_rm_mod['expressionID'])
+        self.assertEqual(status, EffectBuildStatus.ok_partial)
+        self.check_modifiers(modifiers)
+        self.assertEqual(builder.tree_memo_stats.id_hits, 1)
+        self.assertEqual(len(self.log), 1)
+        log_record = self.log[0]
+        self.assertEqual(log_record.levelno, logging.WARNING)
+
+    def test_error(self):
+        e_add_mod2 = self.ef.make(
+            300, operandID=Operand.add_itm_mod,
+            arg1=1000,
+            arg2=self.e_add_mod['arg2']
+        )
+        builder = ModifierBuilder(self.ef.data, tree_memo=True)
+        for effect_id in (1, 2):
+            modifiers, status = self.build(builder, e_add_mod2['expressionID'], None, effect_id=effect_id)
+            self.assertEqual(status, EffectBuildStatus.error)
+            self.assertEqual(len(modifiers), 0)
+        self.assertEqual(builder.tree_memo_stats.id_hits, 1)
+        self.assertEqual(len(self.log), 2)
+        for log_record, effect_id in zip(self.log, (1, 2)):
+            self.assertEqual(log_record.levelno, logging.ERROR)
+            self.assertEqual(
+                log_record.msg,
+                'failed to parse expression tree of effect {}: unable to fetch expression 1000'.format(effect_id)
+            )
+
+    def test_disabled(self):
+        builder = ModifierBuilder(self.ef.data)
+        for _ in range(2):
+            modifiers, status = self.build(builder, self.e_add_mod['expressionID'], self.e_rm_mod['expressionID'])
+            self.assertEqual(status, EffectBuildStatus.ok_full)
+            self.check_modifiers(modifiers)
+        self.assertIsNone(builder.tree_memo_stats)
+        self.assertEqual(len(self.log), 0)
@@ -0,0 +1,127 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+import pytest
+
+from eos.util.compact_dict import CompactFloatDict
+
+
+def test_float():
+    container = CompactFloatDict()
+    container[5] = 1.5
+    container[3] = 2.5
+    assert container[5] == 1.5
+    assert container[3] == 2.5
+    assert list(container) == [3, 5]
+    assert len(container) == 2
+
+
+def test_int_value_kept():
+    container = CompactFloatDict()
+    container[5] = 3
+    assert container[5] == 3
+    assert type(container[5]) is int
+    container[5] = 3.5
+    assert container[5] == 3.5
+    assert len(container) == 1
+
+
+def test_float_replaced_with_int():
+    container = CompactFloatDict()
+    container[5] = 3.5
+    container[5] = 3
+    assert type(container[5]) is int
+    assert len(container) == 1
+    assert dict(container.items()) == {5: 3}
+
+
+def test_rejected_value():
+    container = CompactFloatDict()
+    container[5] = 1.5
+    container[3] = None
+    assert container.get(5) == 1.5
+    assert container[3] is None
+    assert container.keys() == {3, 5}
+
+
+@pytest.mark.parametrize('key', [-1, 2 ** 32, 'a', 1.5])
+def test_other_keys(key):
+    container = CompactFloatDict()
+    container[5] = 1.5
+    container[key] = 2.5
+    assert container[key] == 2.5
+    assert container[5] == 1.5
+    assert key in container
+    assert container.pop(key) == 2.5
+    assert key not in container
+    assert len(container) == 1
+
+
+def test_unhashable_key():
+    container = CompactFloatDict()
+    container[5] = 1.5
+    with pytest.raises(TypeError):
+        container[[]] = 2.5
+    assert dict(container.items()) == {5: 1.5}
+
+
+def test_missing():
+    container = CompactFloatDict()
+    container[-1] = 1
+    with pytest.raises(KeyError):
+        container[5]
+    with pytest.raises(KeyError):
+        del container[5]
+    assert container.get(5) is None
+    assert container.pop(5, 'default') == 'default'
+
+
+def test_clear():
+    container = CompactFloatDict()
+    container[5] = 1.5
+    container[6] = 1
+    container.clear()
+    assert len(container) == 0
+    assert list(container.items()) == []
+
+
+def test_keys_view():
+    container = CompactFloatDict()
+    container[5] = 1.5
+    container[-1] = 1
+    keys = container.keys()
+    assert 5 in keys
+    assert -1 in keys
+    assert 3 not in keys
+    assert len(keys) == 2
+    assert keys | {3} == {-1, 3, 5}
+    # View reflects later changes
+    container[3] = 2.5
+    assert sorted(keys) == [-1, 3, 5]
+
+
+def test_change_during_iteration():
+    container = CompactFloatDict()
+    container[5] = 1.5
+    container[-1] = 1
+    for key in container:
+        container[key + 100] = 1
+    assert len(container) == 4
@@ -0,0 +1,112 @@
+# ===============================================================================
+# Copyright (C) 2011 Diego Duclos
+# Copyright (C) 2011-2015 Anton Vorobyov
+#
+# This file is part of Eos.
+#
+# Eos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Eos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Eos. If not, see <http://www.gnu.org/licenses/>.
+# ===============================================================================
+
+
+from collections import namedtuple
+
+from eos.util.keyed_set import SubKeyedSet
+
+
+Data = namedtuple('Data', ('sub_key', 'value'))
+
+
+def make_keyed_set():
+    return SubKeyedSet(lambda data: data.sub_key)
+
+
+def test_add_data():
+    keyed_set = make_keyed_set()
+    data1 = Data(1, 'a')
+    data2 = Data(2, 'b')
+    keyed_set.add_data('key', data1)
+    keyed_set.add_data('key', data2)
+    assert keyed_set.get_data('key') == {data1, data2}
+    assert keyed_set.get_sub_data('key', 1) == {data1}
+    assert keyed_set.get_sub_data('key', 2) == {data2}
+
+
+def test_add_data_set():
+    keyed_set = make_keyed_set()
+    data1 = Data(1, 'a')
+    data2 = Data(1, 'b')
+    data3 = Data(2, 'c')
+    # Generators are consumed only once
+    keyed_set.add_data_set('key', (data for data in (data1, data2, data3)))
+    assert keyed_set.get_data('key') == {data1, data2, data3}
+    assert keyed_set.get_sub_data('key', 1) == {data1, data2}
+    assert keyed_set.get_sub_data('key', 2) == {data3}
+    assert keyed_set.get_sub_data('other key', 1) == set()
+
+
+def test_rm_data():
+    keyed_set = make_keyed_set()
+    data1 = Data(1, 'a')
+    data2 = Data(1, 'b')
+    keyed_set.add_data_set('key', (data1, data2))
+    keyed_set.rm_data('key', data1)
+    assert keyed_set.get_data('key') == {data2}
+    assert keyed_set.get_sub_data('key', 1) == {data2}
+
+
+def test_rm_data_set():
+    keyed_set = make_keyed_set()
+    data1 = Data(1, 'a')
+    data2 = Data(1, 'b')
+    data3 = Data(2, 'c')
+    keyed_set.add_data_set('key', (data1, data2, data3))
+    keyed_set.rm_data_set('key', (data for data in (data1, data3)))
+    assert keyed_set.get_data('key') == {data2}
+    assert keyed_set.get_sub_data('key', 1) == {data2}
+    assert keyed_set.get_sub_data('key', 2) == set()
+
+
+def test_cleanup():
+    # Empty sets should not be left neither in main
+    # container, nor in sub-key index
+    keyed_set = make_keyed_set()
+    data1 = Data(1, 'a')
+    data2 = Data(2, 'b')
+    keyed_set.add_data_set('key', (data1, data2))
+    keyed_set.rm_data('key', data1)
+    keyed_set.rm_data_set('key', (data2,))
+    assert len(keyed_set) == 0
+    assert len(keyed_set._SubKeyedSet__sub_index) == 0
+
+
+def test_rm_missing():
+    keyed_set = make_keyed_set()
+    data1 = Data(1, 'a')
+    keyed_set.add_data('key', data1)
+    keyed_set.rm_data('other key', data1)
+    keyed_set.rm_data_set('other key', (data1,))
+    keyed_set.rm_data('key', Data(1, 'b'))
+    assert keyed_set.get_data('key') == {data1}
+    assert keyed_set.get_sub_data('key', 1) == {data1}
+
+
+def test_get_missing():
+    keyed_set = make_keyed_set()
+    keyed_set.add_data('key', Data(1, 'a'))
+    assert keyed_set.get_data('other key') == set()
+    assert keyed_set.get_sub_data('other key', 1) == set()
+    assert keyed_set.get_sub_data('key', 2) == set()
+    # Lookups do not create entries
+    assert set(keyed_set) == {'key'}
+    assert len(keyed_set._SubKeyedSet__sub_index) == 1